@@ -3,9 +3,13 @@ This is the main file of scraper program.
 '''
 
 from repo import GithubRepo
-from scraper import RepoScraper
+from scraper import RepoScraper, create_session
 from repo_analyzer import RepoAnalyzer
 from repo_writer import RepoWriter
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common')) # The modules shared with QuoteScraper.
+from throttle import ThrottledSession
+import metrics
 
 def main():
     '''
@@ -16,11 +20,16 @@ def main():
     using RepoWriter.
     '''
 
-    scraper = RepoScraper()
-    result = scraper.scrape_page()
+    # Slow down and retry if GitHub throttles us.
+    with ThrottledSession(create_session()) as session:
+        scraper = RepoScraper(session=session)
+        result = scraper.scrape_page()
     analyzer = RepoAnalyzer(result)
     
     RepoWriter.save_to_JSON('repositories.json', result)
+    # Every stage of the run is recorded, export the metrics.
+    metrics.registry.write_prometheus('metrics.prom')
+    metrics.registry.write_json('metrics.json', exclude=('page',)) # Summary per scraper.
 
     print("==== ANALYSIS ====")
     
@@ -5,7 +5,12 @@ a Github article.
 
 from dataclasses import dataclass, field
 from functools import wraps
+from typing import Iterable
 import types
+import numpy as np
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common")) # The modules shared with QuoteScraper.
+import metrics # For recording the validation metrics.
 
 class InvalidAttributeError(Exception):
     """
@@ -14,10 +19,77 @@ class InvalidAttributeError(Exception):
     """
     pass
 
+def precompiled(cls):
+    """
+    Class decorator, reads the annotations of the slotted dataclass once and generates:
+    cls._field_types, the allowed types of every annotated field,
+    cls._check_types, a method checking the types of the instance variables without reflection,
+    cls._trusted_new, a function creating an object from the field values without validating it.
+    """
+    field_types = {}
+    namespace = {"InvalidAttributeError": InvalidAttributeError, "new": object.__new__, "cls": cls}
+    check_lines = ["def _check_types(self):"]
+    for name in cls.__slots__:
+        expected_type = cls.__annotations__.get(name, None) # None if expected type is not specified.
+        if isinstance(expected_type, types.UnionType): # More than one possible types for the attribute.
+            field_types[name] = expected_type.__args__
+            message = f"Expected type is one of {expected_type}."
+        elif isinstance(expected_type, type):
+            field_types[name] = (expected_type,)
+            message = f"Expected type is {expected_type}."
+        else:
+            continue
+        namespace[f"{name}_types"], namespace[f"{name}_message"] = field_types[name], message
+        check_lines += [f"    if type(self.{name}) not in {name}_types:",
+                        f"        raise InvalidAttributeError('{name} is type of '"
+                        f" + type(self.{name}).__name__ + '.' + {name}_message)"]
+    if len(check_lines) == 1:
+        check_lines.append("    pass")
+
+    # The slots are set with their descriptors, the frozen __setattr__ and __post_init__ are skipped.
+    namespace.update({f"set_{name}": getattr(cls, name).__set__ for name in cls.__slots__})
+    new_lines = [f"def _trusted_new({', '.join(cls.__slots__)}):", "    self = new(cls)"]
+    new_lines += [f"    set_{name}(self, {name})" for name in cls.__slots__]
+    new_lines.append("    return self")
+
+    exec("\n".join(check_lines + new_lines), namespace)
+    cls._field_types = field_types
+    cls._check_types = namespace["_check_types"]
+    cls._trusted_new = staticmethod(namespace["_trusted_new"])
+    return cls
+
+def _column_values(column) -> list:
+    """
+    Returns the values of a list, tuple, numpy array, pandas Series or Arrow array
+    as a list of Python objects.
+    """
+    if hasattr(column, "to_pylist"): # Arrow, to_numpy cannot convert the strings without copying.
+        return column.to_pylist()
+    if hasattr(column, "to_numpy"): # pandas.
+        column = column.to_numpy()
+    if isinstance(column, np.ndarray):
+        return column.tolist() # The numpy scalars become int, str...
+    return column if isinstance(column, (list, tuple)) else list(column)
+
+def _blank(values: list[str]) -> np.ndarray:
+    """
+    Tells which of the strings have only blanks.
+    """
+    return np.fromiter(map(len, map(str.strip, values)), dtype=np.int64, count=len(values)) == 0
+
+def _negative(values: list[int]) -> np.ndarray:
+    """
+    Tells which of the numbers are negative.
+    """
+    return np.asarray(values) < 0
+
+@precompiled
 @dataclass(slots=True, frozen=True)
 class GithubRepo:
     """
     This class represents information about a Github repository.
+    The type checks are generated once for the class, see precompiled.
+    Many objects are created faster with from_rows or from_columns.
     """
     owner: str = field(default=None) # Username of the owner
     repo_name: str = field(default=None) # Repository name
@@ -29,24 +101,21 @@ class GithubRepo:
     def __post_init__(self):
         """
         Checks the instance variables of the objet and validates them.
+        If any of them is not valid, an InvalidAttributeError is raised.
         """
-        # Firstly, we need to loop over the instance variables
-        for attribute_name in self.__slots__:
-            attribute_value = self.__getattribute__(attribute_name) # Get the value of the attribute
-            attribute_type = type(attribute_value) # Find the attribute type
-            expected_type = self.__annotations__.get(attribute_name, None) # Get the expected type for attribute.
-                                                                          # None if expected type is not specified.
-
-            if isinstance(expected_type, types.UnionType): # If the type is UnionType, it means there is
-                                                           # more than one possible types for the attribute.
-                if attribute_type not in expected_type.__args__: # Search the expected types in all possible types.
-                    raise InvalidAttributeError(f"{attribute_name} is type of {attribute_type.__name__}."
-                                                 f"Expected type is one of {expected_type}.")
-            elif isinstance(expected_type, type): # If the expected_type object is just a single type
-                                                  # compare the type with the type of attribute.
-                if attribute_type != expected_type:
-                    raise InvalidAttributeError(f"{attribute_name} is type of {attribute_type.__name__}."
-                                                f"Expected type is {expected_type}.")
+        # Only the errors are counted, timing every object would cost more than the validation.
+        try:
+            self._validate()
+        except InvalidAttributeError:
+            metrics.registry.inc("model_validation_errors_total", model="GithubRepo")
+            raise
+
+    def _validate(self):
+        """
+        Validates the instance variables, see __post_init__.
+        """
+        # Firstly, the types of the instance variables, by the generated checks.
+        self._check_types()
 
         # Now we will check the lengths of the inputs.
         # The string type objects have to be at least 1 character except blanks.
@@ -61,6 +130,66 @@ class GithubRepo:
         if self.forks < 0:
             raise InvalidAttributeError("Shares cannot be negative.")
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], validate: bool = True) -> list['GithubRepo']:
+        """
+        Creates the objects from rows of the attribute values in the order of the
+        fields, like the records of a stored snapshot. See from_columns.
+        """
+        try:
+            columns = list(zip(*rows, strict=True))
+        except ValueError:
+            columns = None # Rows of different lengths.
+        if columns == []:
+            return []
+        if columns is None or len(columns) != len(cls.__slots__):
+            raise InvalidAttributeError(f"Every row must have {len(cls.__slots__)} values.")
+        return cls.from_columns(dict(zip(cls.__slots__, columns)), validate)
+
+    @classmethod
+    def from_columns(cls, columns: dict, validate: bool = True) -> list['GithubRepo']:
+        """
+        Creates the objects from columns keyed by the attribute names, the values
+        at the same position make one object. The columns can be lists, numpy
+        arrays, pandas Series or Arrow arrays.
+        The whole columns are validated together instead of every object validating
+        itself, an InvalidAttributeError naming the invalid row is raised.
+        If validate is False, the columns are trusted and not checked at all.
+        """
+        columns = [_column_values(columns[name]) for name in cls.__slots__]
+        if len(set(map(len, columns))) > 1:
+            raise InvalidAttributeError("The columns must have the same length.")
+        if validate:
+            cls.__validate_columns(columns)
+        return list(map(cls._trusted_new, *columns))
+
+    @classmethod
+    def __validate_columns(cls, columns: list[list]):
+        """
+        Validates the columns like _validate, raises an InvalidAttributeError with the first
+        invalid row found. The values of a column are checked if all of them have the right type.
+        """
+        with metrics.registry.timer("model_columns_validation_seconds", model="GithubRepo"):
+            size = len(columns[0])
+            invalid = np.zeros(size, dtype=bool)
+            value_checks = {"owner": _blank, "repo_name": _blank, "stars": _negative, "forks": _negative}
+            for name, values in zip(cls.__slots__, columns):
+                expected_types = cls._field_types.get(name)
+                if expected_types is not None and not set(map(type, values)).issubset(expected_types):
+                    invalid |= np.fromiter((type(value) not in expected_types for value in values),
+                                           dtype=bool, count=size)
+                elif name in value_checks and size > 0:
+                    invalid |= value_checks[name](values)
+            rows = np.flatnonzero(invalid)
+
+        if len(rows) > 0:
+            # The row is created the usual way, for the message and the metrics of the error.
+            row = int(rows[0])
+            try:
+                cls(*(values[row] for values in columns))
+            except InvalidAttributeError as error:
+                raise InvalidAttributeError(f"Row {row}: {error}") from error
+
     def to_dict(self):
         """
         Writes the object into a dictionary and returns it.
@@ -2,34 +2,106 @@
 This file is designed to analyze trendings repository data.
 '''
 
+from operator import attrgetter
+import numpy as np
 import pandas as pd
 from scraper import GithubRepo
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common')) # The modules shared with QuoteScraper.
+from query_plan import Barrier, Predicate, QueryPlan, take # For running the filters together.
+from trigram import TrigramIndex # For finding the substrings without scanning the columns.
+try:
+    import pyarrow as pa # Optional, for loading Parquet and Arrow files.
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# The dtypes of the columns of the analyzer DataFrame. The languages repeat, so they are categorical.
+COLUMN_TYPES = {
+    'owner': str,
+    'repo_name': str,
+    'description': str,
+    'language': 'category',
+    'stars': np.int64,
+    'forks': np.int64,
+}
 
 class RepoAnalyzer:
     '''
     This class stores a list of GithubRepo objects with DataFrame.
     Make it possible to analyze and filter the repoistories.
+    The filter methods only record their filter in a query plan, the filters
+    run together when the result is needed (get or count).
+    with_substring uses a trigram index of the field, built at its first use.
+    The stars and forks filters use a sorted index of the column: the range
+    filters are binary searches and most_starred_n/most_forked_n are slices.
     '''
 
     def __init__(self, repos: set[GithubRepo]):
         '''
         Accepts a set of GithubRepo, write the data into DataFrame.
-        Also creates an additional DataFrame (__filtered) to keep
-        the filtered repos.
+        Every attribute is read from all the repositories into a column,
+        which gets the dtype in COLUMN_TYPES.
+        '''
+        repos = list(repos)
+        self.__set_frame(RepoAnalyzer.__typed_frame({name: list(map(attrgetter(name), repos))
+                                                     for name in COLUMN_TYPES}))
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> 'RepoAnalyzer':
+        '''
+        Creates an analyzer from columns keyed by the GithubRepo attribute names,
+        for example the lists of the scraped values, without creating GithubRepo objects.
+        The columns get the dtypes in COLUMN_TYPES, the other columns are kept as they are.
+        '''
+        analyzer = cls.__new__(cls)
+        analyzer.__set_frame(cls.__typed_frame(columns))
+        return analyzer
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'RepoAnalyzer':
+        '''
+        Creates an analyzer over a DataFrame with the columns of GithubRepo,
+        without creating GithubRepo objects.
+        '''
+        df = df.reset_index(drop=True)
+        return cls.from_columns({column: df[column] for column in df.columns})
+
+    @classmethod
+    def from_parquet(cls, parquet_name, columns: list[str] = None) -> 'RepoAnalyzer':
+        '''
+        Creates an analyzer from a Parquet file written by RepoWriter.save_to_parquet.
+        The file is memory mapped and only the given columns are read, all of them if None.
+        The filters can only use the columns which are read.
+        '''
+        cls.__require_pyarrow()
+        return cls.from_arrow_table(pq.read_table(parquet_name, columns=columns, memory_map=True))
+
+    @classmethod
+    def from_arrow(cls, arrow_name, columns: list[str] = None) -> 'RepoAnalyzer':
+        '''
+        Creates an analyzer from an Arrow IPC file written by RepoWriter.save_to_arrow.
+        The file is memory mapped and only the given columns are read, all of them if None.
         '''
-        repos_dict = [repo.to_dict() for repo in repos]
-        self.df = pd.DataFrame(repos_dict)
-            
-        self.__filtered = self.df.copy()
+        cls.__require_pyarrow()
+        with pa.memory_map(arrow_name) as arrow_file:
+            table = pa.ipc.open_file(arrow_file).read_all()
+        return cls.from_arrow_table(table if columns is None else table.select(columns))
+
+    @classmethod
+    def from_arrow_table(cls, table: 'pa.Table') -> 'RepoAnalyzer':
+        '''
+        Creates an analyzer from an Arrow table with the columns of GithubRepo.
+        The dictionary encoded languages become the categorical column directly.
+        '''
+        return cls.from_frame(table.to_pandas())
 
     def minimum_stars(self, stars: int) -> 'RepoAnalyzer':
         '''
         Takes the repositories whose stars attribute is at least 'stars'
         Returns self to maintain method chaining.
         '''
-        cond = self.__filtered['stars'] >= stars
-        self.__filtered = self.__filtered[cond]
-        
+        self.__plan.add(self.__sorted_index('stars').at_least(stars))
         return self
     
     def maximum_stars(self, stars: int) -> 'RepoAnalyzer':
@@ -37,9 +109,7 @@ class RepoAnalyzer:
         Takes the repositories whose stars attribute is at most 'stars'.
         Returns self to maintain method chaining.
         '''
-        cond = self.__filtered['stars'] <= stars
-        self.__filtered = self.__filtered[cond]
-
+        self.__plan.add(self.__sorted_index('stars').at_most(stars))
         return self
     
     def most_starred_n(self, n: int) -> 'RepoAnalyzer':
@@ -47,7 +117,7 @@ class RepoAnalyzer:
         Takes the n repositories which are most starred.
         Returns self to maintain method chaining.
         '''
-        self.__filtered = self.__filtered.nlargest(n, ['stars'])
+        self.__plan.add(Barrier(lambda rows: self.__sorted_index('stars').largest(rows, n)))
         return self
 
     def minimum_forks(self, forks: int) -> 'RepoAnalyzer':
@@ -55,9 +125,7 @@ class RepoAnalyzer:
         Takes the repositories which are forked at least 'forks' times.
         Returns self to maintain method chaining.
         '''
-        cond = self.__filtered['forks'] >= forks
-        self.__filtered = self.__filtered[cond]
-        
+        self.__plan.add(self.__sorted_index('forks').at_least(forks))
         return self
     
     def maximum_forks(self, forks: int) -> 'RepoAnalyzer':
@@ -65,9 +133,7 @@ class RepoAnalyzer:
         Takes the repositories which are forked at most 'forks' times.
         Returns self to maintain method chaining.
         '''
-        cond = self.__filtered['forks'] <= forks
-        self.__filtered = self.__filtered[cond]
-
+        self.__plan.add(self.__sorted_index('forks').at_most(forks))
         return self
 
     def most_forked_n(self, n: int) -> 'RepoAnalyzer':
@@ -75,38 +141,153 @@ class RepoAnalyzer:
         Takes the n repositories with maximum forks.
         Returns self to maintain method chaining.
         '''
-        self.__filtered = self.__filtered.nlargest(n, ['forks'])
+        self.__plan.add(Barrier(lambda rows: self.__sorted_index('forks').largest(rows, n)))
         return self
 
-    def with_substring(self, substr: str, field) -> 'RepoAnalyzer':
+    def with_substring(self, substr: str, field, case_sensitive: bool = True,
+                       regex: bool = False) -> 'RepoAnalyzer':
         '''
-        Takes the repositories whose usernames contains the
-        given substring.
+        Takes the repositories whose field (owner, repo_name or description)
+        contains the given substring.
+        The substring is found with the trigram index of the field. If regex is
+        True, substr is a regular expression instead, and the field is scanned.
         Returns self to maintain method chaining.
         '''
         if field not in ['owner', 'repo_name', 'description']:
             return self
 
-        cond = self.__filtered[field].str.contains(substr)
-        self.__filtered = self.__filtered[cond]
-        
+        if regex:
+            def mask(rows):
+                values = self.df[field] if rows is None else self.df[field].iloc[rows]
+                return values.str.contains(substr, case=case_sensitive).to_numpy(dtype=bool)
+
+            # Matching strings is much slower than comparing numbers, so it runs last.
+            self.__plan.add(Predicate(mask, selectivity=0.25, cost=20))
+            return self
+
+        index = self.__trigram_index(field, case_sensitive)
+        # Only the candidates of the index are checked, still slower than comparing numbers.
+        self.__plan.add(Predicate(lambda rows: index.contains(substr, rows),
+                                  selectivity=index.selectivity(substr), cost=5))
         return self
     
     def count(self) -> int:
         '''
         Returns the length of filtered list.
         '''
-        return self.__filtered.shape[0]
+        return len(self.__plan.execute())
     
     def get(self) -> pd.DataFrame:
         '''
-        Returns a copy of the filtered DataFrame
+        Returns the filtered repositories as a new DataFrame.
         '''
-        return self.__filtered.copy()
+        return self.df.iloc[self.__plan.execute()]
 
     def clear(self) -> 'RepoAnalyzer':
         '''
-        Clears all the filters on filtered dataframe.
+        Clears all the filters.
         '''
-        self.__filtered = self.df.copy()
+        self.__plan.clear()
         return self
+
+    @staticmethod
+    def __require_pyarrow():
+        if pa is None:
+            raise ImportError('Parquet and Arrow files need the pyarrow package.')
+
+    def __set_frame(self, df: pd.DataFrame):
+        '''
+        Stores the DataFrame and creates the query plan that keeps the filters.
+        '''
+        self.df = df
+        self.__plan = QueryPlan(self.df.shape[0])
+        self.__trigram_indexes = {} # (field, case_sensitive) -> TrigramIndex
+        self.__sorted_indexes = {} # column -> SortedIndex
+
+    @staticmethod
+    def __typed_frame(columns: dict) -> pd.DataFrame:
+        '''
+        Returns a DataFrame of the columns, with the dtypes in COLUMN_TYPES.
+        '''
+        return pd.DataFrame({name: pd.Series(values, dtype=COLUMN_TYPES[name]) if name in COLUMN_TYPES else values
+                             for name, values in columns.items()})
+
+    def __trigram_index(self, field: str, case_sensitive: bool) -> TrigramIndex:
+        '''
+        Returns the trigram index of the field, built at the first use.
+        '''
+        key = (field, case_sensitive)
+        if key not in self.__trigram_indexes:
+            self.__trigram_indexes[key] = TrigramIndex(self.df[field].tolist(), case_sensitive)
+        return self.__trigram_indexes[key]
+
+    def __sorted_index(self, column: str) -> 'SortedIndex':
+        '''
+        Returns the sorted index of the column, built at the first use.
+        '''
+        if column not in self.__sorted_indexes:
+            self.__sorted_indexes[column] = SortedIndex(self.df[column].to_numpy())
+        return self.__sorted_indexes[column]
+
+class SortedIndex:
+    '''
+    The positions of the rows of a numeric column, sorted by the value in
+    descending order, equal values in the order of the rows.
+    A range of values is a slice of the index, found by binary search.
+    '''
+    def __init__(self, values: np.ndarray):
+        self.size = len(values)
+        self.__values = values
+        self.order = np.argsort(-values, kind='stable') # Positions, largest value first.
+        self.__negated = -values[self.order] # Ascending, for searchsorted.
+        self.__rank = np.empty(self.size, dtype=np.int64) # The place of every row in order.
+        self.__rank[self.order] = np.arange(self.size)
+
+    def at_least(self, value) -> Predicate:
+        '''
+        Returns a predicate keeping the rows whose value is at least value.
+        '''
+        count = int(np.searchsorted(self.__negated, -value, side='right'))
+        return self.__first(count)
+
+    def at_most(self, value) -> Predicate:
+        '''
+        Returns a predicate keeping the rows whose value is at most value.
+        '''
+        start = int(np.searchsorted(self.__negated, -value, side='left'))
+        return self.__last(self.size - start)
+
+    def largest(self, rows: np.ndarray, n: int) -> np.ndarray:
+        '''
+        Returns the positions of the n rows with the largest values among the rows,
+        in descending order. Equal values keep their order in rows, like DataFrame.nlargest
+        on the frame of the rows.
+        '''
+        if n <= 0:
+            return rows[:0]
+        if np.any(rows[1:] < rows[:-1]):
+            # Ordered by a barrier before, the ranks would order the equal values by position.
+            return rows[np.argsort(-self.__values[rows], kind='stable')[:n]]
+        if len(rows) == self.size:
+            return self.order[:n] # All the rows, the top of the index.
+        ranks = self.__rank[rows]
+        if n < len(rows):
+            ranks = ranks[np.argpartition(ranks, n)[:n]]
+        return self.order[np.sort(ranks)]
+
+    def __first(self, count: int) -> Predicate:
+        '''
+        Keeps the rows in order[:count].
+        '''
+        return Predicate(lambda rows: take(self.__rank, rows) < count,
+                         selectivity=count / self.size if self.size else 0.0,
+                         positions=lambda: np.sort(self.order[:count]))
+
+    def __last(self, count: int) -> Predicate:
+        '''
+        Keeps the rows in order[size - count:].
+        '''
+        start = self.size - count
+        return Predicate(lambda rows: take(self.__rank, rows) >= start,
+                         selectivity=count / self.size if self.size else 0.0,
+                         positions=lambda: np.sort(self.order[start:]))
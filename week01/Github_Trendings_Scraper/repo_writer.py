@@ -5,7 +5,25 @@ to write the GithubRepo data into a specified JSON or CSV file.
 
 import json
 import csv
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common')) # The modules shared with QuoteScraper.
+import metrics # For recording the writer metrics.
 from repo import GithubRepo
+try:
+    import pyarrow as pa # Optional, for the Parquet and Arrow files.
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Schema of the Parquet and Arrow files, the languages repeat so they are dictionary encoded.
+REPO_SCHEMA = pa.schema([
+    ('owner', pa.string()),
+    ('repo_name', pa.string()),
+    ('description', pa.string()),
+    ('language', pa.dictionary(pa.int32(), pa.string())),
+    ('stars', pa.int64()),
+    ('forks', pa.int64()),
+]) if pa is not None else None
 
 class RepoWriter:
     '''
@@ -18,22 +36,61 @@ class RepoWriter:
         '''
         Save the repositories into a CSV file with given name.
         '''
-        with open(csv_name, "w", encoding="utf-8", newline='') as csv_file:
+        with (metrics.registry.timer('writer_seconds', format='csv'),
+              open(csv_name, "w", encoding="utf-8", newline='') as csv_file):
             dict_writer = csv.DictWriter(csv_file, fieldnames=GithubRepo.__slots__)
             
             dict_writer.writeheader()
             for repo in repos:
                 dict_writer.writerow(repo.to_dict())
+        metrics.registry.inc('writer_records_total', len(repos), format='csv')
 
     @staticmethod
     def save_to_JSON(json_name, repos: set[GithubRepo]):
         '''
         Saves the repositories into a JSON file with given name
         '''
-        with open(json_name, 'w', encoding='utf-8') as json_file:
+        with (metrics.registry.timer('writer_seconds', format='json'),
+              open(json_name, 'w', encoding='utf-8') as json_file):
             repos_as_dicts = dict()
             for i, repo in enumerate(repos):
                 repo_key = f"repo{i}"
                 repos_as_dicts[repo_key] = repo.to_dict()
 
             json.dump(repos_as_dicts, json_file, indent=4, ensure_ascii=False)
+        metrics.registry.inc('writer_records_total', len(repos), format='json')
+
+    @staticmethod
+    def save_to_parquet(parquet_name, repos: set[GithubRepo]):
+        '''
+        Saves the repositories into a Parquet file with given name.
+        It can be loaded with RepoAnalyzer.from_parquet.
+        '''
+        table = RepoWriter.to_arrow_table(repos)
+        with metrics.registry.timer('writer_seconds', format='parquet'):
+            pq.write_table(table, parquet_name)
+        metrics.registry.inc('writer_records_total', len(repos), format='parquet')
+
+    @staticmethod
+    def save_to_arrow(arrow_name, repos: set[GithubRepo]):
+        '''
+        Saves the repositories into an Arrow IPC file with given name.
+        It can be memory mapped by RepoAnalyzer.from_arrow.
+        '''
+        table = RepoWriter.to_arrow_table(repos)
+        with (metrics.registry.timer('writer_seconds', format='arrow'),
+              pa.OSFile(arrow_name, 'wb') as arrow_file,
+              pa.ipc.new_file(arrow_file, table.schema) as writer):
+            writer.write_table(table)
+        metrics.registry.inc('writer_records_total', len(repos), format='arrow')
+
+    @staticmethod
+    def to_arrow_table(repos: set[GithubRepo]) -> 'pa.Table':
+        '''
+        Returns the repositories as an Arrow table with REPO_SCHEMA.
+        '''
+        if pa is None:
+            raise ImportError('Parquet and Arrow files need the pyarrow package.')
+        columns = {name: [getattr(repo, name) for repo in repos] for name in REPO_SCHEMA.names}
+        columns['language'] = pa.array(columns['language'], pa.string()).dictionary_encode()
+        return pa.table(columns, schema=REPO_SCHEMA)
@@ -4,8 +4,39 @@ to scrape GithubRepo values from page 'https://github.com/trending'.
 '''
 
 from repo import GithubRepo # For GithubRepo object.
+import asyncio
+import time
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common')) # The modules shared with QuoteScraper.
+import metrics # For recording the metrics of the stages.
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter # For connection pooling.
+import aiohttp # For fetching the page without blocking the event loop.
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+# Headers sent with every request made by a session from create_session.
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; RepoScraper/1.0)',
+    'Accept': 'text/html,application/xhtml+xml',
+}
+
+def create_session(pool_size: int = 10, headers: dict | None = None) -> requests.Session:
+    '''
+    Creates a requests.Session that keeps connections alive and reuses them.
+    pool_size is the number of connections kept open per host.
+    headers are merged on top of DEFAULT_HEADERS and sent with every request.
+    '''
+    if pool_size < 1:
+        raise ValueError("pool_size must be at least 1.")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers is not None:
+        session.headers.update(headers)
+    return session
 
 class RepoScraper:
     '''
@@ -15,29 +46,110 @@ class RepoScraper:
     _url_daily = 'https://github.com/trending?since=daily' # Class variablea
     _url_weekly = 'https://github.com/trending?since=weekly'
     _url_monthly = 'https://github.com/trending?since=monthly'
+    _parsers = ('html.parser', 'lxml') # BeautifulSoup backends that can be used.
+    # Repositories are the only elements the extraction methods read.
+    _parse_only = SoupStrainer('article', class_='Box-row')
+
+    def __init__(self, session: requests.Session | None = None,
+                 parser: str = 'html.parser', restrict: bool = False):
+        '''
+        session is used for all the requests if it is given (see create_session,
+        or http_cache.CachedSession to cache the pages on disk), otherwise every
+        request opens a new connection.
+        parser is the BeautifulSoup backend, 'html.parser' or 'lxml'.
+        If restrict is True, only the repository articles are parsed.
+        '''
+        if parser not in RepoScraper._parsers:
+            raise ValueError(f"parser must be one of {RepoScraper._parsers}, not {parser!r}")
+
+        self.session = session
+        self.parser = parser
+        self.restrict = restrict
 
     def scrape_page(self, since="daily") -> set[GithubRepo]:
         '''
         Scrapes all the repos in the url.
         '''
-        extracted = set() # Save all repos in a set
-        
+        url = self._get_url(since)
+        with self._page_labels(url):
+            soup = self._fetch_page_data(url)
+            if soup is None:
+                return set()
+            return self._extract_repos(soup)
+
+    async def ascrape_page(self, since="daily", timeout: float = 10,
+                           session: aiohttp.ClientSession | None = None) -> set[GithubRepo]:
+        '''
+        Asynchronous version of scrape_page.
+        The request is given timeout seconds, an empty set is returned
+        if it fails or times out. Parsing runs in a worker thread,
+        so the event loop is never blocked.
+        '''
+        url = self._get_url(since)
+
+        with self._page_labels(url): # The labels are copied into the worker thread too.
+            owns_session = session is None # Close the session only if we created it.
+            if owns_session:
+                session = aiohttp.ClientSession()
+            try:
+                content = await self._afetch_page_content(session, url, timeout)
+            finally:
+                if owns_session:
+                    await session.close()
+
+            if content is None:
+                return set()
+            return await asyncio.to_thread(self._parse_page, content)
+
+    def _get_url(self, since: str) -> str:
+        '''
+        Returns the trending url for given period.
+        '''
         if since == 'daily':
-            url = RepoScraper._url_daily
+            return self._url_daily
         elif since == 'monthly':
-            url = RepoScraper._url_monthly
+            return self._url_monthly
         elif since == 'weekly':
-            url = RepoScraper._url_weekly
-
-        soup = self._fetch_page_data(url)
-        if soup is not None:
-            # All repositories are represented in div tags with class name 'Box-row'
-            # Find all divs.
-            repository_articles = soup.find_all('article', class_='Box-row')
-            for repository_article in repository_articles:
+            return self._url_weekly
+        raise ValueError(f"since must be 'daily', 'weekly' or 'monthly', not {since!r}")
+
+    def _page_labels(self, url: str):
+        '''
+        Labels the metrics recorded inside the with block with the scraper and the page.
+        '''
+        return metrics.labelled(scraper=type(self).__name__, page=url)
+
+    def _parse_page(self, content: bytes) -> set[GithubRepo]:
+        '''
+        Parses the page content and extracts all the repos in it.
+        '''
+        return self._extract_repos(self._make_soup(content))
+
+    def _make_soup(self, content: bytes) -> BeautifulSoup:
+        '''
+        Parses the page content with the chosen parser.
+        '''
+        parse_only = RepoScraper._parse_only if self.restrict else None
+        with metrics.registry.timer('scraper_parse_seconds'):
+            return BeautifulSoup(content, self.parser, parse_only=parse_only)
+
+    def _extract_repos(self, soup: BeautifulSoup) -> set[GithubRepo]:
+        '''
+        Extracts all the repos in the given soup.
+        '''
+        extracted = set() # Save all repos in a set
+
+        # All repositories are represented in div tags with class name 'Box-row'
+        # Find all divs.
+        repository_articles = soup.find_all('article', class_='Box-row')
+        for repository_article in repository_articles:
+            with metrics.registry.timer('scraper_extract_seconds'):
                 repo = self._extract_repo(repository_article) # Extract repository from div element.
-                if repo is not None:
-                    extracted.add(repo) # Add to set if repo is not None.
+            if repo is not None:
+                extracted.add(repo) # Add to set if repo is not None.
+                metrics.registry.inc('scraper_items_total')
+            else:
+                metrics.registry.inc('scraper_invalid_items_total')
 
         return extracted
 
@@ -47,11 +159,35 @@ class RepoScraper:
         Returns a BeautifulSoup object.
         If request failes returns None.
         '''
-        response = requests.get(url)
+        http = self.session if self.session is not None else requests
+        start = time.perf_counter()
+        response = http.get(url)
+        metrics.registry.observe('scraper_fetch_seconds', time.perf_counter() - start)
+        metrics.registry.inc('scraper_fetch_total', status=response.status_code)
         if response.status_code != 200:
             return None # Request failed
         # Request successfull, create a BeautifulSoup object and return it.
-        return BeautifulSoup(response.content, 'html.parser')
+        return self._make_soup(response.content)
+
+    async def _afetch_page_content(self, session: aiohttp.ClientSession, url: str,
+                                   timeout: float) -> bytes | None:
+        '''
+        Fetchs the page content from the url without blocking the event loop.
+        If request failes or times out returns None.
+        '''
+        try:
+            with metrics.registry.timer('scraper_fetch_seconds'):
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    metrics.registry.inc('scraper_fetch_total', status=response.status)
+                    if response.status != 200:
+                        return None # Request failed
+                    return await response.read()
+        except asyncio.TimeoutError:
+            metrics.registry.inc('scraper_fetch_total', status='timeout')
+            return None # Request timed out
+        except aiohttp.ClientError: # Connection refused or reset, bad payload...
+            metrics.registry.inc('scraper_fetch_total', status='error')
+            return None
 
     def _extract_repo(self, web_element: Tag) -> GithubRepo | None:
         '''
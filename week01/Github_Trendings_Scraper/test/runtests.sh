@@ -5,3 +5,7 @@
 pytest test_github_repo_object.py
 pytest test_repo_analyzer.py
 pytest test_scraper.py
+pytest test_async_scraper.py
+pytest test_metrics.py
+pytest test_arrow_io.py
+pytest test_trigram.py
@@ -0,0 +1,82 @@
+'''
+This file tests the Parquet and Arrow files of the repositories
+and loading RepoAnalyzer from them.
+'''
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from repo import GithubRepo
+from repo_writer import RepoWriter
+from repo_analyzer import RepoAnalyzer
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+REPOS = {GithubRepo(f'owner{i}', f'repo{i}', f'a {"python" if i % 2 else "rust"} tool',
+                    'Python' if i % 3 else 'Rust', i * 100, i * 10)
+         for i in range(10)}
+
+@pytest.fixture(params=['parquet', 'arrow'])
+def saved(request, tmp_path):
+    '''
+    Saves REPOS in the format, returns the loader and the file name.
+    '''
+    file_name = str(tmp_path / f'repos.{request.param}')
+    if request.param == 'parquet':
+        RepoWriter.save_to_parquet(file_name, REPOS)
+        return RepoAnalyzer.from_parquet, file_name
+    RepoWriter.save_to_arrow(file_name, REPOS)
+    return RepoAnalyzer.from_arrow, file_name
+
+def to_repos(df):
+    '''
+    Converts the rows of the DataFrame back to GithubRepo objects.
+    '''
+    return {GithubRepo(row.owner, row.repo_name, row.description, row.language, row.stars, row.forks)
+            for row in df.itertuples(index=False)}
+
+def test_schema(tmp_path):
+    '''
+    The languages should be dictionary encoded.
+    '''
+    file_name = str(tmp_path / 'repos.parquet')
+    RepoWriter.save_to_parquet(file_name, REPOS)
+    schema = pq.read_schema(file_name)
+
+    assert pa.types.is_dictionary(schema.field('language').type)
+    assert schema.field('stars').type == pa.int64()
+
+def test_round_trip(saved):
+    load, file_name = saved
+
+    analyzer = load(file_name)
+
+    assert to_repos(analyzer.get()) == REPOS
+    assert analyzer.get().dtypes.equals(RepoAnalyzer(REPOS).get().dtypes)
+
+def test_filters_after_load(saved):
+    load, file_name = saved
+    analyzer = load(file_name)
+
+    result = analyzer.with_substring('python', 'description').most_starred_n(2).get()
+
+    assert list(result['stars']) == [900, 700]
+
+def test_column_projection(saved):
+    '''
+    Only the given columns should be loaded, and the filters on them should work.
+    '''
+    load, file_name = saved
+
+    analyzer = load(file_name, columns=['repo_name', 'stars'])
+
+    assert list(analyzer.get().columns) == ['repo_name', 'stars']
+    assert analyzer.minimum_stars(800).count() == 2
+
+def test_from_frame():
+    df = RepoAnalyzer(REPOS).get()
+
+    analyzer = RepoAnalyzer.from_frame(df.iloc[::-1])
+
+    assert to_repos(analyzer.maximum_forks(40).get()) == {repo for repo in REPOS if repo.forks <= 40}
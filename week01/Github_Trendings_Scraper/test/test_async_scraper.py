@@ -0,0 +1,70 @@
+'''
+This file tests the asynchronous scraping methods of RepoScraper.
+'''
+
+import asyncio
+import aiohttp
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper import RepoScraper
+from repo import GithubRepo
+import pytest
+
+ARTICLE = '''
+<article class="Box-row">
+    <h2><a class="Link"><span> {owner} /</span> {repo_name}</a></h2>
+    <p class="col-9">{description}</p>
+    <div class="f6">
+        <span><span></span><span itemprop="programmingLanguage">{language}</span></span>
+        <a class="Link">{stars}</a>
+        <a class="Link">{forks}</a>
+    </div>
+</article>
+'''
+
+@pytest.fixture(scope='function')
+def repo_scraper():
+    return RepoScraper() # Return new repo_scraper object
+
+def test_ascrape_page_successfull(mocker, repo_scraper):
+    '''
+    The page content returned by the fetch coroutine should be parsed
+    by the same extraction methods scrape_page uses.
+    '''
+    html = ARTICLE.format(owner='furkan', repo_name='cv-journey', description='desc',
+                          language='Python', stars='1,200', forks='30')
+    html += ARTICLE.format(owner='linus', repo_name='linux', description='kernel',
+                           language='C', stars='200,000', forks='60,000')
+    mock_fetch = mocker.patch.object(repo_scraper, '_afetch_page_content',
+                                     new=mocker.AsyncMock(return_value=html.encode()))
+
+    result = asyncio.run(repo_scraper.ascrape_page('weekly', session=mocker.Mock()))
+
+    assert result == {GithubRepo('furkan', 'cv-journey', 'desc', 'Python', 1200, 30),
+                      GithubRepo('linus', 'linux', 'kernel', 'C', 200000, 60000)}
+    assert mock_fetch.call_args.args[1] == RepoScraper._url_weekly
+
+def test_ascrape_page_failed_request(mocker, repo_scraper):
+    '''
+    If the request fails, an empty set should be returned.
+    '''
+    mocker.patch.object(repo_scraper, '_afetch_page_content',
+                        new=mocker.AsyncMock(return_value=None))
+
+    assert asyncio.run(repo_scraper.ascrape_page(session=mocker.Mock())) == set()
+
+def test_ascrape_page_connection_error(mocker, repo_scraper):
+    '''
+    A connection error should be handled like a failed request, not raised.
+    '''
+    session = mocker.Mock()
+    session.get.side_effect = aiohttp.ClientConnectionError('Connection reset')
+
+    assert asyncio.run(repo_scraper.ascrape_page(session=session)) == set()
+
+def test_invalid_since(repo_scraper):
+    '''
+    Only daily, weekly and monthly periods are valid.
+    '''
+    with pytest.raises(ValueError):
+        repo_scraper.scrape_page('yearly')
@@ -8,6 +8,8 @@ import sys, os
 # we can include repo.py file.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from repo import GithubRepo, InvalidAttributeError
+from dataclasses import FrozenInstanceError
+import numpy as np
 
 import pytest # Test framework
 
@@ -99,3 +101,84 @@ def test_to_dictionary(owner, repo_name, description,
     dict_ = repo.to_dict()
 
     assert dict_ == expected
+
+
+ROWS = [
+        ("furkan", "repo", "repo desc", "Python", 11, 10),
+        ("talha", "homework", "", "", 1, 0),
+        ("gürkan", "atm-machine", "useful ATM", "C", 100, 20),
+       ]
+
+
+def test_from_rows():
+    """
+    The objects created from rows should equal the objects created one by one,
+    and stay frozen.
+    """
+    repos = GithubRepo.from_rows(ROWS)
+
+    assert repos == [GithubRepo(*row) for row in ROWS]
+    assert GithubRepo.from_rows([]) == []
+    with pytest.raises(FrozenInstanceError):
+        repos[0].stars = 0
+
+
+def test_from_columns():
+    """
+    numpy arrays should be accepted, their values become Python objects.
+    """
+    columns = {name: list(values) for name, values in zip(GithubRepo.__slots__, zip(*ROWS))}
+    columns["stars"] = np.array(columns["stars"])
+
+    repos = GithubRepo.from_columns(columns)
+
+    assert repos == [GithubRepo(*row) for row in ROWS]
+    assert type(repos[0].stars) is int
+
+
+@pytest.mark.parametrize("row, message",
+                         [
+                            (("", "repo", "desc", "Python", 1, 1), "Row 1: Owner name"),
+                            (("fatih", " ", "desc", "Python", 1, 1), "Row 1: Repository name"),
+                            (("fatih", "repo", None, "Python", 1, 1), "Row 1: description is type of NoneType"),
+                            (("fatih", "repo", "desc", "Python", True, 1), "Row 1: stars is type of bool"),
+                            (("fatih", "repo", "desc", "Python", 1, -1), "Row 1: Shares cannot be negative"),
+                         ])
+def test_from_rows_failed(row, message):
+    """
+    The invalid row should be named in the error, with the message of the constructor.
+    """
+    with pytest.raises(InvalidAttributeError, match=message):
+        GithubRepo.from_rows([ROWS[0], row, ROWS[1]])
+
+
+def test_from_rows_trusted():
+    """
+    The trusted rows are not validated.
+    """
+    repos = GithubRepo.from_rows([("", "repo", "desc", "Python", -1, 1)], validate=False)
+
+    assert repos[0].stars == -1
+
+
+def test_from_rows_wrong_shape():
+    with pytest.raises(InvalidAttributeError):
+        GithubRepo.from_rows([("furkan", "repo", "desc", "Python", 1)])
+    with pytest.raises(InvalidAttributeError): # One value too many in a row.
+        GithubRepo.from_rows([ROWS[0], ROWS[1] + ("extra",)])
+    with pytest.raises(InvalidAttributeError):
+        GithubRepo.from_rows([ROWS[0], ROWS[1][:-1]])
+    with pytest.raises(InvalidAttributeError):
+        GithubRepo.from_columns({"owner": ["a", "b"], "repo_name": ["a"], "description": ["a"],
+                                 "language": ["a"], "stars": [1], "forks": [1]})
+
+
+def test_from_arrow_columns():
+    """
+    Arrow arrays and chunked arrays should be accepted as columns.
+    """
+    pa = pytest.importorskip("pyarrow")
+    columns = {name: pa.array(values) for name, values in zip(GithubRepo.__slots__, zip(*ROWS))}
+    columns["description"] = pa.chunked_array([columns["description"][:1], columns["description"][1:]])
+
+    assert GithubRepo.from_columns(columns) == [GithubRepo(*row) for row in ROWS]
@@ -0,0 +1,89 @@
+'''
+This file tests the metrics recorded while scraping and writing repositories.
+'''
+
+import json
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'common')))
+import metrics
+from scraper import RepoScraper
+from repo import GithubRepo, InvalidAttributeError
+from repo_writer import RepoWriter
+import pytest
+
+ARTICLE = '''
+<article class="Box-row">
+    <h2><a class="Link"><span> {owner} /</span> {repo_name}</a></h2>
+    <p class="col-9">desc</p>
+    <div class="f6">
+        <span><span></span><span itemprop="programmingLanguage">Python</span></span>
+        <a class="Link">{stars}</a>
+        <a class="Link">10</a>
+    </div>
+</article>
+'''
+
+@pytest.fixture(scope='function')
+def registry():
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+def test_scrape_page_metrics(mocker, registry, tmp_path):
+    '''
+    Every stage of scrape_page should be recorded, labeled with the scraper and the page.
+    '''
+    html = ARTICLE.format(owner='furkan', repo_name='cv-journey', stars='1,200')
+    html += '<article class="Box-row"></article>' # No repository can be extracted from this.
+    response = mocker.Mock(status_code=200, content=html.encode())
+    session = mocker.Mock()
+    session.get.return_value = response
+
+    result = RepoScraper(session=session).scrape_page('daily')
+    RepoWriter.save_to_JSON(str(tmp_path / 'repos.json'), result)
+
+    page = RepoScraper._url_daily
+    assert registry.histogram('scraper_fetch_seconds', scraper='RepoScraper', page=page).count == 1
+    assert registry.counter_value('scraper_fetch_total', status='200') == 1
+    assert registry.histogram('scraper_parse_seconds', page=page).count == 1
+    assert registry.histogram('scraper_extract_seconds', page=page).count == 2
+    assert registry.counter_value('scraper_items_total', page=page) == 1
+    assert registry.counter_value('scraper_invalid_items_total', page=page) == 1
+    assert registry.counter_value('writer_records_total', format='json') == 1
+
+def test_failed_request_metrics(mocker, registry):
+    '''
+    The status of failed requests should be counted.
+    '''
+    session = mocker.Mock()
+    session.get.return_value = mocker.Mock(status_code=503)
+
+    RepoScraper(session=session).scrape_page('weekly')
+
+    assert registry.counter_value('scraper_fetch_total', status='503') == 1
+    assert registry.histogram('scraper_parse_seconds').count == 0
+
+def test_validation_errors(registry):
+    with pytest.raises(InvalidAttributeError):
+        GithubRepo('furkan', 'cv-journey', 'desc', 'Python', -1, 0)
+
+    assert registry.counter_value('model_validation_errors_total', model='GithubRepo') == 1
+
+def test_export(registry, tmp_path):
+    '''
+    The JSON summary should merge the pages, the Prometheus file should keep them.
+    '''
+    registry.inc('scraper_items_total', 2, scraper='RepoScraper', page='a')
+    registry.inc('scraper_items_total', 3, scraper='RepoScraper', page='b')
+
+    registry.write_json(str(tmp_path / 'metrics.json'), exclude=('page',))
+    registry.write_prometheus(str(tmp_path / 'metrics.prom'))
+
+    with open(tmp_path / 'metrics.json', encoding='utf-8') as json_file:
+        summary = json.load(json_file)
+    assert summary['counters']['scraper_items_total'] == [{'labels': {'scraper': 'RepoScraper'}, 'value': 5}]
+    with open(tmp_path / 'metrics.prom', encoding='utf-8') as prom_file:
+        lines = prom_file.read().splitlines()
+    assert '# TYPE scraper_items_total counter' in lines
+    assert 'scraper_items_total{page="b",scraper="RepoScraper"} 3' in lines
@@ -7,6 +7,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from scraper import GithubRepo
 from repo_analyzer import RepoAnalyzer
 import json # To load sample repository data.
+import random
+import pandas as pd
 
 import pytest
 
@@ -177,3 +179,91 @@ class TestRepoAnalyzerManager:
         # Codmpare the result with expected result
         assert set_of_repos == test_case['result']
 
+
+def test_filters_around_most_starred():
+    '''
+    The filters before most_starred_n should select the repositories it ranks,
+    the filters after it should select from its result.
+    '''
+    repos = {GithubRepo('o', f'r{i}', 'python tool' if i % 2 else 'rust tool', 'Python', i * 100, i)
+             for i in range(10)}
+    analyzer = RepoAnalyzer(repos)
+
+    result = analyzer.with_substring('python', 'description').most_starred_n(3).get()
+    assert list(result['stars']) == [900, 700, 500]
+
+    result = analyzer.clear().most_starred_n(3).with_substring('python', 'description').get()
+    assert list(result['stars']) == [900, 700]
+    assert analyzer.minimum_forks(8).count() == 1
+
+def test_with_substring_literal_and_case():
+    '''
+    The substring is literal by default, regex=True keeps the regular expressions.
+    '''
+    repos = {GithubRepo('o', 'r1', 'A Python tool (beta)', 'Python', 10, 1),
+             GithubRepo('o', 'r2', 'python bindings', 'Python', 20, 2),
+             GithubRepo('o', 'r3', 'Rust engine', 'Rust', 30, 3)}
+    analyzer = RepoAnalyzer(repos)
+
+    assert analyzer.with_substring('(beta)', 'description').count() == 1
+    assert analyzer.clear().with_substring('PYTHON', 'description', case_sensitive=False).count() == 2
+    assert set(analyzer.clear().with_substring('^[Pp]ython|Rust', 'description', regex=True).get()['stars']) == {20, 30}
+    assert analyzer.clear().minimum_stars(15).with_substring('python', 'description').count() == 1
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_sorted_indexes_match_pandas(seed):
+    '''
+    The sorted indexes should give the rows of the column comparisons and of
+    nlargest, ties included, alone and after other filters.
+    '''
+    rng = random.Random(seed)
+    repos = {GithubRepo('o', f'r{i}', 'python' if rng.random() < 0.5 else 'rust', 'Python',
+                        rng.randint(0, 20), rng.randint(0, 5)) for i in range(200)}
+    analyzer = RepoAnalyzer(repos)
+    df = analyzer.df
+
+    assert analyzer.minimum_stars(7).get().equals(df[df['stars'] >= 7])
+    assert analyzer.clear().maximum_forks(2).minimum_stars(3).maximum_stars(15).get().equals(
+        df[(df['forks'] <= 2) & (df['stars'] >= 3) & (df['stars'] <= 15)])
+    assert analyzer.clear().most_starred_n(10).get().equals(df.nlargest(10, 'stars'))
+    assert analyzer.clear().most_forked_n(500).get().equals(df.nlargest(500, 'forks'))
+
+    python = df[df['description'] == 'python']
+    assert analyzer.clear().with_substring('python', 'description').most_forked_n(15).get().equals(
+        python.nlargest(15, 'forks'))
+    assert analyzer.clear().minimum_stars(100).count() == 0
+    assert analyzer.clear().most_starred_n(0).count() == 0
+
+    # The second top n breaks the ties by the order of the first one.
+    assert analyzer.clear().most_forked_n(60).most_starred_n(20).get().equals(
+        df.nlargest(60, 'forks').nlargest(20, 'stars'))
+    assert analyzer.clear().most_starred_n(200).most_forked_n(200).get().equals(
+        df.nlargest(200, 'stars').nlargest(200, 'forks'))
+
+def test_column_types(sample_repos):
+    '''
+    The columns should have fixed dtypes, whatever way the analyzer is built.
+    '''
+    df = RepoAnalyzer(sample_repos).get()
+
+    assert df['stars'].dtype == 'int64' and df['forks'].dtype == 'int64'
+    assert isinstance(df['language'].dtype, pd.CategoricalDtype)
+    assert list(df.columns) == list(GithubRepo.__slots__)
+
+def test_from_columns(sample_repos):
+    '''
+    The raw columns should give the same DataFrame as the GithubRepo objects.
+    '''
+    repos = list(sample_repos)
+    columns = {name: [getattr(repo, name) for repo in repos] for name in GithubRepo.__slots__}
+
+    analyzer = RepoAnalyzer.from_columns(columns)
+
+    assert analyzer.get().equals(RepoAnalyzer(repos).get())
+    assert analyzer.minimum_stars(0).count() == len(repos)
+
+def test_empty_analyzer():
+    analyzer = RepoAnalyzer(set())
+
+    assert list(analyzer.get().columns) == list(GithubRepo.__slots__)
+    assert analyzer.minimum_stars(10).most_forked_n(3).with_substring('python', 'description').count() == 0
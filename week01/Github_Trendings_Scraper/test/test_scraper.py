@@ -146,3 +146,90 @@ def test_scrape_page_successfull(fetch_data_res, repos, mocker, repo_scraper):
         assert repos_set == set(valid_repos)   
 
 
+
+def test_fetch_with_session(mocker):
+    '''
+    If a session is given, the page should be fetched through it
+    instead of requests.get.
+    '''
+    get_mock = mocker.patch("scraper.requests.get")
+    session = mocker.Mock()
+    session.get.return_value = mocker.Mock(status_code=200, content=b"<p></p>")
+
+    soup = RepoScraper(session=session)._fetch_page_data(RepoScraper._url_daily)
+
+    assert soup is not None
+    session.get.assert_called_once_with(RepoScraper._url_daily)
+    assert get_mock.call_count == 0
+
+def test_create_session():
+    '''
+    The session should pool pool_size connections per host and
+    send the default headers.
+    '''
+    session = scraper.create_session(pool_size=4, headers={'X-Run': '1'})
+
+    assert session.get_adapter('https://github.com')._pool_maxsize == 4
+    assert session.headers['User-Agent'] == scraper.DEFAULT_HEADERS['User-Agent']
+    assert session.headers['X-Run'] == '1'
+
+TRENDING_PAGE = '''
+<html><body>
+<div class="Box">
+    <div class="Box-header"><a class="Link" href="/trending">Repositories</a></div>
+    <article class="Box-row">
+        <h2 class="h3 lh-condensed"><a class="Link" href="/furkan/cv-journey">
+            <span class="text-normal"> furkan /</span> cv-journey</a></h2>
+        <p class="col-9 color-fg-muted my-1 pr-4">  Computer vision &amp; learning  </p>
+        <div class="f6 color-fg-muted mt-2">
+            <span class="d-inline-block ml-0 mr-3"><span class="repo-language-color"></span>
+            <span itemprop="programmingLanguage">Python</span></span>
+            <a class="Link" href="/furkan/cv-journey/stargazers">1,234</a>
+            <a class="Link" href="/furkan/cv-journey/forks">56</a>
+        </div>
+    </article>
+    <article class="Box-row">
+        <h2><a class="Link" href="/linus/linux"><span> linus /</span> linux</a></h2>
+        <div class="f6"><a class="Link">200,000</a><a class="Link">60,000</a></div>
+    </article>
+</div>
+</body></html>
+'''.encode()
+
+@pytest.mark.parametrize("parser, restrict",
+                         [
+                            ('html.parser', False),
+                            ('html.parser', True),
+                            ('lxml', False),
+                            ('lxml', True),
+                             ])
+def test_parser_backends(parser, restrict, mocker):
+    '''
+    All the parser backends should extract exactly the same repositories.
+    '''
+    session = mocker.Mock()
+    session.get.return_value = mocker.Mock(status_code=200, content=TRENDING_PAGE)
+
+    result = RepoScraper(session=session, parser=parser, restrict=restrict).scrape_page()
+
+    assert result == {GithubRepo('furkan', 'cv-journey', 'Computer vision & learning', 'Python', 1234, 56),
+                      GithubRepo('linus', 'linux', '', '', 200000, 60000)}
+
+def test_invalid_parser():
+    with pytest.raises(ValueError):
+        RepoScraper(parser='html5')
+
+def test_fetch_throttled_page(mocker):
+    '''
+    With a ThrottledSession, a 429 response should be retried
+    after its Retry-After header instead of losing the page.
+    '''
+    from throttle import ThrottledSession
+    session = mocker.Mock()
+    session.get.side_effect = [mocker.Mock(status_code=429, headers={'Retry-After': '0'}),
+                               mocker.Mock(status_code=200, content=b"<p></p>")]
+
+    soup = RepoScraper(session=ThrottledSession(session, rate=1000))._fetch_page_data(RepoScraper._url_daily)
+
+    assert soup is not None
+    assert session.get.call_count == 2
@@ -0,0 +1,62 @@
+'''
+This file tests the trigram index.
+'''
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from trigram import TrigramIndex
+import numpy as np
+import pytest
+
+VALUES = ['A Python web framework', 'Rust game engine', 'python bindings for Rust', 'Go', None]
+
+@pytest.mark.parametrize('substring, case_sensitive, expected', [
+    ['Python', True, [0]],
+    ['python', False, [0, 2]],
+    ['Rust', True, [1, 2]],
+    ['ust g', True, [1]],
+    ['missing', True, []],
+    ['Go', True, [3]], # Shorter than a trigram, every row is checked.
+    ['', True, [0, 1, 2, 3, 4]],
+    ['.*', True, []], # Literal, not a regular expression.
+])
+def test_contains(substring, case_sensitive, expected):
+    index = TrigramIndex(VALUES, case_sensitive)
+
+    assert list(np.flatnonzero(index.contains(substring))) == expected
+
+def test_candidates_are_verified():
+    '''
+    A row with all the trigrams but not the substring should not match.
+    '''
+    index = TrigramIndex(['abcXbcd', 'abcd'])
+
+    assert list(index.candidates('abcd')) == [0, 1]
+    assert list(index.contains('abcd')) == [False, True]
+
+def test_contains_in_rows():
+    index = TrigramIndex(VALUES, case_sensitive=False)
+
+    assert list(index.contains('rust', np.array([2, 0, 1]))) == [True, False, True]
+
+def test_selectivity():
+    index = TrigramIndex(VALUES)
+
+    assert index.selectivity('Rust') == pytest.approx(2 / len(VALUES))
+    assert index.selectivity('ab') == 1.0
+    assert TrigramIndex([]).selectivity('Rust') == 0.0
+
+def test_unicode():
+    index = TrigramIndex(['Çok hızlı bir araç 🚀🚀', 'fast'], case_sensitive=False)
+
+    assert list(index.contains('ARAÇ')) == [True, False]
+    assert list(index.contains('🚀🚀')) == [True, False]
+
+def test_short_substring_in_rows():
+    '''
+    The substrings shorter than a trigram are scanned, in the given rows only.
+    '''
+    index = TrigramIndex(VALUES, case_sensitive=False)
+
+    assert list(index.contains('GO', [4, 3, 1])) == [False, True, False]
+    assert list(index.contains('.', np.array([0, 1]))) == [False, False]
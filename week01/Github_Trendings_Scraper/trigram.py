@@ -0,0 +1,132 @@
+'''
+This file implements a trigram index for finding the strings
+that contain a substring without scanning all of them.
+
+Every string is split into its trigrams (the substrings of 3 characters),
+and every trigram is packed into an integer: 21 bits for each character.
+A string can only contain the substring if it has all the trigrams of the
+substring, so the index intersects the rows of those trigrams and only the
+rows left are checked with the in operator.
+'''
+
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd # For the substrings shorter than a trigram.
+
+def _code_points(value: str) -> np.ndarray:
+    '''
+    Returns the code points of the characters of the string.
+    '''
+    return np.frombuffer(value.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+def _keys(code_points: np.ndarray) -> np.ndarray:
+    '''
+    Returns the integer keys of the trigrams starting at every position but the last two.
+    '''
+    return (code_points[:-2] << 42) | (code_points[1:-1] << 21) | code_points[2:]
+
+def _intersect(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    '''
+    Returns the values in both sorted arrays of unique values.
+    '''
+    if len(first) > len(second):
+        first, second = second, first
+    if len(first) == 0:
+        return first
+    found = np.minimum(np.searchsorted(second, first), len(second) - 1)
+    return first[second[found] == first]
+
+class TrigramIndex:
+    '''
+    A trigram index of a column of strings, the rows are their positions.
+    If case_sensitive is False, the strings and the substrings are compared casefolded.
+    Values which are not strings are indexed as empty strings.
+    '''
+    def __init__(self, values: Iterable[str], case_sensitive: bool = True):
+        self.case_sensitive = case_sensitive
+        self.__values = [self.__normalize(value if isinstance(value, str) else '') for value in values]
+        self.size = len(self.__values)
+        self.__series = None # The values as a Series, built for the first short substring.
+
+        # The trigrams of all the strings at once, from their characters joined together.
+        lengths = np.fromiter(map(len, self.__values), dtype=np.int64, count=self.size)
+        code_points = _code_points(''.join(self.__values))
+        keys = _keys(code_points) if len(code_points) >= 3 else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(self.size, dtype=np.int32), lengths)[:len(keys)]
+        # Positions in the string, the trigrams going over the end of a string are dropped.
+        positions = np.arange(len(keys)) - np.repeat(np.cumsum(lengths) - lengths, lengths)[:len(keys)]
+        valid = positions <= lengths[rows] - 3
+        keys, rows = keys[valid], rows[valid]
+
+        # The rows of every trigram, grouped by the trigram: the rows of the trigram
+        # keys[i] are rows[offsets[i]:offsets[i + 1]], in order and once.
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], rows[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        keys, self.__rows = keys[first], rows[first]
+        starts = np.flatnonzero(np.append(len(keys) > 0, keys[1:] != keys[:-1]))
+        self.__keys = keys[starts]
+        self.__offsets = np.append(starts, len(keys))
+
+    def candidates(self, substring: str) -> Optional[np.ndarray]:
+        '''
+        Returns the sorted rows which have all the trigrams of the substring,
+        None if the substring is shorter than a trigram, then every row is a candidate.
+        '''
+        substring = self.__normalize(substring)
+        if len(substring) < 3:
+            return None
+        keys = np.unique(_keys(_code_points(substring)))
+        found = np.searchsorted(self.__keys, keys)
+        if np.any(found == len(self.__keys)) or np.any(self.__keys[found] != keys):
+            return np.zeros(0, dtype=np.int32) # No row has all of them.
+        postings = [self.__rows[self.__offsets[i]:self.__offsets[i + 1]] for i in found.tolist()]
+        postings.sort(key=len) # The rarest first, so the intersections stay small.
+        rows = postings[0]
+        for other in postings[1:]:
+            rows = _intersect(rows, other)
+            if len(rows) == 0:
+                break
+        return rows
+
+    def contains(self, substring: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        '''
+        Returns a boolean array telling which of the rows contain the
+        substring, for all the rows if rows is None.
+        Only the candidates of the index are checked. A substring shorter than a
+        trigram has no candidates, then the values are scanned with Series.str.contains.
+        '''
+        candidates = self.candidates(substring)
+        if candidates is None:
+            if self.__series is None:
+                self.__series = pd.Series(self.__values, dtype=str)
+            values = self.__series if rows is None else self.__series.iloc[np.asarray(rows)]
+            return values.str.contains(self.__normalize(substring), regex=False).to_numpy(dtype=bool)
+        if rows is None:
+            rows = np.arange(self.size)
+            checked = candidates # The rows are their positions.
+        else:
+            rows = np.asarray(rows)
+            if len(candidates) == 0:
+                checked = np.zeros(0, dtype=np.int64)
+            else:
+                found = np.minimum(np.searchsorted(candidates, rows), len(candidates) - 1)
+                checked = np.flatnonzero(candidates[found] == rows)
+
+        substring = self.__normalize(substring)
+        result = np.zeros(len(rows), dtype=bool)
+        result[checked] = [substring in self.__values[row] for row in rows[checked].tolist()]
+        return result
+
+    def selectivity(self, substring: str) -> float:
+        '''
+        Estimated fraction of the rows containing the substring: the fraction of the candidates.
+        '''
+        candidates = self.candidates(substring)
+        if candidates is None or self.size == 0:
+            return 1.0 if self.size else 0.0
+        return len(candidates) / self.size
+
+    def __normalize(self, value: str) -> str:
+        return value if self.case_sensitive else value.casefold()
@@ -0,0 +1,84 @@
+"""
+Checkpoint journal of a scraping run.
+
+Every completed page is appended to the journal with the data extracted
+from it, as one JSON line: {"url": "...", "records": [...]}. If the run
+dies, the next run resumes from the journal: the pages in it are not
+fetched again, their data is read from the journal instead.
+"""
+
+from typing import Dict, List
+import json
+import os
+
+class CheckpointJournal:
+    """
+    A JSON Lines journal of the completed pages, keyed by the page URL.
+    If resume is True, the pages of an existing journal are loaded and new
+    pages are appended to it, otherwise the journal is started empty.
+    A line left half written by a crash is removed when the journal is loaded,
+    a line that cannot be read is skipped.
+    Every line is flushed as soon as it is written, if fsync is True it is also
+    forced to the disk, so it survives a crash of the machine and not only of
+    the process.
+    """
+    def __init__(self, path: str, resume: bool = True, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.__pages: Dict[str, List[dict]] = {}
+        if resume and os.path.exists(path):
+            self.__load()
+        self.__file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def completed(self, url: str) -> bool:
+        """
+        Returns whether the page is in the journal.
+        """
+        return url in self.__pages
+
+    def records(self, url: str) -> List[dict]:
+        """
+        Returns the records of a completed page.
+        """
+        return self.__pages[url]
+
+    def record(self, url: str, records: List[dict]):
+        """
+        Appends a completed page and its records to the journal.
+        """
+        self.__file.write(json.dumps({"url": url, "records": records}, ensure_ascii=False) + "\n")
+        self.__file.flush()
+        if self.fsync:
+            os.fsync(self.__file.fileno())
+        self.__pages[url] = records
+
+    def __len__(self) -> int:
+        return len(self.__pages)
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __load(self):
+        """
+        Reads the completed pages. A line that cannot be read is skipped, the pages
+        after it are kept. A last line without its end, half written by a crash, is cut.
+        """
+        size = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break # Half written by a crash, always the last line.
+                size += len(line)
+                try:
+                    entry = json.loads(line)
+                    self.__pages[entry["url"]] = entry["records"]
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                    continue
+        if size != os.path.getsize(self.path):
+            os.truncate(self.path, size)
@@ -0,0 +1,205 @@
+"""
+Deduplication of scraped items across pages and runs.
+
+Items are identified by a hash of their normalized content (content_hash),
+so the same quote is found again even if pagination shifted it to another
+page. Two indexes keep the hashes:
+   * ExactIndex: a set of the hashes, never wrong, 16 bytes per item.
+   * BloomIndex: a Bloom filter of a fixed size for very large archives.
+     It may take a new item for a duplicate with probability error_rate,
+     but never lets a duplicate through.
+Both can be saved into a file and loaded by the next run, see open_index.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+import hashlib
+import math
+import os
+import struct
+
+T = TypeVar("T")
+
+_MAGIC = b"QSDX"
+_HEADER = struct.Struct("<4sBQQQ") # magic, kind, count, number of bits, number of hashes
+_EXACT, _BLOOM = 0, 1
+DIGEST_SIZE = 16
+
+def content_hash(*fields: str) -> bytes:
+    """
+    Returns the hash of the fields, after normalizing them: case and
+    whitespace differences and the quotation marks around them are ignored.
+    """
+    normalized = (" ".join(str(value).split()).strip("\"'“”‘’ ").casefold() for value in fields)
+    return hashlib.blake2b("\x1f".join(normalized).encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+class DedupIndex(ABC):
+    """
+    Abstract base class of the indexes.
+    If the index has a path, it is saved there at the end of a with block.
+    """
+    path: Optional[str] = None
+
+    @abstractmethod
+    def add(self, key: bytes) -> bool:
+        """
+        Adds the key, returns whether it was new.
+        """
+
+    @abstractmethod
+    def __contains__(self, key: bytes) -> bool:
+        """
+        Returns whether the key is in the index.
+        """
+
+    @abstractmethod
+    def save(self, path: Optional[str] = None):
+        """
+        Saves the index into path, or into the path of the index if it is None.
+        """
+
+    def unique(self, items: Iterable[T], key: Callable[[T], bytes]) -> Iterator[T]:
+        """
+        Yields the items whose key is not in the index yet, and adds them.
+        """
+        for item in items:
+            if self.add(key(item)):
+                yield item
+
+    def __enter__(self) -> "DedupIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.path is not None:
+            self.save()
+
+    def _write(self, path: Optional[str], kind: int, count: int, bits: int, hashes: int, payload: bytes):
+        """
+        Writes the index into a temporary file and renames it, so a crash
+        never leaves a half written index.
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("The index has no path to be saved into.")
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, kind, count, bits, hashes))
+            file.write(payload)
+        os.replace(temporary_path, path)
+
+class ExactIndex(DedupIndex):
+    """
+    Keeps every hash in a set.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.__keys = set()
+
+    def add(self, key: bytes) -> bool:
+        if key in self.__keys:
+            return False
+        self.__keys.add(key)
+        return True
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self.__keys
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def save(self, path: Optional[str] = None):
+        self._write(path, _EXACT, len(self.__keys), 0, 0, b"".join(self.__keys))
+
+    @classmethod
+    def _from_payload(cls, path: str, count: int, payload: bytes) -> "ExactIndex":
+        index = cls(path)
+        index.__keys = {payload[i:i + DIGEST_SIZE] for i in range(0, count * DIGEST_SIZE, DIGEST_SIZE)}
+        return index
+
+class BloomIndex(DedupIndex):
+    """
+    A Bloom filter sized for capacity items with the given false positive rate.
+    After more than capacity items are added, the false positive rate grows.
+    """
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001, path: Optional[str] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1.")
+
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal number of bits and hash functions for the capacity and the error rate.
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.__array = bytearray((self.bits + 7) // 8)
+        self.__count = 0
+
+    def add(self, key: bytes) -> bool:
+        new = False
+        for position in self.__positions(key):
+            mask = 1 << (position & 7)
+            if not self.__array[position >> 3] & mask:
+                self.__array[position >> 3] |= mask
+                new = True
+        if new:
+            self.__count += 1
+        return new
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.__array[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+    def __len__(self) -> int:
+        """
+        Number of items added, the false positives are not counted.
+        """
+        return self.__count
+
+    def save(self, path: Optional[str] = None):
+        self._write(path, _BLOOM, self.__count, self.bits, self.hashes, bytes(self.__array))
+
+    def __positions(self, key: bytes) -> Iterator[int]:
+        """
+        Bit positions of the key, by double hashing the two halves of its hash.
+        """
+        first = int.from_bytes(key[:8], "little")
+        second = int.from_bytes(key[8:16], "little") | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    @classmethod
+    def _from_payload(cls, path: str, count: int, bits: int, hashes: int, payload: bytes) -> "BloomIndex":
+        index = cls.__new__(cls)
+        index.path = path
+        index.capacity = None # Not needed once the size is known.
+        index.error_rate = None
+        index.bits = bits
+        index.hashes = hashes
+        index.__array = bytearray(payload)
+        index.__count = count
+        return index
+
+def load_index(path: str) -> DedupIndex:
+    """
+    Loads an index saved with save.
+    """
+    with open(path, "rb") as file:
+        magic, kind, count, bits, hashes = _HEADER.unpack(file.read(_HEADER.size))
+        payload = file.read()
+    if magic != _MAGIC or kind not in (_EXACT, _BLOOM):
+        raise ValueError(f"{path} is not a deduplication index.")
+    if kind == _EXACT:
+        return ExactIndex._from_payload(path, count, payload)
+    return BloomIndex._from_payload(path, count, bits, hashes, payload)
+
+def open_index(path: Optional[str] = None, bloom: bool = False, capacity: int = 1_000_000,
+               error_rate: float = 0.001) -> DedupIndex:
+    """
+    Loads the index in path if the file exists, otherwise creates a new one,
+    a BloomIndex if bloom is True. Use it in a with block to save it at the end.
+    """
+    if path is not None and os.path.exists(path):
+        return load_index(path)
+    if bloom:
+        return BloomIndex(capacity, error_rate, path)
+    return ExactIndex(path)
@@ -0,0 +1,124 @@
+"""
+Logging setup of the scraper.
+
+scraper.py calls configure_logging when it is imported, so the records are
+written into logs.log. The records are put on a queue and a background
+thread formats and writes them, so a log call in the scraping loop never
+waits for the file. Set the QUOTESCRAPER_LOG_CONFIG environment variable
+to "0" before importing the scraper to keep the logging configuration of
+the application instead.
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import atexit
+import collections
+import itertools
+import logging
+import os
+import queue
+
+LOG_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+# Name of the environment variable that turns off the configuration at import time.
+CONFIG_ENV_VAR = "QUOTESCRAPER_LOG_CONFIG"
+
+_handler: Optional["_ProcessQueueHandler"] = None
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets the first record of every message through, then one of every
+    `every` records with the same message. The message is compared before
+    the arguments are merged, so "Scraping page: %s" is one message
+    for all the pages.
+    """
+    def __init__(self, every: int):
+        super().__init__()
+        if every < 1:
+            raise ValueError("every must be at least 1.")
+        self.every = every
+        self.__counters = collections.defaultdict(itertools.count) # next() is atomic, no lock needed.
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return next(self.__counters[(record.name, record.msg)]) % self.every == 0
+
+class _ProcessQueueHandler(QueueHandler):
+    """
+    Puts the records on the queue of the listener.
+    A forked process (the parsers of scrape_pages_pipelined) has no listener
+    thread, so it writes its records with the handlers of the listener instead,
+    like the process does after stop_logging.
+    """
+    def __init__(self, log_queue: queue.SimpleQueue, listener: QueueListener):
+        super().__init__(log_queue)
+        self.listener = listener
+        self.pid = os.getpid()
+        self.stopped = False
+
+    def emit(self, record: logging.LogRecord):
+        if os.getpid() == self.pid and not self.stopped:
+            super().emit(record)
+        else:
+            self.listener.handle(record)
+
+def configure_logging(filename: str = "logs.log", level: int = logging.INFO,
+                      queued: bool = True, sample_every: Optional[int] = None,
+                      force: bool = False) -> bool:
+    """
+    Configures the root logger to write into the file.
+       * queued       : Log calls only put the record on a queue, a background
+                        thread writes it. Otherwise the file is written directly.
+       * sample_every : If it is given, only one of every sample_every records
+                        with the same message is logged (see SamplingFilter).
+       * force        : Replaces the handlers of the root logger. Otherwise nothing
+                        is done if the root logger already has handlers, like
+                        logging.basicConfig.
+    Returns True if the root logger is configured.
+    """
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return False
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+    file_handler = logging.FileHandler(filename, mode="a", encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if queued:
+        global _handler
+        log_queue = queue.SimpleQueue() # Unbounded, a log call never blocks.
+        listener = QueueListener(log_queue, file_handler)
+        handler = _handler = _ProcessQueueHandler(log_queue, listener)
+        listener.start()
+    else:
+        handler = file_handler
+    if sample_every is not None:
+        handler.addFilter(SamplingFilter(sample_every))
+
+    root.addHandler(handler)
+    root.setLevel(level)
+    return True
+
+def stop_logging():
+    """
+    Writes the records left on the queue and stops the background thread,
+    the later records are written directly.
+    Called at exit, call it earlier to read a complete log file.
+    """
+    global _handler
+    if _handler is not None:
+        _handler.stopped = True
+        _handler.listener.stop()
+        _handler = None
+
+def configure_from_environment() -> bool:
+    """
+    Configures logging at import time, unless the QUOTESCRAPER_LOG_CONFIG
+    environment variable is "0".
+    """
+    if os.environ.get(CONFIG_ENV_VAR, "1") == "0":
+        return False
+    return configure_logging()
+
+atexit.register(stop_logging)
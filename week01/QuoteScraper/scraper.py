@@ -7,26 +7,78 @@ on this data using Pandas.
 """
 
 from abc import ABC, abstractmethod # For creating abstract classes.
-from typing import Any, List, Optional # For type hints.
+from typing import Any, Iterable, Iterator, List, Optional # For type hints.
+import os
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait # For concurrency.
+import copy
+import queue # For passing the fetched pages to the parser processes.
+import asyncio # For scraping pages inside an event loop.
 import logging
+import threading
 import csv # For saving book data in CSV files.
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from urllib.parse import urljoin
 import json # For loading book data in JSON files.
-from bs4 import BeautifulSoup, Tag # For parsing HTML data.
+from bs4 import BeautifulSoup, SoupStrainer, Tag # For parsing HTML data.
 import pandas as pd # For converting book data into DataFrames and make analysis.
+import numpy as np # For the tag bitmaps.
 import requests # To make GET requests to web pages.
+from requests.adapters import HTTPAdapter # For connection pooling.
+import aiohttp # To make GET requests to web pages without blocking the event loop.
 import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common")) # The modules shared with Github_Trendings_Scraper.
+import metrics # For recording the metrics of the stages.
+import log_config # For writing the logs in a background thread.
+from throttle import ThrottledSession # For staying under the rate limits of the site.
+from checkpoint import CheckpointJournal # For resuming interrupted runs.
+from dedup import DedupIndex, ExactIndex, content_hash # For removing the duplicate items.
+from query_plan import Predicate, QueryPlan, take # For running the analyzer filters together.
+from search import SearchIndex # For the full-text search of the quotes.
+try:
+    from selectolax.lexbor import LexborHTMLParser # Optional, fast C based HTML parser.
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import pyarrow as pa # Optional, for the Parquet and Arrow files.
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
 
-# Dosyanın en üstünde
-logging.basicConfig(
-    format="%(levelname)s:%(name)s:%(message)s", # Düzeltildi: mesaj bitimine %s eklendi
-    filename="logs.log", 
-    filemode="a",
-    level=logging.INFO # Düzeltildi: INFO seviyesindeki mesajları aktif eder
-)
+# Writes INFO records into logs.log from a background thread,
+# QUOTESCRAPER_LOG_CONFIG=0 turns it off (see log_config).
+log_config.configure_from_environment()
 logger = logging.getLogger(__name__)
 
+# Headers sent with every request made by a session from create_session.
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; QuoteScraper/1.0)",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+def create_session(pool_size: int = 10, headers: Optional[dict] = None) -> requests.Session:
+    """
+    Creates a requests.Session that keeps connections alive and reuses them,
+    so a page does not need a new TCP/TLS handshake.
+    pool_size is the number of connections kept open per host, it should be
+    at least the number of workers given to scrape_pages.
+    headers are merged on top of DEFAULT_HEADERS and sent with every request.
+    The same session should be shared by all the scrapers of a run.
+    """
+    if pool_size < 1:
+        raise ValueError("pool_size must be at least 1.")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers is not None:
+        session.headers.update(headers)
+    return session
+
 class QuoteValueInvalidException(ValueError):
     """
     Raised when quote text or author is None or have length of 0.
@@ -51,6 +103,17 @@ class Quote:
         This function used for validating quote data.
         If any of the values are not valid, a QuoteValueInvalidException is raised.
         """
+        # Only the errors are counted, timing every object would cost more than the validation.
+        try:
+            self._validate()
+        except QuoteValueInvalidException:
+            metrics.registry.inc("model_validation_errors_total", model="Quote")
+            raise
+
+    def _validate(self):
+        """
+        Validates and strips the quote data, see __post_init__.
+        """
         if self.text is None:
             raise QuoteValueInvalidException("Text attribute is None")
         elif self.author is None:
@@ -87,14 +150,56 @@ class PageURLCreator:
     def baseurl(self, url: str):
         self.url = url
 
+# The scraper used by a parser process of scrape_pages_pipelined.
+_worker_scraper = None
+
+def _init_parse_worker(scraper: "BaseMultiPageScraper"):
+    """
+    Stores the scraper that the parser process will use.
+    """
+    global _worker_scraper
+    _worker_scraper = scraper
+
+def _parse_in_worker(content: bytes) -> List[Any]:
+    """
+    Parses a page in a parser process.
+    """
+    return _worker_scraper._parse_page(content)
+
+_FETCHER_DONE = object() # Put into the page queue when a fetcher thread finishes.
+
+# Parsers that can be given to the scrapers.
+# "html.parser" and "lxml" are BeautifulSoup backends, "selectolax" needs the selectolax package.
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
 ## TESTED and SUCCESSFULL
 
 class BaseMultiPageScraper(ABC):
     """
     This is an abstract base class for a Scraper class which can scrape multiple pages
     """
-    def __init__(self, url_creator: PageURLCreator):
+    # The elements scrape_page reads. Subclasses set it, so that
+    # restrict=True builds only these subtrees instead of the whole page.
+    parse_only: Optional[SoupStrainer] = None
+
+    def __init__(self, url_creator: PageURLCreator, session: Optional[requests.Session] = None,
+                 parser: str = "html.parser", restrict: bool = False):
+        """
+        session is used for all the requests if it is given (see create_session,
+        or http_cache.CachedSession to cache the pages on disk), otherwise every
+        request opens a new connection.
+        parser is one of PARSER_BACKENDS. If restrict is True, BeautifulSoup builds
+        only the elements in parse_only.
+        """
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"parser must be one of {PARSER_BACKENDS}, not {parser!r}")
+        if parser == "selectolax" and LexborHTMLParser is None:
+            raise ImportError("The selectolax parser needs the selectolax package.")
+
         self.url_creator = url_creator
+        self.session = session
+        self.parser = parser
+        self.restrict = restrict
 
     @abstractmethod
     def extract_data(self, element: Tag) -> Optional[Any]:
@@ -108,33 +213,516 @@ class BaseMultiPageScraper(ABC):
         Scrapes all the data in the given soup object.
         """
 
+    @abstractmethod
+    def scrape_tree(self, tree: Any) -> List[Any]:
+        """
+        Scrapes all the data in the given selectolax tree.
+        Same as scrape_page, for the selectolax parser.
+        """
+
+    def has_next_page(self, soup: BeautifulSoup) -> Optional[bool]:
+        """
+        Returns whether the page in the soup links to a next page.
+        None means the scraper cannot tell, then an empty page ends the pagination.
+        Subclasses override it to follow the "next" link of their site.
+        """
+        return None
+
+    def has_next_tree(self, tree: Any) -> Optional[bool]:
+        """
+        Same as has_next_page, for the selectolax parser.
+        """
+        return None
+
+    def item_to_dict(self, item: Any) -> dict:
+        """
+        Converts a scraped item into a dictionary that can be saved as JSON,
+        for the checkpoint journal. Works for dataclass items.
+        """
+        return asdict(item)
+
+    @abstractmethod
+    def item_from_dict(self, data: dict) -> Any:
+        """
+        Creates the item back from the dictionary of item_to_dict,
+        for resuming from the checkpoint journal.
+        """
+
+    @abstractmethod
+    def item_key(self, item: Any) -> bytes:
+        """
+        Returns the hash that identifies the item for deduplication (see dedup.content_hash).
+        """
+
     ## TESTED and SUCCESSFULL
-    def scrape_pages(self, start_page: int, end_page:  int) -> List[Any]:
+    def scrape_pages(self, start_page: int, end_page:  int,
+                     workers: int = 1, max_in_flight: Optional[int] = None,
+                     checkpoint: Optional[str] = None, resume: bool = True,
+                     dedup: Optional[DedupIndex] = None) -> List[Any]:
         """
         Scrapes data from all the pages starting from page startPage to endPage.
+        If workers is greater than 1, pages are fetched concurrently by a thread pool
+        and at most max_in_flight requests are sent at the same time (defaults to workers).
+        Results are always returned in page order, failed pages are skipped.
+        If checkpoint is a file path, every completed page is saved into that journal
+        with its data as soon as it is scraped. With resume, the pages already in the
+        journal are not fetched again, their data is read from the journal, so a run
+        that died continues where it stopped. Failed pages are not saved, so they are
+        retried by the next run. resume=False starts a new journal.
+        If dedup is given (see dedup.open_index), the items already in the index, from
+        this run or from the runs that saved it, are skipped (see item_key).
         """
-        logger.info("Started scraping pages")
         obj_list = [] # Empty list initially
+        for page_objs in self.iter_pages(start_page, end_page, workers, max_in_flight,
+                                         checkpoint, resume, dedup):
+            obj_list.extend(page_objs)
+        return obj_list
+
+    def iter_pages(self, start_page: int, end_page: int,
+                   workers: int = 1, max_in_flight: Optional[int] = None,
+                   checkpoint: Optional[str] = None, resume: bool = True,
+                   dedup: Optional[DedupIndex] = None) -> Iterator[List[Any]]:
+        """
+        Same as scrape_pages, but yields the data of each page as soon as it is scraped,
+        in page order. Failed pages yield an empty list.
+        Only a few pages are kept in memory at a time, whatever the number of pages is.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        return self._iter_pages(start_page, end_page, workers, max_in_flight or workers,
+                                checkpoint, resume, dedup)
+
+    def _iter_pages(self, start_page: int, end_page: int, workers: int, max_in_flight: int,
+                    checkpoint: Optional[str] = None, resume: bool = True,
+                    dedup: Optional[DedupIndex] = None) -> Iterator[List[Any]]:
+        """
+        Generator of iter_pages. The arguments are checked by iter_pages, so that
+        invalid arguments raise an error before the iteration starts.
+        The journal keeps the items which passed dedup, so the pages read from it are
+        not deduplicated again, their keys are only added to the index (it may not have
+        been saved by the run that died).
+        """
+        logger.info("Started scraping pages")
+        journal = CheckpointJournal(checkpoint, resume) if checkpoint is not None else None
+        try:
+            for page_url, page_objs in self._scrape_page_range(start_page, end_page, workers,
+                                                               max_in_flight, journal):
+                if page_objs is None:
+                    yield [] # Failed, not saved so that the next run retries it.
+                    continue
+                replayed = journal is not None and journal.completed(page_url)
+                if dedup is not None and replayed:
+                    for obj in page_objs:
+                        dedup.add(self.item_key(obj))
+                elif dedup is not None:
+                    page_objs = list(dedup.unique(page_objs, self.item_key))
+                if journal is not None and not replayed:
+                    journal.record(page_url, [self.item_to_dict(obj) for obj in page_objs])
+                yield page_objs
+        finally:
+            if journal is not None:
+                journal.close()
+
+    def _unique_pages(self, pages: Iterator[List[Any]], dedup: DedupIndex) -> Iterator[List[Any]]:
+        """
+        Removes the items already in the dedup index from the pages, for iter_all_pages.
+        """
+        for page_objs in pages:
+            yield list(dedup.unique(page_objs, self.item_key))
 
-        for page in range(start_page, end_page+1):
-            # Create the URL for current page
+    def _scrape_page_range(self, start_page: int, end_page: int, workers: int, max_in_flight: int,
+                           journal: Optional[CheckpointJournal]) -> Iterator[tuple[str, Optional[List[Any]]]]:
+        """
+        Yields the URL and the data of every page in page order, None as the data
+        of a failed page. The pages in the journal are read from it instead of being fetched.
+        """
+        # URLs are created in page order, one at a time.
+        page_urls = (self.url_creator.create_url_of_page_number(page)
+                     for page in range(start_page, end_page+1))
+
+        if workers == 1:
+            for page_url in page_urls:
+                if journal is not None and journal.completed(page_url):
+                    yield page_url, self.__journal_items(journal, page_url)
+                else:
+                    yield page_url, self._scrape_url(page_url)
+            return
+
+        # A semaphore limits the number of requests that are waiting for the network,
+        # at most 2 * workers pages are submitted but not yielded yet.
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for page_url in page_urls:
+                    if journal is not None and journal.completed(page_url):
+                        future = Future() # Already done, keeps its place in the page order.
+                        future.set_result(self.__journal_items(journal, page_url))
+                    else:
+                        future = executor.submit(self._scrape_url, page_url, in_flight)
+                    pending.append((page_url, future))
+                    if len(pending) >= 2 * workers:
+                        page_url, future = pending.popleft()
+                        yield page_url, future.result()
+                while pending:
+                    page_url, future = pending.popleft()
+                    yield page_url, future.result()
+            finally:
+                for _, future in pending: # The consumer stopped early.
+                    future.cancel()
+
+    def __journal_items(self, journal: CheckpointJournal, page_url: str) -> List[Any]:
+        return [self.item_from_dict(data) for data in journal.records(page_url)]
+
+    def _scrape_url(self, page_url: str, in_flight: Optional[threading.Semaphore] = None) -> Optional[List[Any]]:
+        """
+        Fetches the page in given URL and scrapes it.
+        Returns None if the page could not be fetched.
+        """
+        with self._page_labels(page_url):
             logger.info("Fetching page")
-            page_url = self.url_creator.create_url_of_page_number(page)
-            response = requests.get(page_url, timeout=10)
+            if in_flight is None:
+                content = self._fetch_page(page_url)
+            else:
+                with in_flight:
+                    content = self._fetch_page(page_url)
+            if content is None:
+                return None
+            logger.info("Scraping page: %s", page_url)
+            return self._parse_page(content)
+
+    def _page_labels(self, page_url: str):
+        """
+        Labels the metrics recorded inside the with block with the scraper and the page.
+        """
+        return metrics.labelled(scraper=type(self).__name__, page=page_url)
+
+    def _parse_page(self, content: bytes) -> List[Any]:
+        """
+        Parses the page content with the chosen parser and scrapes all the data in it.
+        """
+        tree = self._build_tree(content)
+        if self.parser == "selectolax":
+            return self.scrape_tree(tree)
+        return self.scrape_page(tree)
+
+    def _parse_page_with_next(self, content: bytes) -> tuple[List[Any], Optional[bool]]:
+        """
+        Same as _parse_page, but also returns whether the page links to a next page.
+        """
+        tree = self._build_tree(content)
+        if self.parser == "selectolax":
+            return self.scrape_tree(tree), self.has_next_tree(tree)
+        if self.restrict:
+            # The links are outside of parse_only, so they are not parsed.
+            return self.scrape_page(tree), None
+        return self.scrape_page(tree), self.has_next_page(tree)
+
+    def _build_tree(self, content: bytes) -> Any:
+        """
+        Parses the page content with the chosen parser.
+        Returns a BeautifulSoup object, or a selectolax tree for the selectolax parser.
+        """
+        with metrics.registry.timer("scraper_parse_seconds"):
+            if self.parser == "selectolax":
+                return LexborHTMLParser(content)
+            parse_only = self.parse_only if self.restrict else None
+            return BeautifulSoup(content, self.parser, parse_only=parse_only)
+
+    def _get(self, page_url: str) -> requests.Response:
+        """
+        Sends a GET request to the given URL with the session, if there is one.
+        """
+        http = self.session if self.session is not None else requests
+        start = time.perf_counter()
+        response = http.get(page_url, timeout=10)
+        metrics.registry.observe("scraper_fetch_seconds", time.perf_counter() - start)
+        metrics.registry.inc("scraper_fetch_total", status=response.status_code)
+        return response
+
+    def _fetch_page(self, page_url: str) -> Optional[bytes]:
+        """
+        Sends a GET request to the given URL.
+        Returns the content of the page, None if the request is not successfull.
+        """
+        response = self._get(page_url)
+        if response.status_code != 200:
+            logger.info("Page data could not fetched: %s", page_url)
+            return None
+        return response.content
+
+    def scrape_all_pages(self, start_page: int = 1, prefetch: int = 4,
+                         max_page: Optional[int] = None, dedup: Optional[DedupIndex] = None,
+                         max_failures: int = 3) -> List[Any]:
+        """
+        Scrapes all the pages starting from start_page, without knowing the page count.
+        See iter_all_pages.
+        """
+        obj_list = []
+        for page_objs in self.iter_all_pages(start_page, prefetch, max_page, dedup, max_failures):
+            obj_list.extend(page_objs)
+        return obj_list
+
+    def iter_all_pages(self, start_page: int = 1, prefetch: int = 4,
+                       max_page: Optional[int] = None, dedup: Optional[DedupIndex] = None,
+                       max_failures: int = 3) -> Iterator[List[Any]]:
+        """
+        Yields the data of the pages starting from start_page until the last page, in page order.
+        The last page is the one without a "next" link (see has_next_page), the page before
+        a 404 response or, if the links cannot be read, the page before the first empty one.
+        A page that fails with another status yields an empty list, max_failures failed
+        pages in a row end the pagination, so a site answering errors after its last page
+        is not crawled forever.
+        The next prefetch pages are fetched in parallel while a page is being processed,
+        the ones after the last page are cancelled. max_page is an optional upper limit.
+        dedup removes the duplicate items, see scrape_pages. The pagination still sees
+        them, so a page of duplicates does not end it.
+        """
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1.")
+        if max_failures < 1:
+            raise ValueError("max_failures must be at least 1.")
+        pages = self._iter_all_pages(start_page, prefetch, max_page, max_failures)
+        return pages if dedup is None else self._unique_pages(pages, dedup)
+
+    def _iter_all_pages(self, start_page: int, prefetch: int, max_page: Optional[int],
+                        max_failures: int) -> Iterator[List[Any]]:
+        """
+        Generator of iter_all_pages.
+        """
+        logger.info("Started scraping all pages")
+        next_page = start_page
+        pending = collections.deque() # Futures of the prefetched pages, in page order.
+        failures = 0 # Failed pages in a row.
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+
+        def prefetch_pages():
+            nonlocal next_page
+            while len(pending) < prefetch and (max_page is None or next_page <= max_page):
+                page_url = self.url_creator.create_url_of_page_number(next_page)
+                pending.append(executor.submit(self._scrape_url_with_next, page_url))
+                next_page += 1
+
+        try:
+            prefetch_pages()
+            while pending:
+                page_objs, has_next = pending.popleft().result()
+                if page_objs is None and has_next is False:
+                    break # The page does not exist.
+                if page_objs is None: # The page failed.
+                    failures += 1
+                    if failures >= max_failures:
+                        logger.info("Stopped scraping after %d failed pages", failures)
+                        break
+                    yield []
+                    prefetch_pages()
+                    continue
+                failures = 0
+                if has_next is None and len(page_objs) == 0:
+                    break # An empty page, the previous page was the last one.
+                yield page_objs
+                if has_next is False:
+                    break
+                prefetch_pages()
+        finally:
+            # Cancel the pages after the last one. The requests already sent finish
+            # in the background and their results are ignored, the generator does not wait for them.
+            logger.info("Stopped scraping, %d prefetched pages cancelled", len(pending))
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scrape_url_with_next(self, page_url: str) -> tuple[Optional[List[Any]], Optional[bool]]:
+        """
+        Fetches and scrapes the page in given URL for iter_all_pages.
+        Returns the scraped data and whether there is a next page. The data is None if
+        the page does not exist, then there is no next page, or if it fails for another
+        reason, then the pages after it may still exist.
+        """
+        with self._page_labels(page_url):
+            logger.info("Fetching page")
+            response = self._get(page_url)
+            if response.status_code == 404:
+                return None, False
             if response.status_code != 200:
-                logger.info(f"Page data could not fetched: {page_url}")
-                continue
-            soup = BeautifulSoup(response.content, "html.parser")
-            logger.info(f"Scraping page: {page_url}")
-            obj_list.extend(self.scrape_page(soup))
+                logger.info("Page data could not fetched: %s", page_url)
+                return None, True
+            logger.info("Scraping page: %s", page_url)
+            return self._parse_page_with_next(response.content)
+
+    def scrape_pages_pipelined(self, start_page: int, end_page: int, fetch_workers: int = 4,
+                               parse_workers: Optional[int] = None, queue_size: int = 16) -> List[Any]:
+        """
+        Scrapes the pages with two stages running at the same time:
+           * fetch_workers threads download the pages into a queue,
+           * parse_workers processes (defaults to the CPU count) parse them with scrape_page.
+        The queue and the number of pages waiting for a parser are bounded by queue_size,
+        so the fetchers wait when the parsers fall behind and memory stays flat.
+        The scraper is copied into the parser processes without its session and url_creator,
+        so the rest of its attributes must be picklable.
+        The metrics of the parse stage are recorded in the parser processes, so they
+        are not in metrics.registry.
+        Results are returned in page order, failed pages are skipped.
+        """
+        if fetch_workers < 1:
+            raise ValueError("fetch_workers must be at least 1.")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1.")
+
+        logger.info("Started scraping pages with a pipeline")
+        page_urls = [self.url_creator.create_url_of_page_number(page)
+                     for page in range(start_page, end_page+1)]
+        pages = queue.Queue(maxsize=queue_size)
+        next_page = iter(enumerate(page_urls))
+        next_page_lock = threading.Lock()
+        stop = threading.Event() # Set if the parsing stage fails, so the fetchers do not wait forever.
+
+        def put(item):
+            """Puts the item into the queue, waits while the queue is full."""
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch_pages():
+            """Fetches pages until there is no page left."""
+            try:
+                while not stop.is_set():
+                    with next_page_lock:
+                        index, page_url = next(next_page, (None, None))
+                    if page_url is None:
+                        return
+                    with self._page_labels(page_url):
+                        content = self._fetch_page(page_url)
+                    put((index, content))
+            finally:
+                put(_FETCHER_DONE)
+
+        parser = copy.copy(self)
+        parser.session = None
+        parser.url_creator = None
+
+        results = [[] for _ in page_urls]
+        with (ThreadPoolExecutor(max_workers=fetch_workers) as fetchers,
+              ProcessPoolExecutor(max_workers=parse_workers, initializer=_init_parse_worker,
+                                  initargs=(parser,)) as parsers):
+            fetcher_futures = [fetchers.submit(fetch_pages) for _ in range(fetch_workers)]
+            parsing = {} # future -> page index
 
+            def collect(futures):
+                for future in futures:
+                    results[parsing.pop(future)] = future.result()
+
+            try:
+                finished_fetchers = 0
+                while finished_fetchers < fetch_workers:
+                    item = pages.get()
+                    if item is _FETCHER_DONE:
+                        finished_fetchers += 1
+                        continue
+                    index, content = item
+                    if content is None:
+                        continue
+                    if len(parsing) >= queue_size: # Wait for a parser before taking more pages.
+                        done, _ = wait(parsing, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    parsing[parsers.submit(_parse_in_worker, content)] = index
+
+                collect(list(parsing))
+            except BaseException:
+                stop.set()
+                raise
+            for future in fetcher_futures:
+                future.result() # Raise the errors of the fetchers, if any.
+
+        obj_list = []
+        for page_objs in results:
+            obj_list.extend(page_objs)
         return obj_list
 
+    async def ascrape_pages(self, start_page: int, end_page: int, max_concurrency: int = 10,
+                            timeout: float = 10,
+                            session: Optional[aiohttp.ClientSession] = None) -> List[Any]:
+        """
+        Asynchronous version of scrape_pages.
+        At most max_concurrency pages are fetched at the same time, each request
+        is given timeout seconds. Pages which fail or time out are skipped.
+        Parsing runs in a worker thread, so the event loop is never blocked.
+        If the coroutine is cancelled, all the pages in flight are cancelled too.
+        Results are returned in page order.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        logger.info("Started scraping pages asynchronously")
+        page_urls = [self.url_creator.create_url_of_page_number(page)
+                     for page in range(start_page, end_page+1)]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        owns_session = session is None # Close the session only if we created it.
+        if owns_session:
+            session = aiohttp.ClientSession()
+        try:
+            # If one of the tasks fails or the caller cancels us,
+            # TaskGroup cancels the remaining tasks and waits for them.
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [task_group.create_task(self._ascrape_url(session, page_url, semaphore, timeout))
+                         for page_url in page_urls]
+        finally:
+            if owns_session:
+                await session.close()
+
+        obj_list = []
+        for task in tasks:
+            obj_list.extend(task.result())
+        return obj_list
+
+    async def _ascrape_url(self, session: aiohttp.ClientSession, page_url: str,
+                           semaphore: asyncio.Semaphore, timeout: float) -> List[Any]:
+        """
+        Fetches the page in given URL asynchronously and scrapes it.
+        Returns an empty list if the page could not be fetched.
+        """
+        with self._page_labels(page_url): # Each task has its own context, to_thread copies it.
+            async with semaphore:
+                content = await self._afetch_page(session, page_url, timeout)
+            if content is None:
+                return []
+            logger.info("Scraping page: %s", page_url)
+            return await asyncio.to_thread(self._parse_page, content)
+
+    async def _afetch_page(self, session: aiohttp.ClientSession, page_url: str,
+                           timeout: float) -> Optional[bytes]:
+        """
+        Sends a GET request to the given URL without blocking the event loop.
+        Returns the content of the page, None if the request is not successfull, fails or times out.
+        """
+        logger.info("Fetching page")
+        try:
+            with metrics.registry.timer("scraper_fetch_seconds"):
+                async with session.get(page_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    metrics.registry.inc("scraper_fetch_total", status=response.status)
+                    if response.status != 200:
+                        logger.info("Page data could not fetched: %s", page_url)
+                        return None
+                    return await response.read()
+        except asyncio.TimeoutError:
+            metrics.registry.inc("scraper_fetch_total", status="timeout")
+            logger.info("Request timed out: %s", page_url)
+            return None
+        except aiohttp.ClientError as error: # Connection refused or reset, bad payload...
+            metrics.registry.inc("scraper_fetch_total", status="error")
+            logger.info("Request failed: %s (%s)", page_url, error)
+            return None
+
 ## TESTED and SUCCESSFULL
 class QuoteScraper(BaseMultiPageScraper):
     """
     This class will scrape the quotes in given URL.
     """
+    parse_only = SoupStrainer("div", class_="quote")
 
     # TESTED and SUCCESSFULL
     def extract_data(self, element: Tag) -> Optional[Quote]:
@@ -170,114 +758,747 @@ class QuoteScraper(BaseMultiPageScraper):
         # All quotes are packaged in div tags with class "quote"
         quotes_in_page = []
         quote_divs = soup.find_all("div", class_="quote")
-        logger.info(f"Found {len(quote_divs)} quotes")
+        debug = logger.isEnabledFor(logging.DEBUG) # Checked once, not for every quote.
         for count, quote_div in enumerate(quote_divs):
-            logger.info("Found a new quote div. Extracting data inside")
-            quote = self.extract_data(quote_div)
+            with metrics.registry.timer("scraper_extract_seconds"):
+                quote = self.extract_data(quote_div)
+            if quote is not None:
+                metrics.registry.inc("scraper_items_total")
+                quotes_in_page.append(quote)
+            else:
+                metrics.registry.inc("scraper_invalid_items_total")
+            if debug:
+                logger.debug("Quote %d extracted: %s", count + 1, quote is not None)
+        # One record per page instead of one per quote.
+        logger.info("Extracted %d of %d quotes", len(quotes_in_page), len(quote_divs))
+        return quotes_in_page
+
+    def has_next_page(self, soup: BeautifulSoup) -> Optional[bool]:
+        """
+        The pager of the site has a li tag with class "next", except on the last page.
+        """
+        return soup.find("li", class_="next") is not None
+
+    def has_next_tree(self, tree: Any) -> Optional[bool]:
+        """
+        Same as has_next_page, for the selectolax parser.
+        """
+        return tree.css_first("li.next") is not None
+
+    def item_from_dict(self, data: dict) -> Quote:
+        """
+        Creates the quote back from its checkpoint journal record.
+        """
+        return Quote(**data)
+
+    def item_key(self, item: Quote) -> bytes:
+        """
+        Quotes are the same if their normalized text and author are the same.
+        """
+        return content_hash(item.text, item.author)
+
+    def iter_quotes(self, start_page: int, end_page: int,
+                    workers: int = 1, max_in_flight: Optional[int] = None,
+                    checkpoint: Optional[str] = None, resume: bool = True,
+                    dedup: Optional[DedupIndex] = None) -> Iterator[Quote]:
+        """
+        Yields the quotes in the pages one by one, as soon as their page is scraped.
+        See scrape_pages for the arguments.
+        """
+        for quotes_in_page in self.iter_pages(start_page, end_page, workers, max_in_flight,
+                                              checkpoint, resume, dedup):
+            yield from quotes_in_page
+
+    def extract_node(self, node: Any) -> Optional[Quote]:
+        """
+        Extracts the quote data from given selectolax node.
+        Same as extract_data, but for the selectolax parser.
+        """
+        span_node = node.css_first("span.text")
+        if span_node is None:
+            return None
+        small_node = node.css_first("small.author")
+        if small_node is None:
+            return None
+        tags = [a_node.text() for a_node in node.css("a.tag")]
+        return Quote(text=span_node.text(), author=small_node.text(), tags=tags)
+
+    def scrape_tree(self, tree: Any) -> List[Quote]:
+        """
+        Scrapes all the quotes in the given selectolax tree.
+        """
+        quotes_in_page = []
+        quote_nodes = tree.css("div.quote")
+        debug = logger.isEnabledFor(logging.DEBUG) # Checked once, not for every quote.
+        for count, quote_node in enumerate(quote_nodes):
+            with metrics.registry.timer("scraper_extract_seconds"):
+                quote = self.extract_node(quote_node)
             if quote is not None:
-                logger.info("Successfully extracted, adding into list")
+                metrics.registry.inc("scraper_items_total")
                 quotes_in_page.append(quote)
             else:
-                print(f"Quote {count+1} is None")
+                metrics.registry.inc("scraper_invalid_items_total")
+            if debug:
+                logger.debug("Quote %d extracted: %s", count + 1, quote is not None)
+        # One record per page instead of one per quote.
+        logger.info("Extracted %d of %d quotes", len(quotes_in_page), len(quote_nodes))
         return quotes_in_page
 
+def encode_tags(tags_column: Iterable[List[str]],
+                names: Optional[List[str]] = None) -> tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Dictionary encodes the tag lists of the rows into flat arrays.
+    Returns (codes, offsets, names): the tags of row i are names[code] for the
+    codes in codes[offsets[i]:offsets[i + 1]].
+    If names is given, its tags keep their codes and the new tags are added after them.
+    """
+    code_of_tag = {name: code for code, name in enumerate(names or ())}
+    codes = []
+    offsets = [0]
+    for tags in tags_column:
+        for tag in tags:
+            codes.append(code_of_tag.setdefault(tag, len(code_of_tag)))
+        offsets.append(len(codes))
+    return (np.array(codes, dtype=np.int32), np.array(offsets, dtype=np.int64), list(code_of_tag))
+
+class _GrowingArray:
+    """
+    A numpy array that rows are appended to. Room for more rows is kept after them
+    and doubled when it runs out, so appending copies the rows O(1) times on average.
+    """
+    def __init__(self, values: np.ndarray):
+        self.__buffer = values
+        self.size = len(values)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__buffer[:self.size]
+
+    def append(self, values: np.ndarray) -> np.ndarray:
+        """
+        Appends the values, returns all the values.
+        """
+        end = self.size + len(values)
+        if end > len(self.__buffer):
+            buffer = np.zeros(max(end, 2 * len(self.__buffer)), dtype=self.__buffer.dtype)
+            buffer[:self.size] = self.values
+            self.__buffer = buffer
+        self.__buffer[self.size:end] = values
+        self.size = end
+        return self.values
+
+class _ChunkedSeries:
+    """
+    A Series that rows are appended to in chunks, the rows already in it are not copied.
+    The last chunk is merged into the one before it while it is at least half as long,
+    like the digits of a binary counter, so there are O(log n) chunks and a row is
+    copied O(log n) times.
+    """
+    def __init__(self, values: pd.Series):
+        self.__chunks = [values.reset_index(drop=True)]
+        self.__starts = [0] # The row of the first value of every chunk.
+        self.size = len(values)
+
+    def append(self, values: pd.Series):
+        self.__chunks.append(values.reset_index(drop=True))
+        self.__starts.append(self.size)
+        self.size += len(values)
+        while len(self.__chunks) > 1 and 2 * len(self.__chunks[-1]) >= len(self.__chunks[-2]):
+            last = self.__chunks.pop()
+            self.__starts.pop()
+            self.__chunks[-1] = pd.concat([self.__chunks[-1], last], ignore_index=True)
+
+    def take(self, rows: np.ndarray) -> pd.Series:
+        """
+        Returns the values in the rows, in the order of rows and indexed by them.
+        """
+        if len(self.__chunks) == 1:
+            return self.__chunks[0].iloc[rows].set_axis(rows)
+        chunk_of_row = np.searchsorted(self.__starts, rows, side="right") - 1
+        order = np.argsort(chunk_of_row, kind="stable")
+        bounds = np.searchsorted(chunk_of_row[order], np.arange(len(self.__chunks) + 1))
+        parts = [chunk.iloc[rows[order[bounds[i]:bounds[i + 1]]] - self.__starts[i]]
+                 for i, chunk in enumerate(self.__chunks) if bounds[i + 1] > bounds[i]]
+        values = pd.concat(parts) if parts else self.__chunks[0].iloc[:0]
+        return values.iloc[np.argsort(order)].set_axis(rows) # Back in the order of rows.
+
+    def tolist(self) -> list:
+        return [value for chunk in self.__chunks for value in chunk.tolist()]
+
+def _group_rows(codes: np.ndarray, rows: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Groups the rows by their codes with one stable sort. Returns the rows and the offsets
+    of the codes: the rows of code c are rows[offsets[c]:offsets[c + 1]], in order and once.
+    """
+    order = np.argsort(codes, kind="stable")
+    codes, rows = codes[order], rows[order]
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1]) # A tag may be twice in a row.
+    return rows[first], np.concatenate(([0], np.cumsum(np.bincount(codes[first], minlength=count))))
+
+class TagIndex:
+    """
+    Inverted index of the tags of the quotes.
+    Every tag has the sorted rows that have it (its postings), kept for all the
+    tags in arrays grouped by the tag. A tag used in a filter also gets a bitmap
+    of its rows, packed 8 rows per byte and built at its first use, so combining
+    tags is a bitwise operation over the bitmaps instead of a look into the tag
+    list of every row.
+    Rows can be appended: their postings are a new chunk, merged with the older
+    chunks like _ChunkedSeries, and the bitmaps already built are extended.
+    The tags are given dictionary encoded, see encode_tags.
+    """
+    def __init__(self, codes: np.ndarray, offsets: np.ndarray, names: List[str]):
+        self.size = 0
+        self.repeated = False # Whether a row has a tag more than once.
+        self.__names = []
+        self.__code_of_tag = {}
+        self.__counts = np.zeros(0, dtype=np.int64) # Rows of every code.
+        self.__chunks = [] # (rows, offsets) of the postings of consecutive rows, see _group_rows.
+        self.__bitmaps = {} # tag -> _GrowingArray, for the tags used in filters.
+        self.append(codes, offsets, names)
+
+    @classmethod
+    def from_lists(cls, tags_column: Iterable[List[str]]) -> "TagIndex":
+        """
+        Creates the index from the tag lists of the rows.
+        """
+        return cls(*encode_tags(tags_column))
+
+    def append(self, codes: np.ndarray, offsets: np.ndarray, names: List[str]):
+        """
+        Adds rows after the existing ones. names are all the tags, the ones already
+        in the index first, see encode_tags with names.
+        """
+        start = self.size
+        for name in names[len(self.__names):]:
+            self.__code_of_tag[name] = len(self.__names)
+            self.__names.append(name)
+        self.size += len(offsets) - 1
+
+        rows, postings = _group_rows(codes, np.repeat(np.arange(start, self.size, dtype=np.int64),
+                                                      np.diff(offsets)), len(names))
+        self.repeated |= len(rows) < len(codes)
+        self.__counts = np.concatenate((self.__counts, np.zeros(len(names) - len(self.__counts), dtype=np.int64)))
+        self.__counts += np.diff(postings)
+        self.__chunks.append((rows, postings))
+        while len(self.__chunks) > 1 and 2 * len(self.__chunks[-1][0]) >= len(self.__chunks[-2][0]):
+            older, newer = self.__chunks[-2:]
+            self.__chunks[-2:] = [_group_rows(np.concatenate((self.__codes(older), self.__codes(newer))),
+                                              np.concatenate((older[0], newer[0])), len(names))]
+
+        for tag, bitmap in self.__bitmaps.items():
+            bitmap.append(np.zeros((self.size + 7) // 8 - bitmap.size, dtype=np.uint8))
+            code = self.__code_of_tag[tag]
+            self.__set_bits(bitmap.values, rows[postings[code]:postings[code + 1]])
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self.__names)
+
+    def rows(self, tag: str) -> np.ndarray:
+        """
+        Returns the sorted rows that have the tag.
+        """
+        code = self.__code_of_tag.get(tag)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([rows[offsets[code]:offsets[code + 1]] for rows, offsets in self.__chunks
+                               if code < len(offsets) - 1])
+
+    def count(self, tag: str) -> int:
+        """
+        Returns the number of rows that have the tag.
+        """
+        code = self.__code_of_tag.get(tag)
+        return 0 if code is None else int(self.__counts[code])
+
+    def selectivity(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+                    none_of: Iterable[str] = ()) -> float:
+        """
+        Estimates the fraction of the rows match keeps, from the counts of the tags.
+        """
+        if self.size == 0:
+            return 0.0
+        estimate = 1.0
+        for tag in all_of:
+            estimate = min(estimate, self.count(tag) / self.size)
+        any_of = list(any_of)
+        if any_of:
+            estimate = min(estimate, sum(self.count(tag) for tag in any_of) / self.size)
+        for tag in none_of:
+            estimate = min(estimate, 1 - self.count(tag) / self.size)
+        return estimate
+
+    def match(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+              none_of: Iterable[str] = ()) -> np.ndarray:
+        """
+        Returns a boolean mask of the rows that have all the tags in all_of (AND),
+        at least one of the tags in any_of (OR, ignored if it is empty), and none of
+        the tags in none_of (NOT).
+        """
+        empty = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        result = np.packbits(np.ones(self.size, dtype=bool))
+        for tag in all_of:
+            result &= self.__bitmap(tag, empty)
+        any_of = list(any_of)
+        if any_of:
+            union = empty.copy()
+            for tag in any_of:
+                union |= self.__bitmap(tag, empty)
+            result &= union
+        for tag in none_of:
+            result &= ~self.__bitmap(tag, empty)
+        return np.unpackbits(result, count=self.size).astype(bool)
+
+    def __bitmap(self, tag: str, empty: np.ndarray) -> np.ndarray:
+        """
+        Returns the bitmap of the tag, built from its rows at the first use.
+        """
+        if tag not in self.__code_of_tag:
+            return empty
+        if tag not in self.__bitmaps:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.rows(tag)] = True
+            self.__bitmaps[tag] = _GrowingArray(np.packbits(mask))
+        return self.__bitmaps[tag].values
+
+    @staticmethod
+    def __codes(chunk: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """
+        Returns the code of every row of the chunk.
+        """
+        offsets = chunk[1]
+        return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+    @staticmethod
+    def __set_bits(bitmap: np.ndarray, rows: np.ndarray):
+        """
+        Sets the bits of the rows in the packed bitmap, the first row is the highest bit like np.packbits.
+        """
+        np.bitwise_or.at(bitmap, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet and Arrow files need the pyarrow package.")
+
+def _dictionary_codes(column: "pa.ChunkedArray") -> tuple[np.ndarray, "pa.Array"]:
+    """
+    Returns the dictionary codes of the strings in the Arrow column and the
+    dictionary. A dictionary encoded column in one chunk is used without copying.
+    """
+    if pa.types.is_dictionary(column.type):
+        if column.num_chunks == 1:
+            encoded = column.chunk(0)
+            return encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32, copy=False), encoded.dictionary
+        column = column.cast(column.type.value_type)
+    encoded = pc.dictionary_encode(column).combine_chunks() # One dictionary for all the chunks.
+    return encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32, copy=False), encoded.dictionary
+
 class QuoteAnalyzer:
     """
     Analysis the given 
+    The quotes are stored column by column in a compact form:
+       * text   : The texts, and their lengths as an integer array.
+       * author : An integer code for every quote, and the names of the codes.
+       * tags   : Dictionary encoded flat arrays, see encode_tags.
+    The filter methods only record their filter in a query plan, the filters
+    run together when the result is needed (get, get_column or count), and
+    only the selected quotes are decoded into a DataFrame.
+    The aggregates (quotes_per_author, quotes_per_tag, length_stats, ...) are
+    computed over the codes of the filtered quotes and cached until the filters change.
+    The texts can be searched with by_text and search, through a full-text index
+    built at the first search.
+    add_quotes appends quotes to the columns and the indexes in place, it does not
+    rebuild them, so quotes can be added while they are analyzed.
     """
+    # Columns of get, and get_column also accepts "length".
+    COLUMNS = ("text", "author", "tags")
+
     def __init__(self, quotes: List[Quote]):
-        self.__quotes_df = pd.DataFrame(
-            {
-                "text": [quote.text for quote in quotes],
-                "author": [quote.author for quote in quotes],
-                "tags": [quote.tags for quote in quotes]
-            }
-        )
-        self.__filtered = self.__quotes_df.copy()
+        texts, authors, tags = QuoteAnalyzer.__split(quotes)
+        texts = pd.Series(texts)
+        lengths = texts.str.len().to_numpy(dtype=np.int64) if len(texts) else np.zeros(0, dtype=np.int64)
+        author_codes, author_names = pd.factorize(pd.Series(authors))
+        self.__set_columns(texts, lengths, author_codes.astype(np.int32), pd.Series(author_names),
+                           *encode_tags(tags))
+
+    @classmethod
+    def from_parquet(cls, parquet_name: str) -> "QuoteAnalyzer":
+        """
+        Creates an analyzer from a Parquet file written by QuoteWriter.to_parquet.
+        The file is memory mapped and only the text, author and tags columns are read.
+        """
+        _require_pyarrow()
+        return cls.from_arrow_table(pq.read_table(parquet_name, columns=list(QuoteAnalyzer.COLUMNS),
+                                                  memory_map=True))
+
+    @classmethod
+    def from_arrow(cls, arrow_name: str) -> "QuoteAnalyzer":
+        """
+        Creates an analyzer from an Arrow IPC file written by QuoteWriter.to_arrow.
+        The file is memory mapped, so the columns are not copied into memory.
+        """
+        _require_pyarrow()
+        with pa.memory_map(arrow_name) as source:
+            table = pa.ipc.open_file(source).read_all().select(list(QuoteAnalyzer.COLUMNS))
+        return cls.from_arrow_table(table)
+
+    @classmethod
+    def from_arrow_table(cls, table: "pa.Table") -> "QuoteAnalyzer":
+        """
+        Creates an analyzer from an Arrow table with the columns text, author and tags.
+        Dictionary encoded authors and tags are used as they are.
+        """
+        text = table.column("text")
+        if pa.types.is_dictionary(text.type):
+            text = text.cast(text.type.value_type)
+        author_codes, author_names = _dictionary_codes(table.column("author"))
+
+        tags = table.column("tags")
+        tag_values = pa.chunked_array([chunk.flatten() for chunk in tags.chunks], type=tags.type.value_type)
+        tag_counts = pc.list_value_length(tags).fill_null(0).to_numpy().astype(np.int64)
+        tag_codes, tag_names = _dictionary_codes(tag_values)
+
+        analyzer = cls.__new__(cls)
+        analyzer.__set_columns(text.to_pandas(),
+                               pc.utf8_length(text).to_numpy().astype(np.int64),
+                               author_codes, author_names.to_pandas(),
+                               tag_codes, np.concatenate(([0], np.cumsum(tag_counts))).astype(np.int64),
+                               tag_names.to_pylist())
+        return analyzer
+
+    def add_quotes(self, quotes: Iterable[Quote]) -> "QuoteAnalyzer":
+        """
+        Adds quotes after the existing ones, the filters are kept and apply to them too.
+        Only the new quotes are encoded and indexed, the columns grow in place
+        (see _GrowingArray and _ChunkedSeries) and the tag and search indexes are extended.
+        Returns the object itself.
+        """
+        texts, authors, tags = QuoteAnalyzer.__split(quotes)
+        if not texts:
+            return self
+
+        new_texts = pd.Series(texts)
+        authors_before = len(self.__code_of_author)
+        author_codes = np.fromiter((self.__code_of_author.setdefault(author, len(self.__code_of_author))
+                                    for author in authors), dtype=np.int32, count=len(authors))
+        if len(self.__code_of_author) > authors_before:
+            self.__author_names = pd.concat([self.__author_names,
+                                             pd.Series(list(self.__code_of_author)[authors_before:])],
+                                            ignore_index=True)
+        counts = np.bincount(author_codes, minlength=len(self.__code_of_author))
+        counts[:authors_before] += self.__author_counts
+        self.__author_counts = counts
+        tag_codes, tag_offsets, self.__tag_names = encode_tags(tags, self.__tag_names)
+
+        self.__texts.append(new_texts)
+        self.__lengths = self.__columns["lengths"].append(new_texts.str.len().to_numpy(dtype=np.int64))
+        self.__author_codes = self.__columns["author_codes"].append(author_codes)
+        self.__tag_codes = self.__columns["tag_codes"].append(tag_codes)
+        self.__tag_offsets = self.__columns["tag_offsets"].append(self.__tag_offsets[-1] + tag_offsets[1:])
+        self.__tag_index.append(tag_codes, tag_offsets, self.__tag_names)
+        if self.__search_index is not None:
+            self.__search_index.add_many(texts)
+        self.__plan.resize(self.__texts.size) # Drops the cached results.
+        return self
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """
+        The full-text index of the texts, built at the first use.
+        """
+        if self.__search_index is None:
+            self.__search_index = SearchIndex.from_texts(self.__texts.tolist())
+        return self.__search_index
+
+    @staticmethod
+    def __split(quotes: Iterable[Quote]) -> tuple[List[str], List[str], List[List[str]]]:
+        """
+        Returns the texts, authors and tag lists of the quotes.
+        """
+        texts, authors, tags = [], [], []
+        for quote in quotes:
+            texts.append(quote.text)
+            authors.append(quote.author)
+            tags.append(quote.tags)
+        return texts, authors, tags
+
+    def __set_columns(self, texts: pd.Series, lengths: np.ndarray, author_codes: np.ndarray,
+                      author_names: pd.Series, tag_codes: np.ndarray, tag_offsets: np.ndarray,
+                      tag_names: List[str]):
+        """
+        Stores the columns, see the class documentation.
+        """
+        self.__texts = _ChunkedSeries(texts)
+        # The arrays add_quotes appends to, the attributes below are their values.
+        self.__columns = {"lengths": _GrowingArray(lengths), "author_codes": _GrowingArray(author_codes),
+                          "tag_codes": _GrowingArray(tag_codes), "tag_offsets": _GrowingArray(tag_offsets)}
+        self.__lengths = lengths
+        self.__author_codes = author_codes
+        self.__author_names = author_names # Same dtype as a column of author strings.
+        self.__code_of_author = {name: code for code, name in enumerate(author_names)}
+        self.__author_counts = np.bincount(author_codes, minlength=len(author_names))
+        self.__tag_codes, self.__tag_offsets, self.__tag_names = tag_codes, tag_offsets, tag_names
+
+        # Built once, used by all tag filters.
+        self.__tag_index = TagIndex(tag_codes, tag_offsets, tag_names)
+        self.__plan = QueryPlan(len(texts))
+        self.__aggregates = {} # Results of the aggregates for the plan version in __aggregates_version.
+        self.__aggregates_version = None
+        self.__search_index: Optional[SearchIndex] = None
     
     def minimum_length(self, min_length: int, negate=False) -> "QuoteAnalyzer":
         """
         Filters the quotes whose length is greater than or equal to the minLength.
-        The filter operations are performed on __filtered list.
         if negate choice is active, converts the condition to its negation.
         Returns the object itself.
         """
-        lengths = self.__filtered["text"].str.len()
-        condition = lengths >= min_length
-        
-        if negate:
-            condition = ~condition
-        
-        self.__filtered = self.__filtered[condition]
+        self.__plan.add(Predicate(lambda rows: (take(self.__lengths, rows) >= min_length) != negate))
         return self        
     
     def maximum_length(self, max_length, negate=False) -> "QuoteAnalyzer":
         """
         Filters the quotes whose length is smaller than or equal to the maxLength.
-        The filter operations are performed on __filtered list.
         if negate choice is active, converts the condition to its negation.
         Returns the object itself.
         """
-        lengths = self.__filtered["text"].str.len()
-
-        condition = lengths <= max_length
-        if negate:
-            condition = ~condition
-        
-        self.__filtered = self.__filtered[condition]
+        self.__plan.add(Predicate(lambda rows: (take(self.__lengths, rows) <= max_length) != negate))
         return self
 
     def by_author(self, author: str, negate=False) -> "QuoteAnalyzer":
         """
         Filters the quotes whose author name is same as the given author.
-        The filter operations are performed on __filtered list.
         if negate choice is active, converts the condition to its negation.
         Returns the object itself.
         """
-        condition = self.__filtered["author"] == author
-        if negate:
-            condition = ~condition
-        self.__filtered = self.__filtered[condition]
+        code = self.__code_of_author.get(author, -1) # -1 matches no quote.
+
+        def mask(rows):
+            return (take(self.__author_codes, rows) == code) != negate
+
+        selectivity = self.__author_counts[code] / self.__plan.size if code >= 0 else 0.0
+        self.__plan.add(Predicate(mask, 1 - selectivity if negate else selectivity))
         return self
 
     def by_tag(self, tag: str, negate=False) -> "QuoteAnalyzer":
         """
         Filters the quotes whose contains the specified tag.
-        The filter operations are performed on __filtered list.
         if negate choice is active, converts the condition to its negation.
         Returns the object itself.
         """
-        condition = self.__filtered["tags"].apply(lambda tags: tag in tags)
         if negate:
-            condition = ~condition
-        self.__filtered = self.__filtered[condition]
+            return self.by_tags(none_of=[tag])
+        return self.by_tags(all_of=[tag])
+
+    def by_tags(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+                none_of: Iterable[str] = ()) -> "QuoteAnalyzer":
+        """
+        Filters the quotes which have all the tags in all_of, at least one of
+        the tags in any_of and none of the tags in none_of, for example
+        by_tags(all_of=["life"], any_of=["love", "friends"], none_of=["humor"]).
+        Returns the object itself.
+        """
+        all_of, any_of, none_of = list(all_of), list(any_of), list(none_of)
+
+        def mask(rows):
+            return take(self.__tag_index.match(all_of, any_of, none_of), rows)
+
+        self.__plan.add(Predicate(mask, self.__tag_index.selectivity(all_of, any_of, none_of)))
         return self
 
+    def by_text(self, query: str, negate=False) -> "QuoteAnalyzer":
+        """
+        Filters the quotes whose text matches the full-text query, for example
+        by_text('love "be yourself" insp*'): all its words, "phrases" and prefix*
+        must be in the text, see search.parse_query.
+        if negate choice is active, converts the condition to its negation.
+        Returns the object itself.
+        """
+        def mask(rows):
+            selected = np.zeros(self.__plan.size, dtype=bool)
+            selected[self.search_index.match(query)] = True
+            return take(selected, rows) != negate
+
+        selectivity = self.search_index.selectivity(query)
+        # An index lookup, but slower than comparing numbers.
+        self.__plan.add(Predicate(mask, 1 - selectivity if negate else selectivity, cost=2))
+        return self
+
+    def search(self, query: str, limit: Optional[int] = 10) -> pd.DataFrame:
+        """
+        Returns the filtered quotes matching the full-text query (see by_text),
+        ranked by BM25 with the best first, at most limit of them (all if None).
+        The DataFrame has the columns of get and a score column.
+        """
+        rows = self.__plan.execute()
+        if len(self.__plan) == 0:
+            rows = None # All the quotes, no need to restrict the search.
+        docs, scores = self.search_index.search(query, rows, limit)
+        result = pd.DataFrame({column: self.__decode(column, docs) for column in QuoteAnalyzer.COLUMNS})
+        result["score"] = scores
+        return result
+
     def clear_filters(self) -> "QuotesAnalyzer":
         """
-        This function clears all the filters made on __filtered.
+        This function clears all the filters.
         Returns the object itself.
         """
-        self.__filtered = self.__quotes_df.copy() # Assign a copy of actual quotes list
+        self.__plan.clear()
         return self
 
     def get(self) -> pd.DataFrame:
         """
-        Returns filtered list.
+        Returns the filtered quotes as a new DataFrame with the columns
+        text, author and tags. The index is the position of the quote in
+        the list given to the analyzer.
         """
-        return self.__filtered.copy() # Return a copy of filtered quotes
+        rows = self.__plan.execute()
+        return pd.DataFrame({column: self.__decode(column, rows) for column in QuoteAnalyzer.COLUMNS})
 
     def get_column(self, column) -> pd.Series:
         """
-        Returns desired column in __filtered data
+        Returns desired column of the filtered quotes.
+        The "length" column is the length of the texts.
         """
-        return self.__filtered[column]
+        return self.__decode(column, self.__plan.execute())
     
     def count(self) -> int:
         """
-        Returns the number of elements in filtered list.
+        Returns the number of the filtered quotes.
+        """
+        return len(self.__plan.execute())
+
+    def quotes_per_author(self) -> pd.Series:
+        """
+        Returns the number of filtered quotes of every author, most quotes first.
+        The authors without filtered quotes are left out.
+        """
+        return self.__aggregate(("authors",), lambda rows: self.__counts(
+            np.bincount(self.__author_codes[rows], minlength=len(self.__author_names)),
+            self.__author_names.tolist(), "author"))
+
+    def quotes_per_tag(self) -> pd.Series:
+        """
+        Returns the number of filtered quotes with every tag, most quotes first.
+        The tags without filtered quotes are left out, a tag given twice in a quote counts once.
+        """
+        def compute(rows):
+            positions, bounds = self.__tag_positions(rows)
+            codes = self.__tag_codes[positions]
+            if self.__tag_index.repeated: # The (row, tag) pairs are made unique first.
+                _, offsets = _group_rows(codes, np.repeat(rows, np.diff(bounds)), len(self.__tag_names))
+                counts = np.diff(offsets)
+            else:
+                counts = np.bincount(codes, minlength=len(self.__tag_names))
+            return self.__counts(counts, self.__tag_names, "tag")
+
+        return self.__aggregate(("tags",), compute)
+
+    def top_authors(self, n: int = 10) -> pd.Series:
+        """
+        Returns the n authors with the most filtered quotes and their number of quotes.
+        """
+        return self.quotes_per_author().head(n)
+
+    def top_tags(self, n: int = 10) -> pd.Series:
+        """
+        Returns the n most used tags of the filtered quotes and their number of quotes.
+        """
+        return self.quotes_per_tag().head(n)
+
+    def length_stats(self, percentiles: Iterable[float] = (25, 50, 75, 90, 99)) -> pd.Series:
+        """
+        Returns the count, mean, standard deviation, minimum, the given percentiles
+        (between 0 and 100) and maximum of the lengths of the filtered quotes,
+        like Series.describe. The values are NaN if no quote is selected.
+        """
+        percentiles = tuple(percentiles)
+
+        def compute(rows):
+            lengths = self.__lengths[rows]
+            index = ["count", "mean", "std", "min", *(f"{p:g}%" for p in percentiles), "max"]
+            if len(lengths) == 0:
+                return pd.Series([0.0] + [np.nan] * (len(index) - 1), index=index, name="length")
+            values = [len(lengths), lengths.mean(), lengths.std(ddof=1) if len(lengths) > 1 else np.nan,
+                      lengths.min(), *np.percentile(lengths, percentiles), lengths.max()]
+            return pd.Series(values, index=index, dtype=float, name="length")
+
+        return self.__aggregate(("length_stats", percentiles), compute)
+
+    def length_distribution(self, bins: int = 10) -> pd.Series:
+        """
+        Returns the number of filtered quotes in bins equal ranges of length,
+        indexed by the ranges (pandas Intervals). The ranges include their start,
+        and the last one its end too. The Series is empty if no quote is selected.
+        """
+        def compute(rows):
+            lengths = self.__lengths[rows]
+            if len(lengths) == 0:
+                return pd.Series([], index=pd.Index([], dtype=object), dtype=np.int64, name="quotes")
+            counts, edges = np.histogram(lengths, bins=bins)
+            ranges = [pd.Interval(start, end, closed="left") for start, end in zip(edges[:-2], edges[1:-1])]
+            ranges.append(pd.Interval(edges[-2], edges[-1], closed="both")) # np.histogram counts the end too.
+            return pd.Series(counts, index=pd.Index(ranges, dtype=object), name="quotes")
+
+        return self.__aggregate(("length_distribution", bins), compute)
+
+    def __aggregate(self, key: tuple, compute) -> pd.Series:
+        """
+        Returns the aggregate for the current filters, compute gets the selected
+        rows and is only called if the aggregate is not cached yet.
+        """
+        if self.__aggregates_version != self.__plan.version:
+            self.__aggregates.clear()
+            self.__aggregates_version = self.__plan.version
+        if key not in self.__aggregates:
+            self.__aggregates[key] = compute(self.__plan.execute())
+        return self.__aggregates[key].copy() # The cached result cannot be changed by the caller.
+
+    @staticmethod
+    def __counts(counts: np.ndarray, names: List[str], name: str) -> pd.Series:
+        """
+        Returns the non zero counts indexed by their names, largest first. Equal
+        counts keep the order of the codes, so the first seen name comes first.
         """
-        return len(self.__filtered.index)
+        codes = np.flatnonzero(counts)
+        codes = codes[np.argsort(-counts[codes], kind="stable")]
+        return pd.Series(counts[codes], index=pd.Index(np.array(names, dtype=object)[codes].tolist(), name=name),
+                         name="quotes")
+
+    def __tag_positions(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the positions of the tags of the rows in the flat arrays, gathered
+        at once, and the bounds of every row in the returned positions.
+        """
+        starts = self.__tag_offsets[rows]
+        counts = self.__tag_offsets[rows + 1] - starts
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        return np.repeat(starts - bounds[:-1], counts) + np.arange(bounds[-1]), bounds
+
+    def __decode(self, column: str, rows: np.ndarray) -> pd.Series:
+        """
+        Returns the values of the column in the given rows.
+        """
+        if column == "text":
+            return self.__texts.take(rows)
+        if column == "length":
+            return pd.Series(self.__lengths[rows], index=rows)
+        if column == "author":
+            return self.__author_names.take(self.__author_codes[rows]).set_axis(rows)
+        if column == "tags":
+            positions, bounds = self.__tag_positions(rows)
+            names = np.array(self.__tag_names, dtype=object)[self.__tag_codes[positions]].tolist()
+            return pd.Series([names[start:end] for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())],
+                             index=rows, dtype=object)
+        raise KeyError(column)
+
+# Schema of the Parquet and Arrow files of the quotes.
+QUOTE_SCHEMA = pa.schema([
+    ("text", pa.string()),
+    ("author", pa.dictionary(pa.int32(), pa.string())),
+    ("tags", pa.list_(pa.dictionary(pa.int32(), pa.string()))),
+]) if pa is not None else None
 
 class QuoteWriter:
     """
@@ -289,24 +1510,176 @@ class QuoteWriter:
         """
         Writes the quote data into a JSON file with given name.
         """
-        with open(json_name, "w", encoding="utf-8") as jsonfile:
+        with (metrics.registry.timer("writer_seconds", format="json"),
+              open(json_name, "w", encoding="utf-8") as jsonfile):
             json.dump([
                 {"text": quote.text, "author": quote.author, "tags": quote.tags} for quote in quotes
             ], jsonfile, indent=4)
+        metrics.registry.inc("writer_records_total", len(quotes), format="json")
 
     @staticmethod
     def to_csv(quotes: List[Quote], csv_name: str):
         """
         Writes the quote data into a CSV file with given name.
         """
-        with open(csv_name, "w", encoding="utf-8") as csvfile:
+        with (metrics.registry.timer("writer_seconds", format="csv"),
+              open(csv_name, "w", encoding="utf-8") as csvfile):
             writer = csv.DictWriter(csvfile,
                 fieldnames=["text", "author", "tags"]
             )
             writer.writeheader()
             writer.writerows(
-                [{"text": quote.text, "author": quote.author, "tags": quote.tags} for quote in quotes]
+                {"text": quote.text, "author": quote.author, "tags": quote.tags} for quote in quotes
                 )
+        metrics.registry.inc("writer_records_total", len(quotes), format="csv")
+
+    @staticmethod
+    def to_jsonl(quotes: Iterable[Quote], jsonl_name: str, append: bool = False,
+                 flush_every: int = 1000) -> int:
+        """
+        Writes the quotes into a JSON Lines file (one JSON object per line) while
+        iterating over them, so they never need to be in memory at the same time.
+        The file is flushed every flush_every quotes.
+        If append is True, the quotes are added to the end of the file. An incomplete
+        last line left by an interrupted run is removed first, so the run can be resumed.
+        Returns the number of quotes written.
+        """
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1.")
+        if append:
+            QuoteWriter._drop_incomplete_line(jsonl_name)
+        count = 0
+        with (metrics.registry.timer("writer_seconds", format="jsonl"),
+              open(jsonl_name, "a" if append else "w", encoding="utf-8") as jsonlfile):
+            for quote in quotes:
+                jsonlfile.write(json.dumps({"text": quote.text, "author": quote.author, "tags": quote.tags}))
+                jsonlfile.write("\n")
+                count += 1
+                if count % flush_every == 0:
+                    jsonlfile.flush()
+        metrics.registry.inc("writer_records_total", count, format="jsonl")
+        return count
+
+    @staticmethod
+    def stream_csv(quotes: Iterable[Quote], csv_name: str, append: bool = False,
+                   flush_every: int = 1000) -> int:
+        """
+        Writes the quotes into a CSV file row by row while iterating over them.
+        The rows have the same format as to_csv, the file is flushed every flush_every quotes.
+        If append is True, the quotes are added to the end of the file and the header is
+        written only if the file is empty. An incomplete last line is removed first.
+        Returns the number of quotes written.
+        """
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1.")
+        if append:
+            QuoteWriter._drop_incomplete_line(csv_name)
+        write_header = not append or not os.path.exists(csv_name) or os.path.getsize(csv_name) == 0
+        count = 0
+        with (metrics.registry.timer("writer_seconds", format="csv"),
+              open(csv_name, "a" if append else "w", encoding="utf-8", newline="") as csvfile):
+            writer = csv.writer(csvfile)
+            if write_header:
+                writer.writerow(["text", "author", "tags"])
+            for quote in quotes:
+                writer.writerow([quote.text, quote.author, quote.tags])
+                count += 1
+                if count % flush_every == 0:
+                    csvfile.flush()
+        metrics.registry.inc("writer_records_total", count, format="csv")
+        return count
+
+    @staticmethod
+    def to_parquet(quotes: Iterable[Quote], parquet_name: str, row_group_size: int = 100_000) -> int:
+        """
+        Writes the quotes into a Parquet file while iterating over them, row_group_size
+        quotes at a time. The authors are dictionary encoded and the tags are a list
+        column, so they are read back with their types (see QuoteAnalyzer.from_parquet).
+        Returns the number of quotes written.
+        """
+        _require_pyarrow()
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1.")
+        count = 0
+        with (metrics.registry.timer("writer_seconds", format="parquet"),
+              pq.ParquetWriter(parquet_name, QUOTE_SCHEMA) as writer):
+            for batch in QuoteWriter._record_batches(quotes, row_group_size):
+                writer.write_batch(batch, row_group_size=row_group_size)
+                count += batch.num_rows
+        metrics.registry.inc("writer_records_total", count, format="parquet")
+        return count
+
+    @staticmethod
+    def to_arrow(quotes: Iterable[Quote], arrow_name: str) -> int:
+        """
+        Writes the quotes into an Arrow IPC file, which can be memory mapped
+        without any parsing (see QuoteAnalyzer.from_arrow).
+        Returns the number of quotes written.
+        """
+        _require_pyarrow()
+        with metrics.registry.timer("writer_seconds", format="arrow"):
+            # An IPC file has one dictionary per column, so the batches are unified first.
+            table = pa.Table.from_batches(QuoteWriter._record_batches(quotes, 100_000), schema=QUOTE_SCHEMA)
+            table = table.unify_dictionaries()
+            with pa.OSFile(arrow_name, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        metrics.registry.inc("writer_records_total", table.num_rows, format="arrow")
+        return table.num_rows
+
+    @staticmethod
+    def _record_batches(quotes: Iterable[Quote], batch_size: int) -> Iterator["pa.RecordBatch"]:
+        """
+        Converts the quotes into Arrow record batches of batch_size quotes.
+        """
+        batch = []
+        for quote in quotes:
+            batch.append(quote)
+            if len(batch) == batch_size:
+                yield QuoteWriter._record_batch(batch)
+                batch = []
+        if batch:
+            yield QuoteWriter._record_batch(batch)
+
+    @staticmethod
+    def _record_batch(quotes: List[Quote]) -> "pa.RecordBatch":
+        tag_codes, tag_offsets, tag_names = encode_tags(quote.tags for quote in quotes)
+        tags = pa.ListArray.from_arrays(
+            pa.array(tag_offsets, pa.int32()),
+            pa.DictionaryArray.from_arrays(pa.array(tag_codes, pa.int32()), pa.array(tag_names, pa.string())),
+        )
+        return pa.RecordBatch.from_arrays([
+            pa.array([quote.text for quote in quotes], pa.string()),
+            pa.array([quote.author for quote in quotes], pa.string()).dictionary_encode(),
+            tags,
+        ], schema=QUOTE_SCHEMA)
+
+    @staticmethod
+    def _drop_incomplete_line(file_name: str):
+        """
+        Removes the part of the file after its last newline,
+        which is left by a write that was interrupted.
+        """
+        if not os.path.exists(file_name):
+            return
+        with open(file_name, "rb+") as file:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            if size == 0:
+                return
+            # Search the last newline, reading the file backwards in blocks.
+            position = size
+            while position > 0:
+                block_start = max(0, position - 4096)
+                file.seek(block_start)
+                block = file.read(position - block_start)
+                if position == size and block.endswith(b"\n"):
+                    return # The last line is complete.
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    file.truncate(block_start + newline + 1)
+                    return
+                position = block_start
+            file.truncate(0) # There is no complete line at all.
 
 def main():
     """
@@ -318,18 +1691,27 @@ def main():
     baseurl = "http://quotes.toscrape.com"
     csv_name = "quotes.csv"
     json_name = "quotes.json"
+    metrics_prom_name = "metrics.prom"
+    metrics_json_name = "metrics.json"
     start_page = 1
-    end_page = 5
 
     url_creator = PageURLCreator(baseurl=baseurl)
-    scraper = QuoteScraper(url_creator=url_creator)
-    quotes = scraper.scrape_pages(start_page, end_page)
+    # Reuse the connections for all the pages, slow down and retry if the site throttles us.
+    with ThrottledSession(create_session()) as session:
+        scraper = QuoteScraper(url_creator=url_creator, session=session)
+        # Stops at the last page, the quotes seen on an earlier page are skipped.
+        quotes = scraper.scrape_all_pages(start_page, dedup=ExactIndex())
 
     QuoteWriter.to_csv(quotes, csv_name)
     print(f"\u2713 Saved {len(quotes)} quotes in {csv_name}")
     QuoteWriter.to_json(quotes, json_name)
     print(f"\u2713 Saved {len(quotes)} quotes in {json_name}")
 
+    # Every stage of the run is recorded, export the metrics.
+    metrics.registry.write_prometheus(metrics_prom_name)
+    metrics.registry.write_json(metrics_json_name, exclude=("page",)) # Summary per scraper.
+    print(f"\u2713 Saved the metrics in {metrics_prom_name} and {metrics_json_name}")
+
     if len(quotes) == 0:
         print("No quotes to analyze")
         return
@@ -341,8 +1723,10 @@ def main():
 
     # < --- Some Analysis on Data --- >
     print(f"Number of quotes: {len(analyzer.get().index)}")
-    # Get the text column, take the lengths of all column, calculate the average.
-    print(f"Average quote length: {analyzer.get_column("text").apply(len).mean()}")
+    print(f"Average quote length: {analyzer.length_stats()['mean']:.1f}")
+    print(f"Median quote length: {analyzer.length_stats()['50%']:.0f}")
+    print(f"Top authors:\n{analyzer.top_authors(5).to_string()}")
+    print(f"Top tags:\n{analyzer.top_tags(5).to_string()}")
 
 
 if __name__ == "__main__":
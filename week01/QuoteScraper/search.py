@@ -0,0 +1,323 @@
+"""
+Full-text search of the quote texts.
+
+SearchIndex is an inverted index of the words of the documents: every word
+has the documents it is in, how many times, and the positions, so a query
+only reads the postings of its own words instead of scanning all the texts.
+A query is made of clauses (see parse_query):
+   * love             : a word.
+   * "be yourself"    : a phrase, the words one after another.
+   * insp*            : the words starting with insp, also at the end of a phrase.
+A document matches if it matches all the clauses. The matches are ranked with
+BM25. Documents can be added at any time, the index is updated in place.
+"""
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import re
+import numpy as np
+import pandas as pd # For encoding the words.
+
+_WORD = re.compile(r"\w+")
+_CLAUSE = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits the text into lower case words, the punctuation is dropped.
+    """
+    return _WORD.findall(text.casefold())
+
+@dataclass(frozen=True)
+class Clause:
+    """
+    A clause of a query.
+       * terms  : The words, more than one for a phrase.
+       * prefix : Whether the last word is a prefix of the words to match.
+    """
+    terms: Tuple[str, ...]
+    prefix: bool = False
+
+def parse_query(query: str) -> List[Clause]:
+    """
+    Splits the query into clauses, e.g. 'love "be yourself" insp*'.
+    A word the tokenizer splits, like don't, becomes a phrase. The last word
+    of a phrase can be a prefix too, e.g. "be your*".
+    """
+    clauses = []
+    for phrase, word in _CLAUSE.findall(query):
+        terms = tuple(tokenize(phrase or word))
+        if terms:
+            clauses.append(Clause(terms, prefix=(phrase or word).endswith("*")))
+    return clauses
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+_POSITION_BITS = 32 # A place in a document is (doc << _POSITION_BITS) + position.
+
+def _intersect(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Returns the values in both sorted arrays of unique values, by a binary
+    search of the values of the shorter array in the longer one.
+    """
+    if len(first) > len(second):
+        first, second = second, first
+    if len(first) == 0:
+        return first
+    found = np.searchsorted(second, first)
+    return first[second[np.minimum(found, len(second) - 1)] == first]
+
+def _union(arrays: List[np.ndarray], size: Optional[int] = None) -> np.ndarray:
+    """
+    Returns the sorted unique values of the sorted arrays of unique values.
+    If the values are less than size, they are marked in a mask of size
+    values instead of sorting them.
+    """
+    if len(arrays) <= 1:
+        return arrays[0] if arrays else _EMPTY
+    if size is None:
+        return np.unique(np.concatenate(arrays))
+    mask = np.zeros(size, dtype=bool)
+    for values in arrays:
+        mask[values] = True
+    return np.flatnonzero(mask)
+
+class _Postings:
+    """
+    The documents of a word, in the order they were added, with the number of
+    times and the positions of the word in them.
+    """
+    __slots__ = ("docs", "freqs", "positions", "__arrays", "__places")
+
+    def __init__(self):
+        self.docs = array("i")
+        self.freqs = array("i")
+        self.positions = array("i") # The positions in docs[0], then in docs[1]...
+        self.__arrays = None
+        self.__places = None
+
+    def extend(self, docs: np.ndarray, freqs: np.ndarray, positions: np.ndarray):
+        """
+        Adds documents after the ones of the postings, given as int32 arrays.
+        """
+        self.docs.frombytes(docs.tobytes())
+        self.freqs.frombytes(freqs.tobytes())
+        self.positions.frombytes(positions.tobytes())
+        self.__arrays = self.__places = None
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns docs and freqs as numpy arrays, kept until the next append.
+        """
+        if self.__arrays is None:
+            self.__arrays = (np.array(self.docs, dtype=np.int64), np.array(self.freqs, dtype=np.float64))
+        return self.__arrays
+
+    def places(self, offset: int) -> np.ndarray:
+        """
+        Returns the sorted places of the word (see _POSITION_BITS), moved back
+        by offset positions, the ones before the start of the document are left out.
+        The places are kept until the next append, only the words of phrases need them.
+        """
+        if self.__places is None:
+            docs = np.repeat(np.array(self.docs, dtype=np.int64), np.array(self.freqs, dtype=np.int64))
+            self.__places = (docs << _POSITION_BITS) + np.array(self.positions, dtype=np.int64)
+        if offset == 0:
+            return self.__places
+        return self.__places[(self.__places & ((1 << _POSITION_BITS) - 1)) >= offset] - offset
+
+class SearchIndex:
+    """
+    Inverted index with positional postings, see the module documentation.
+    The documents are numbered in the order they are added, from 0.
+    k1 and b are the BM25 parameters: how fast the score saturates with the
+    number of times a word is in a document, and how much long documents are
+    penalized.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.__postings: Dict[str, _Postings] = {}
+        self.__lengths = array("i") # Number of words of every document.
+        self.__total_length = 0
+        self.__terms: Optional[List[str]] = None # Sorted words for the prefixes, None if outdated.
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "SearchIndex":
+        index = cls(k1, b)
+        index.add_many(texts)
+        return index
+
+    def add(self, text: str) -> int:
+        """
+        Adds a document, returns its number.
+        """
+        self.add_many([text])
+        return len(self) - 1
+
+    def add_many(self, texts: Iterable[str]):
+        """
+        Adds the documents, the postings of every word are extended once.
+        """
+        words_of_texts = [tokenize(text) for text in texts]
+        lengths = np.fromiter(map(len, words_of_texts), dtype=np.int64, count=len(words_of_texts))
+        codes, words = pd.factorize(np.array(list(chain.from_iterable(words_of_texts)), dtype=object))
+        self.__lengths.frombytes(lengths.astype(np.int32).tobytes())
+        self.__total_length += len(codes)
+        if len(codes) == 0:
+            return
+        docs = np.repeat(np.arange(len(self) - len(lengths), len(self)), lengths)
+        positions = np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        # Group the words by the code, the documents and positions stay in order in a group.
+        order = np.argsort(codes, kind="stable")
+        codes, docs, positions = codes[order], docs[order], positions[order].astype(np.int32)
+        # A posting starts where the word or the document changes.
+        starts = np.flatnonzero(np.concatenate(([True], (codes[1:] != codes[:-1]) | (docs[1:] != docs[:-1]))))
+        freqs = np.diff(np.append(starts, len(codes))).astype(np.int32)
+        posting_codes, posting_docs = codes[starts], docs[starts].astype(np.int32)
+        word_starts = np.searchsorted(posting_codes, np.arange(len(words) + 1))
+
+        for code, word in enumerate(words.tolist()):
+            postings = self.__postings.get(word)
+            if postings is None:
+                postings = self.__postings[word] = _Postings()
+                self.__terms = None
+            first, last = word_starts[code], word_starts[code + 1]
+            end = starts[last] if last < len(starts) else len(codes)
+            postings.extend(posting_docs[first:last], freqs[first:last], positions[starts[first]:end])
+
+    def __len__(self) -> int:
+        return len(self.__lengths)
+
+    def match(self, query: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the sorted numbers of the documents matching all the clauses of
+        the query, only the ones in rows if rows is not None.
+        """
+        return self.__evaluate(query, rows)[0]
+
+    def search(self, query: str, rows: Optional[np.ndarray] = None,
+               limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the numbers of the documents matching the query, only the ones
+        in rows if rows is not None, and their BM25 scores, best first.
+        At most limit documents are returned if limit is not None.
+        """
+        docs, components = self.__evaluate(query, rows)
+        if len(docs) == 0:
+            return docs, np.zeros(0)
+
+        lengths = np.frombuffer(self.__lengths, dtype=np.int32)[docs]
+        norms = self.k1 * (1 - self.b + self.b * lengths / (self.__total_length / len(self)))
+        # All the postings are scored at once, the ones of the matching documents are kept.
+        component_docs = np.concatenate([component_docs for component_docs, _ in components])
+        freqs = np.concatenate([freqs for _, freqs in components])
+        idfs = np.repeat([self.__idf(len(component_docs)) for component_docs, _ in components],
+                         [len(component_docs) for component_docs, _ in components])
+        if len(component_docs) > len(self) // 8:
+            # Many postings, look up their place in docs in an array of all the documents.
+            lookup = np.full(len(self), -1, dtype=np.int64)
+            lookup[docs] = np.arange(len(docs))
+            found = lookup[component_docs]
+            has = found >= 0
+        else:
+            found = np.minimum(np.searchsorted(docs, component_docs), len(docs) - 1)
+            has = docs[found] == component_docs
+        where, freqs = found[has], freqs[has]
+        scores = np.bincount(where, weights=idfs[has] * freqs * (self.k1 + 1) / (freqs + norms[where]),
+                             minlength=len(docs))
+
+        if limit is not None and limit < len(docs):
+            best = np.argpartition(-scores, limit)[:limit]
+        else:
+            best = np.arange(len(docs))
+        best = best[np.lexsort((docs[best], -scores[best]))] # Equal scores in document order.
+        return docs[best], scores[best]
+
+    def selectivity(self, query: str) -> float:
+        """
+        Estimated fraction of the documents matching the query, from the
+        number of documents of its least common clause.
+        """
+        if len(self) == 0:
+            return 0.0
+        counts = []
+        for clause in parse_query(query):
+            if len(clause.terms) == 1:
+                words = self.__words(clause)
+            else: # At most the documents of its least common whole word.
+                words = [min(clause.terms[:-1], key=self.__count)]
+            counts.append(min(len(self), sum(self.__count(word) for word in words)))
+        return min(counts, default=0) / len(self)
+
+    def __count(self, word: str) -> int:
+        """
+        Number of documents with the word.
+        """
+        return len(self.__postings[word].docs) if word in self.__postings else 0
+
+    def __evaluate(self, query: str, rows: Optional[np.ndarray]) -> Tuple[np.ndarray, List[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Returns the matching documents and the postings to score them: the
+        documents and frequencies of every word, or of a phrase as a whole.
+        """
+        clauses = parse_query(query)
+        if not clauses: # An empty query matches nothing, whatever the rows are.
+            return _EMPTY, []
+        docs = None if rows is None else np.unique(rows)
+        components = []
+        for clause in clauses:
+            if len(clause.terms) == 1:
+                clause_components = [self.__postings[word].arrays() for word in self.__words(clause)]
+                clause_docs = _union([component_docs for component_docs, _ in clause_components], len(self))
+            else:
+                clause_docs, freqs = self.__phrase(clause)
+                clause_components = [(clause_docs, freqs)]
+            docs = clause_docs if docs is None else _intersect(docs, clause_docs)
+            components.extend(clause_components)
+        return docs, components
+
+    def __phrase(self, clause: Clause) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the documents with the words of the phrase one after another,
+        and the number of times the phrase is in them.
+        """
+        # The words that can be in every place of the phrase, more than one for a prefix.
+        slots = [[term] if term in self.__postings else [] for term in clause.terms[:-1]]
+        slots.append(self.__words(Clause(clause.terms[-1:], clause.prefix)))
+        # The places where the phrase starts: every word moved back by its offset in the phrase.
+        # The least common words go first, so the intersections stay small.
+        starts = None
+        for offset, slot in sorted(enumerate(slots), key=lambda item: sum(map(self.__count, item[1]))):
+            places = _union([self.__postings[word].places(offset) for word in slot])
+            starts = places if starts is None else _intersect(starts, places)
+            if len(starts) == 0:
+                break
+        docs, freqs = np.unique(starts >> _POSITION_BITS, return_counts=True)
+        return docs, freqs.astype(np.float64)
+
+    def __words(self, clause: Clause) -> List[str]:
+        """
+        Returns the indexed words the one word clause matches, all the words
+        starting with it for a prefix.
+        """
+        term = clause.terms[0]
+        if not clause.prefix:
+            return [term] if term in self.__postings else []
+        if self.__terms is None:
+            self.__terms = sorted(self.__postings)
+        words = []
+        for index in range(bisect_left(self.__terms, term), len(self.__terms)):
+            if not self.__terms[index].startswith(term):
+                break
+            words.append(self.__terms[index])
+        return words
+
+    def __idf(self, count: int) -> float:
+        """
+        Inverse document frequency of a word in count documents.
+        """
+        return math.log(1 + (len(self) - count + 0.5) / (count + 0.5))
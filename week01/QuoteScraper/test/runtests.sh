@@ -2,7 +2,21 @@
 
 python3 test_scrape_pages.py # Test the scrape_pages method
 python3 test_scrape_page.py
+python3 test_scrape_pages_concurrent.py
+python3 test_iter_pages.py
+python3 test_scrape_all_pages.py
+python3 test_ascrape_pages.py
+python3 test_scrape_pages_pipelined.py
+python3 test_checkpoint.py
 pytest test_quotes_class.py
 pytest test_page_url_creator.py
+pytest test_session.py
 pytest test_extract_data.py
-pytest test_analyzer.py
\ No newline at end of file
+pytest test_parser_backends.py
+pytest test_analyzer.py
+pytest test_writer.py
+pytest test_dedup.py
+pytest test_metrics.py
+python3 test_log_config.py
+pytest test_arrow_io.py
+pytest test_search.py
\ No newline at end of file
@@ -5,7 +5,7 @@ Tests the QuoteAnalyzer class.
 import pytest
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from scraper import Quote, QuoteAnalyzer
+from scraper import Quote, QuoteAnalyzer, TagIndex, encode_tags
 import pandas as pd
 
 @pytest.mark.parametrize("input, expected, min_length, negate",
@@ -90,3 +90,254 @@ def test_minimum_length(input, expected, min_length, negate):
     expected_df = expected_df.reset_index(drop=True)
     assert filtered_data.equals(expected_df)
     
+
+TAGGED_QUOTES = [
+    Quote("Text 1", "author1", ["life", "love"]),
+    Quote("Text 2", "author2", ["love"]),
+    Quote("Text 3", "author1", ["life", "humor"]),
+    Quote("Text 4", "author3", []),
+    Quote("Text 5", "author2", ["friends", "love", "humor"]),
+]
+
+@pytest.mark.parametrize("tag, negate, expected",
+[
+    ["love", False, ["Text 1", "Text 2", "Text 5"]],
+    ["love", True, ["Text 3", "Text 4"]],
+    ["missing", False, []],
+    ["missing", True, ["Text 1", "Text 2", "Text 3", "Text 4", "Text 5"]],
+])
+def test_by_tag(tag, negate, expected):
+    """
+    by_tag should give the same rows as looking into the tag list of every quote.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    assert list(analyzer.by_tag(tag, negate).get()["text"]) == expected
+
+@pytest.mark.parametrize("all_of, any_of, none_of, expected",
+[
+    [["life", "love"], [], [], ["Text 1"]],
+    [[], ["life", "friends"], [], ["Text 1", "Text 3", "Text 5"]],
+    [["love"], [], ["humor"], ["Text 1", "Text 2"]],
+    [[], ["humor", "life"], ["love"], ["Text 3"]],
+    [[], [], [], ["Text 1", "Text 2", "Text 3", "Text 4", "Text 5"]],
+])
+def test_by_tags(all_of, any_of, none_of, expected):
+    """
+    Tests the AND/OR/NOT combinations of the tags.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    assert list(analyzer.by_tags(all_of, any_of, none_of).get()["text"]) == expected
+
+def test_by_tag_after_other_filters():
+    """
+    The tag filter should keep the filters applied before it.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    result = analyzer.by_author("author2").by_tag("humor").get()
+
+    assert list(result["text"]) == ["Text 5"]
+    assert analyzer.clear_filters().by_tag("life").count() == 2
+
+def test_by_tag_empty():
+    assert QuoteAnalyzer([]).by_tags(all_of=["love"], none_of=["life"]).count() == 0
+
+def test_tag_index_rows():
+    """
+    The rows of every tag should be sorted and counted once, even if the tag is twice in a row.
+    """
+    index = TagIndex.from_lists([["b", "a"], [], ["a", "a"], ["c"], ["a"]])
+
+    assert index.tags == ["b", "a", "c"]
+    assert index.rows("a").tolist() == [0, 2, 4]
+    assert (index.count("a"), index.count("c"), index.count("missing")) == (3, 1, 0)
+    assert index.match(all_of=["a"], none_of=["b"]).tolist() == [False, False, True, False, True]
+
+def test_filter_chain():
+    """
+    A chain of filters should give the same rows in any order, and count should match get.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    first = analyzer.by_tag("love").by_author("author1", negate=True).maximum_length(6).get()
+    second = analyzer.clear_filters().maximum_length(6).by_author("author1", negate=True).by_tag("love").get()
+
+    assert list(first["text"]) == list(second["text"]) == ["Text 2", "Text 5"]
+    assert analyzer.count() == 2
+    assert list(analyzer.get_column("author")) == ["author2", "author2"]
+
+def test_encoded_columns_decoded():
+    """
+    The encoded author and tag columns should be decoded back to the original values,
+    with the position of the quote as the index.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    result = analyzer.by_author("author1", negate=True).get()
+
+    assert list(result.index) == [1, 3, 4]
+    assert list(result["author"]) == ["author2", "author3", "author2"]
+    assert list(result["tags"]) == [["love"], [], ["friends", "love", "humor"]]
+    assert list(analyzer.get_column("length")) == [6, 6, 6]
+
+def test_unknown_column():
+    with pytest.raises(KeyError):
+        QuoteAnalyzer(TAGGED_QUOTES).get_column("missing")
+
+def test_quotes_per_author_and_tag():
+    """
+    The counts should follow the filters, most quotes first, first seen first on ties.
+    """
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    assert analyzer.quotes_per_author().to_dict() == {"author1": 2, "author2": 2, "author3": 1}
+    assert list(analyzer.top_tags(2).index) == ["love", "life"]
+
+    analyzer.by_tag("love")
+    assert analyzer.quotes_per_author().to_dict() == {"author2": 2, "author1": 1}
+    assert analyzer.quotes_per_tag().to_dict() == {"love": 3, "humor": 1, "life": 1, "friends": 1}
+    assert list(analyzer.top_authors(1).index) == ["author2"]
+
+def test_quotes_per_tag_repeated_tag():
+    """
+    A tag given twice in a quote should count the quote once.
+    """
+    analyzer = QuoteAnalyzer([Quote("x", "A", ["t", "t"]), Quote("y", "B", ["u", "t"])])
+
+    assert analyzer.quotes_per_tag().to_dict() == {"t": 2, "u": 1}
+    assert analyzer.top_tags(1).to_dict() == {"t": 2}
+
+    analyzer.add_quotes([Quote("z", "C", ["u"])]).by_author("A", negate=True)
+    assert analyzer.quotes_per_tag().to_dict() == {"u": 2, "t": 1}
+
+def test_length_aggregates():
+    quotes = [Quote("x" * length, "author") for length in (10, 20, 30, 40)]
+    analyzer = QuoteAnalyzer(quotes)
+
+    stats = analyzer.length_stats(percentiles=(50,))
+    lengths = pd.Series([10, 20, 30, 40])
+    assert stats["count"] == 4 and stats["mean"] == 25 and stats["50%"] == 25
+    assert stats["std"] == pytest.approx(lengths.std())
+    assert (stats["min"], stats["max"]) == (10, 40)
+    assert analyzer.length_distribution(bins=3).sum() == 4
+
+    assert analyzer.minimum_length(100).length_stats()["count"] == 0
+    assert analyzer.length_distribution().empty
+
+def test_length_distribution_ranges():
+    """
+    Every length should be in the range it is counted in, the longest one in the last range.
+    """
+    quotes = [Quote("x" * length, "author") for length in (10, 20, 30, 40)]
+
+    distribution = QuoteAnalyzer(quotes).length_distribution(bins=3)
+
+    assert distribution.tolist() == [1, 1, 2]
+    assert [interval.closed for interval in distribution.index] == ["left", "left", "both"]
+    assert 40 in distribution.index[-1] and 10 in distribution.index[0]
+
+def test_aggregates_cached_until_filters_change():
+    analyzer = QuoteAnalyzer(TAGGED_QUOTES)
+
+    first = analyzer.quotes_per_author()
+    first["author1"] = 100 # Changing the result should not change the cache.
+    assert analyzer.quotes_per_author()["author1"] == 2
+
+    analyzer.by_author("author1")
+    assert analyzer.quotes_per_author().to_dict() == {"author1": 2}
+    analyzer.clear_filters()
+    assert analyzer.quotes_per_author()["author2"] == 2
+
+SEARCH_QUOTES = [
+    Quote("Love all, trust a few.", "author1", ["love"]),
+    Quote("The world is a book.", "author2", ["books"]),
+    Quote("Love is the beauty of the soul. Love, love.", "author2", ["love"]),
+    Quote("Be the change you wish to see in the world.", "author1", ["change"]),
+]
+
+def test_by_text_with_other_filters():
+    analyzer = QuoteAnalyzer(SEARCH_QUOTES)
+
+    assert list(analyzer.by_text("love").get().index) == [0, 2]
+    assert list(analyzer.by_author("author2").get()["text"]) == ["Love is the beauty of the soul. Love, love."]
+    assert list(analyzer.clear_filters().by_text('"the world"', negate=True).get().index) == [0, 2]
+
+def test_search_ranked():
+    """
+    The results should be ranked by BM25 among the filtered quotes only.
+    """
+    analyzer = QuoteAnalyzer(SEARCH_QUOTES)
+
+    result = analyzer.search("love")
+    assert list(result.index) == [2, 0]
+    assert list(result.columns) == ["text", "author", "tags", "score"]
+    assert result["score"].is_monotonic_decreasing
+
+    assert list(analyzer.by_author("author1").search("love").index) == [0]
+    assert list(analyzer.clear_filters().search("wor*", limit=1).index) == [1]
+
+def test_search_empty_query_with_filter():
+    """
+    A query without words should give no quotes, also when a filter is active.
+    """
+    result = QuoteAnalyzer(SEARCH_QUOTES).by_author("author1").search("!!!")
+
+    assert result.empty
+    assert list(result.columns) == ["text", "author", "tags", "score"]
+
+def test_add_quotes():
+    """
+    Added quotes should be filtered, searched and aggregated like the first ones.
+    """
+    analyzer = QuoteAnalyzer(SEARCH_QUOTES[:2])
+    analyzer.by_text("love")
+    assert analyzer.count() == 1
+
+    analyzer.add_quotes(SEARCH_QUOTES[2:] + [Quote("Love is patient.", "author3", ["love", "patience"])])
+
+    assert list(analyzer.get().index) == [0, 2, 4]
+    assert list(analyzer.get()["author"]) == ["author1", "author2", "author3"]
+    assert list(analyzer.get()["tags"]) == [["love"], ["love"], ["love", "patience"]]
+    assert analyzer.quotes_per_tag().to_dict() == {"love": 3, "patience": 1}
+    assert list(analyzer.by_tag("patience").get()["text"]) == ["Love is patient."]
+    assert analyzer.clear_filters().by_author("author3").count() == 1
+
+def test_add_quotes_one_by_one():
+    """
+    Quotes added one at a time should give the same results as the quotes given at once,
+    also for the tag bitmaps built before the quotes are added.
+    """
+    quotes = [Quote(f"Text {i}", f"author{i % 3}", [f"tag{i % 4}", f"tag{i % 5}"]) for i in range(40)]
+    expected = QuoteAnalyzer(quotes)
+    analyzer = QuoteAnalyzer(quotes[:3])
+    analyzer.by_tags(any_of=["tag1", "tag3"], none_of=["tag2"]) # Builds the bitmaps of the tags.
+    assert analyzer.count() > 0
+
+    for quote in quotes[3:]:
+        analyzer.add_quotes([quote])
+
+    expected.by_tags(any_of=["tag1", "tag3"], none_of=["tag2"])
+    assert analyzer.get().equals(expected.get())
+    assert analyzer.quotes_per_author().equals(expected.quotes_per_author())
+    for tag in ["tag0", "tag4"]:
+        assert analyzer.clear_filters().by_tag(tag).get().equals(expected.clear_filters().by_tag(tag).get())
+    # The texts of all the chunks, in the order of the ranking.
+    assert analyzer.clear_filters().search("text", limit=None)["text"].tolist() == \
+        expected.clear_filters().search("text", limit=None)["text"].tolist()
+
+def test_tag_index_append():
+    index = TagIndex.from_lists([["a"], ["b"]])
+    assert index.match(all_of=["a"]).tolist() == [True, False]
+
+    index.append(*encode_tags([["c", "a"]] * 9, index.tags))
+
+    assert index.tags == ["a", "b", "c"]
+    assert index.rows("a").tolist() == [0] + list(range(2, 11))
+    assert (index.count("a"), index.count("c")) == (10, 9)
+    assert index.match(all_of=["a"]).tolist() == [True, False] + [True] * 9
+    assert not index.repeated
+
+    index.append(*encode_tags([["b", "b"]], index.tags))
+    assert index.repeated and index.count("b") == 2
@@ -0,0 +1,91 @@
+"""
+Tests the Parquet and Arrow files of the quotes and loading the analyzer from them.
+"""
+
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scraper import Quote, QuoteAnalyzer, QuoteWriter
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+QUOTES = [
+    Quote(f"Quote number {i} “ü”", f"Author {i % 3}", [f"tag{i % 4}", "common"] if i % 5 else [])
+    for i in range(25)
+]
+
+@pytest.fixture(params=["parquet", "arrow"])
+def saved(request, tmp_path):
+    """
+    Writes QUOTES with the writer of the format, returns the loader and the file.
+    """
+    path = str(tmp_path / f"quotes.{request.param}")
+    if request.param == "parquet":
+        # Small row groups, so the file has several dictionaries.
+        assert QuoteWriter.to_parquet(QUOTES, path, row_group_size=7) == len(QUOTES)
+        return QuoteAnalyzer.from_parquet, path
+    assert QuoteWriter.to_arrow(iter(QUOTES), path) == len(QUOTES)
+    return QuoteAnalyzer.from_arrow, path
+
+def test_schema(tmp_path):
+    """
+    The authors and the tags should be dictionary encoded, the tags a list column.
+    """
+    path = str(tmp_path / "quotes.parquet")
+    QuoteWriter.to_parquet(QUOTES, path)
+    schema = pq.read_schema(path)
+
+    assert schema.field("text").type == pa.string()
+    assert pa.types.is_dictionary(schema.field("author").type)
+    assert pa.types.is_list(schema.field("tags").type)
+    assert pa.types.is_dictionary(schema.field("tags").type.value_type)
+
+def test_round_trip(saved):
+    load, path = saved
+    expected = QuoteAnalyzer(QUOTES)
+
+    analyzer = load(path)
+
+    assert analyzer.get().equals(expected.get())
+    assert analyzer.get_column("length").tolist() == expected.get_column("length").tolist()
+
+def test_filters_after_load(saved):
+    """
+    The analyzer loaded from a file should filter like one created from the quotes.
+    """
+    load, path = saved
+    analyzer = load(path)
+    expected = QuoteAnalyzer(QUOTES)
+
+    result = analyzer.by_tags(all_of=["common"], none_of=["tag1"]).get()
+
+    assert result.equals(expected.by_tags(all_of=["common"], none_of=["tag1"]).get())
+    assert len(result) > 0
+
+def test_empty(saved, tmp_path):
+    load, path = saved
+    empty_path = path.replace("quotes", "empty")
+    if path.endswith(".parquet"):
+        QuoteWriter.to_parquet([], empty_path)
+    else:
+        QuoteWriter.to_arrow([], empty_path)
+
+    assert len(load(empty_path).get()) == 0
+
+def test_column_projection(tmp_path):
+    """
+    Extra columns in the file should not be loaded.
+    """
+    path = str(tmp_path / "quotes.parquet")
+    QuoteWriter.to_parquet(QUOTES, path)
+    table = pq.read_table(path).append_column("extra", pa.array(range(len(QUOTES))))
+    pq.write_table(table, path)
+
+    analyzer = QuoteAnalyzer.from_parquet(path)
+
+    assert list(analyzer.get().columns) == ["text", "author", "tags"]
+
+def test_invalid_row_group_size(tmp_path):
+    with pytest.raises(ValueError):
+        QuoteWriter.to_parquet(QUOTES, str(tmp_path / "quotes.parquet"), row_group_size=0)
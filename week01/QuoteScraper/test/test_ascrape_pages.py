@@ -0,0 +1,117 @@
+"""
+This program tests the ascrape_pages coroutine
+of BaseMultiPageScraper class against a local aiohttp server.
+"""
+import asyncio
+import socket
+import unittest
+from unittest.mock import Mock
+from aiohttp import web
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper import QuoteScraper, PageURLCreator
+import metrics
+
+def _quote_page(page):
+    """Returns an HTML page with one quote in it."""
+    return f"""
+    <html><body>
+        <div class="quote">
+            <span class="text">Text{page}</span>
+            <small class="author">Author{page}</small>
+            <a class="tag">tag{page}</a>
+        </div>
+    </body></html>
+    """
+
+class TestAscrapePages(unittest.IsolatedAsyncioTestCase):
+    """Test Cases"""
+    async def asyncSetUp(self):
+        """Starts a local server which serves quote pages."""
+        self.delays = {} # page -> seconds to wait before responding
+        self.active = 0
+        self.max_active = 0
+
+        async def handler(request):
+            page = int(request.match_info["page"])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                await asyncio.sleep(self.delays.get(page, 0.01))
+            finally:
+                self.active -= 1
+            if page == 404:
+                return web.Response(status=404)
+            return web.Response(text=_quote_page(page), content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/page/{page}", handler)
+        self.runner = web.AppRunner(app, handler_cancellation=True)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.scraper = QuoteScraper(PageURLCreator(f"http://127.0.0.1:{port}/"))
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_results_in_page_order(self):
+        """Pages should be returned in page order even if later pages respond first."""
+        self.delays = {1: 0.1, 2: 0.05}
+        quotes = await self.scraper.ascrape_pages(1, 4, max_concurrency=4)
+
+        self.assertEqual([quote.text for quote in quotes], ["Text1", "Text2", "Text3", "Text4"])
+        self.assertEqual(quotes[0].tags, ["tag1"])
+
+    async def test_max_concurrency(self):
+        """No more than max_concurrency requests should be served at the same time."""
+        quotes = await self.scraper.ascrape_pages(1, 8, max_concurrency=2)
+
+        self.assertEqual(len(quotes), 8)
+        self.assertLessEqual(self.max_active, 2)
+
+    async def test_timed_out_page_skipped(self):
+        """A page which takes longer than timeout should be skipped."""
+        self.delays = {2: 1}
+        quotes = await self.scraper.ascrape_pages(1, 3, timeout=0.3)
+
+        self.assertEqual([quote.text for quote in quotes], ["Text1", "Text3"])
+
+    async def test_failed_page_skipped(self):
+        """A page with a status code other than 200 should be skipped."""
+        quotes = await self.scraper.ascrape_pages(403, 404)
+
+        self.assertEqual([quote.text for quote in quotes], ["Text403"])
+
+    async def test_connection_error_skipped(self):
+        """A page whose connection fails should be skipped, not abort the other pages."""
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            port = closed.getsockname()[1] # Nothing listens on it after the with block.
+        before = metrics.registry.counter_value("scraper_fetch_total", status="error")
+
+        quotes = await QuoteScraper(PageURLCreator(f"http://127.0.0.1:{port}/")).ascrape_pages(1, 3)
+
+        self.assertEqual(quotes, [])
+        self.assertEqual(metrics.registry.counter_value("scraper_fetch_total", status="error"), before + 3)
+
+    async def test_cancellation(self):
+        """Cancelling the coroutine should cancel all the pages in flight."""
+        self.delays = {page: 5 for page in range(1, 5)}
+        task = asyncio.create_task(self.scraper.ascrape_pages(1, 4))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.active, 0)
+
+    async def test_invalid_concurrency(self):
+        """max_concurrency must be positive."""
+        with self.assertRaises(ValueError):
+            await QuoteScraper(Mock()).ascrape_pages(1, 2, max_concurrency=0)
+
+if __name__ == "__main__":
+    unittest.main()
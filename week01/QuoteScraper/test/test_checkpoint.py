@@ -0,0 +1,116 @@
+"""
+This program tests the checkpoint journal and the resume
+option of scrape_pages.
+"""
+import json
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from checkpoint import CheckpointJournal
+from scraper import QuoteScraper, PageURLCreator
+
+class CrashingSite:
+    """A session which serves one quote per page and fails the given pages with 503."""
+    def __init__(self, failing_pages=(), crash_at=None):
+        self.requested = []
+        self.lock = threading.Lock()
+        self.failing_pages = failing_pages
+        self.crash_at = crash_at
+
+    def get(self, url, timeout):
+        page = int(url.rsplit("/", 1)[1])
+        with self.lock:
+            self.requested.append(page)
+        if page == self.crash_at:
+            raise RuntimeError("Crashed")
+        response = MagicMock()
+        response.status_code = 503 if page in self.failing_pages else 200
+        response.content = (f'<div class="quote"><span class="text">Text{page}</span>'
+                            f'<small class="author">Author</small><a class="tag">t{page}</a></div>').encode()
+        return response
+
+def _scraper(site):
+    return QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=site)
+
+class TestCheckpoint(unittest.TestCase):
+    """Test Cases"""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.directory.name, "run.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume_after_crash(self):
+        """The pages completed before the crash should not be fetched again."""
+        for workers in [1, 3]:
+            with self.subTest(workers=workers):
+                with self.assertRaises(RuntimeError):
+                    _scraper(CrashingSite(crash_at=5)).scrape_pages(1, 8, checkpoint=self.journal, resume=False)
+
+                site = CrashingSite()
+                quotes = _scraper(site).scrape_pages(1, 8, workers=workers, checkpoint=self.journal)
+
+                self.assertEqual([quote.text for quote in quotes], [f"Text{p}" for p in range(1, 9)])
+                self.assertEqual(quotes[0].tags, ["t1"])
+                self.assertEqual(sorted(site.requested), [5, 6, 7, 8])
+
+    def test_failed_pages_retried(self):
+        """Failed pages should not be saved, so the next run fetches them."""
+        _scraper(CrashingSite(failing_pages=(2,))).scrape_pages(1, 3, checkpoint=self.journal)
+
+        site = CrashingSite()
+        quotes = _scraper(site).scrape_pages(1, 3, checkpoint=self.journal)
+
+        self.assertEqual(site.requested, [2])
+        self.assertEqual(len(quotes), 3)
+
+    def test_no_resume(self):
+        """resume=False should start a new journal."""
+        _scraper(CrashingSite()).scrape_pages(1, 2, checkpoint=self.journal)
+
+        site = CrashingSite()
+        _scraper(site).scrape_pages(1, 2, checkpoint=self.journal, resume=False)
+
+        self.assertEqual(site.requested, [1, 2])
+        with open(self.journal, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_half_written_line(self):
+        """A line cut by a crash should be dropped and the journal should stay valid."""
+        with CheckpointJournal(self.journal) as journal:
+            journal.record("a", [{"text": "T", "author": "A", "tags": []}])
+        with open(self.journal, "a", encoding="utf-8") as file:
+            file.write('{"url": "b", "rec')
+
+        with CheckpointJournal(self.journal) as journal:
+            self.assertTrue(journal.completed("a"))
+            self.assertFalse(journal.completed("b"))
+            journal.record("c", [])
+
+        with open(self.journal, encoding="utf-8") as file:
+            urls = [json.loads(line)["url"] for line in file]
+        self.assertEqual(urls, ["a", "c"])
+
+    def test_malformed_line_skipped(self):
+        """A bad line in the middle should be skipped, the pages after it should be kept."""
+        with CheckpointJournal(self.journal) as journal:
+            journal.record("a", [])
+        with open(self.journal, "a", encoding="utf-8") as file:
+            file.write('not json\n{"url": "b", "records": [{"text": "T"}]}\n{"url": "c", "rec')
+
+        with CheckpointJournal(self.journal) as journal:
+            self.assertTrue(journal.completed("a"))
+            self.assertEqual(journal.records("b"), [{"text": "T"}])
+            self.assertFalse(journal.completed("c"))
+            journal.record("d", [])
+
+        with CheckpointJournal(self.journal) as journal:
+            self.assertEqual(len(journal), 3)
+            self.assertTrue(journal.completed("d"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests the deduplication indexes and the dedup option of the scrapers.
+"""
+
+import pytest
+from unittest.mock import Mock, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from dedup import BloomIndex, ExactIndex, content_hash, load_index, open_index
+from scraper import Quote, QuoteScraper, PageURLCreator
+
+def test_content_hash_normalization():
+    """
+    Case, whitespace and quotation mark differences should not matter.
+    """
+    assert content_hash("“Be  yourself.”", "Oscar Wilde") == content_hash("be yourself.", " oscar wilde")
+    assert content_hash("Be yourself.", "Oscar Wilde") != content_hash("Be yourself.", "Someone Else")
+    assert content_hash("a b", "c") != content_hash("a", "b c"), "The fields should stay separate"
+
+@pytest.mark.parametrize("index", [ExactIndex(), BloomIndex(capacity=100, error_rate=0.01)])
+def test_add(index):
+    key = content_hash("text", "author")
+
+    assert index.add(key)
+    assert not index.add(key)
+    assert key in index
+    assert content_hash("other", "author") not in index
+    assert len(index) == 1
+
+def test_bloom_false_positive_rate():
+    """
+    Up to its capacity, the false positive rate should stay near error_rate.
+    """
+    index = BloomIndex(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        index.add(content_hash(f"quote {i}", "author"))
+
+    false_positives = sum(content_hash(f"new quote {i}", "author") in index for i in range(5000))
+
+    assert false_positives / 5000 < 0.02
+    assert all(content_hash(f"quote {i}", "author") in index for i in range(5000)), "No false negatives"
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_persistence(tmp_path, bloom):
+    """
+    An index saved at the end of a with block should be loaded by the next run.
+    """
+    path = str(tmp_path / "quotes.index")
+    with open_index(path, bloom=bloom, capacity=100) as index:
+        index.add(content_hash("text", "author"))
+
+    loaded = open_index(path)
+
+    assert type(loaded) is (BloomIndex if bloom else ExactIndex)
+    assert content_hash("TEXT", "author") in loaded
+    assert not loaded.add(content_hash("text", "author"))
+    assert len(loaded) == 1
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / "invalid.index"
+    path.write_bytes(b"not an index at all, definitely not")
+    with pytest.raises(ValueError):
+        load_index(str(path))
+
+def _page_response(texts):
+    response = MagicMock()
+    response.status_code = 200
+    response.content = "".join(f'<div class="quote"><span class="text">{text}</span>'
+                               f'<small class="author">A</small></div>' for text in texts).encode()
+    return response
+
+def test_scrape_pages_dedup():
+    """
+    A quote shifted to the next page and the quotes of an earlier run should be skipped.
+    """
+    pages = {"1": ["T1", "T2"], "2": ["T2", "T3"], "3": ["T4"]}
+    session = Mock()
+    session.get.side_effect = lambda url, timeout: _page_response(pages[url.rsplit("/", 1)[1]])
+    quote_scraper = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=session)
+    index = ExactIndex()
+    index.add(content_hash("T4", "A")) # Saved by an earlier run.
+
+    quotes = quote_scraper.scrape_pages(1, 3, workers=2, dedup=index)
+
+    assert [quote.text for quote in quotes] == ["T1", "T2", "T3"]
+    assert len(index) == 4
+
+def test_duplicate_page_does_not_end_pagination():
+    """
+    A page of only duplicates should not look like the empty last page.
+    """
+    pages = {"1": ["T1"], "2": ["T1"], "3": ["T3"], "4": []}
+    session = Mock()
+    session.get.side_effect = lambda url, timeout: _page_response(pages.get(url.rsplit("/", 1)[1], []))
+    quote_scraper = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=session, restrict=True)
+
+    quotes = quote_scraper.scrape_all_pages(prefetch=1, dedup=ExactIndex())
+
+    assert [quote.text for quote in quotes] == ["T1", "T3"]
+
+def test_resume_with_saved_index(tmp_path):
+    """
+    The pages read from the checkpoint journal passed dedup already, so a run resumed
+    with the index saved at the interruption should still return all of their quotes.
+    """
+    pages = {"1": ["T1"], "2": ["T1", "T2"], "3": ["T3"], "4": ["T4"]}
+    session = Mock()
+    session.get.side_effect = lambda url, timeout: _page_response(pages[url.rsplit("/", 1)[1]])
+    quote_scraper = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=session)
+    checkpoint, index_path = str(tmp_path / "run.journal"), str(tmp_path / "run.index")
+
+    with pytest.raises(KeyboardInterrupt):
+        with open_index(index_path) as index:
+            for count, _ in enumerate(quote_scraper.iter_pages(1, 4, checkpoint=checkpoint, dedup=index)):
+                if count == 1:
+                    raise KeyboardInterrupt
+    with open_index(index_path) as index:
+        quotes = quote_scraper.scrape_pages(1, 4, checkpoint=checkpoint, dedup=index)
+
+    assert [quote.text for quote in quotes] == ["T1", "T2", "T3", "T4"]
+    assert session.get.call_count == 4
@@ -0,0 +1,74 @@
+"""
+This program tests the iter_pages and iter_quotes generators.
+"""
+import unittest
+from unittest.mock import Mock, patch, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import scraper
+from scraper import QuoteScraper, PageURLCreator
+
+def fake_get(url, timeout):
+    """Returns a response whose content is the page number, page 2 fails."""
+    page = url.rsplit("/", 1)[1]
+    response = MagicMock()
+    response.status_code = 404 if page == "2" else 200
+    response.content = f"<p>{page}</p>".encode()
+    return response
+
+def fake_scrape_page(soup):
+    """Returns two quotes for each page."""
+    page = soup.get_text()
+    return [scraper.Quote(f"T{page}a", "A"), scraper.Quote(f"T{page}b", "A")]
+
+class TestIterPages(unittest.TestCase):
+    """Test Cases"""
+    def setUp(self):
+        self.get_patch = patch("scraper.requests.get", side_effect=fake_get)
+        self.scrape_patch = patch("scraper.QuoteScraper.scrape_page", side_effect=fake_scrape_page)
+        self.get_mock = self.get_patch.start()
+        self.scrape_patch.start()
+        self.scraper = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"))
+
+    def tearDown(self):
+        self.get_patch.stop()
+        self.scrape_patch.stop()
+
+    def test_pages_yielded_lazily(self):
+        """A page should be yielded before the next one is fetched."""
+        pages = self.scraper.iter_pages(1, 1000)
+        self.assertEqual(self.get_mock.call_count, 0, "Nothing should be fetched before iterating")
+
+        first_page = next(pages)
+
+        self.assertEqual([quote.text for quote in first_page], ["T1a", "T1b"])
+        self.assertEqual(self.get_mock.call_count, 1)
+        self.assertEqual(next(pages), [], "Failed pages should yield an empty list")
+        pages.close()
+
+    def test_concurrent_window(self):
+        """With workers, only a bounded number of pages should be fetched ahead."""
+        pages = self.scraper.iter_pages(1, 1000, workers=2)
+
+        next(pages)
+        pages.close()
+
+        self.assertLessEqual(self.get_mock.call_count, 8)
+
+    def test_iter_quotes(self):
+        """iter_quotes should yield the quotes in the same order as scrape_pages."""
+        for workers in [1, 3]:
+            quotes = list(self.scraper.iter_quotes(1, 5, workers=workers))
+
+            self.assertEqual(quotes, self.scraper.scrape_pages(1, 5))
+            self.assertEqual([quote.text for quote in quotes][:4], ["T1a", "T1b", "T3a", "T3b"])
+
+    def test_invalid_arguments(self):
+        """Invalid arguments should raise before the iteration starts."""
+        with self.assertRaises(ValueError):
+            self.scraper.iter_pages(1, 2, workers=0)
+        with self.assertRaises(ValueError):
+            self.scraper.iter_pages(1, 2, max_in_flight=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+This program tests the queued logging setup of log_config.
+"""
+import logging
+import subprocess
+import unittest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import log_config
+from log_config import SamplingFilter
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def _record(msg, *args):
+    return logging.LogRecord("scraper", logging.INFO, __file__, 1, msg, args, None)
+
+class TestSamplingFilter(unittest.TestCase):
+    """Test Cases"""
+    def test_one_of_every(self):
+        """The first record and then every third one should pass, per message."""
+        sampling = SamplingFilter(3)
+        passed = [sampling.filter(_record("Scraping page: %s", page)) for page in range(7)]
+
+        self.assertEqual(passed, [True, False, False, True, False, False, True])
+        self.assertTrue(sampling.filter(_record("Another message")))
+
+    def test_invalid_every(self):
+        with self.assertRaises(ValueError):
+            SamplingFilter(0)
+
+class TestConfigureLogging(unittest.TestCase):
+    """Test Cases"""
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved = self.root.handlers[:], self.root.level
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, "logs.log")
+
+    def tearDown(self):
+        log_config.stop_logging()
+        for handler in self.root.handlers[:]:
+            self.root.removeHandler(handler)
+            handler.close()
+        self.root.handlers[:], level = self.saved
+        self.root.setLevel(level)
+        self.directory.cleanup()
+
+    def _read_log(self):
+        with open(self.log_file, encoding="utf-8") as file:
+            return file.read().splitlines()
+
+    def test_queued(self):
+        """The records should be written by the listener, all of them once it is stopped."""
+        self.assertTrue(log_config.configure_logging(self.log_file, force=True))
+        for page in range(100):
+            logging.getLogger("scraper").info("Scraping page: %s", page)
+        log_config.stop_logging()
+        logging.getLogger("scraper").info("After stop")
+
+        lines = self._read_log()
+        self.assertEqual(lines[0], "INFO:scraper:Scraping page: 0")
+        self.assertEqual(len(lines), 101, "Records after stop_logging should be written directly")
+
+    def test_sampled(self):
+        log_config.configure_logging(self.log_file, sample_every=10, force=True)
+        for page in range(100):
+            logging.getLogger("scraper").info("Scraping page: %s", page)
+        log_config.stop_logging()
+
+        self.assertEqual(len(self._read_log()), 10)
+
+    def test_existing_configuration_kept(self):
+        """Like basicConfig, the handlers of the application should not be replaced."""
+        handler = logging.NullHandler()
+        self.root.addHandler(handler)
+
+        self.assertFalse(log_config.configure_logging(self.log_file))
+        self.assertIn(handler, self.root.handlers)
+
+    def test_import_opt_out(self):
+        """Importing the scraper should not configure logging if the variable is 0."""
+        code = "import logging, scraper; print(len(logging.getLogger().handlers))"
+        for value, handlers in [("0", "0"), ("1", "1")]:
+            result = subprocess.run([sys.executable, "-c", code], cwd=self.directory.name,
+                                    env={**os.environ, log_config.CONFIG_ENV_VAR: value,
+                                         "PYTHONPATH": PROJECT_DIR},
+                                    capture_output=True, text=True, check=True)
+            self.assertEqual(result.stdout.strip(), handlers)
+        self.assertTrue(os.path.exists(self.log_file))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests the metrics recorded by the scraper.
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "common")))
+import metrics
+from scraper import Quote, QuoteScraper, QuoteWriter, PageURLCreator
+
+@pytest.fixture
+def clean_global_registry():
+    """Resets the registry the scrapers record into."""
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+def test_scraper_stages(clean_global_registry, tmp_path):
+    """
+    Scraping should record every stage, labeled by scraper and page.
+    """
+    response = MagicMock()
+    response.status_code = 200
+    response.content = b"""
+        <div class="quote"><span class="text">T1</span><small class="author">A1</small></div>
+        <div class="quote"><span class="text">T2</span></div>
+    """
+    with patch("scraper.requests.get", return_value=response):
+        quotes = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/")).scrape_pages(1, 2)
+    QuoteWriter.to_jsonl(quotes, str(tmp_path / "quotes.jsonl"))
+
+    registry = clean_global_registry
+    page1 = "https://quotes.toscrape.com/page/1"
+    assert registry.histogram("scraper_fetch_seconds", scraper="QuoteScraper").count == 2
+    assert registry.counter_value("scraper_fetch_total", status="200") == 2
+    assert registry.histogram("scraper_parse_seconds", page=page1).count == 1
+    assert registry.histogram("scraper_extract_seconds", page=page1).count == 2
+    assert registry.counter_value("scraper_items_total", page=page1) == 1
+    assert registry.counter_value("scraper_invalid_items_total", scraper="QuoteScraper") == 2
+    assert registry.counter_value("writer_records_total", format="jsonl") == 2
+
+    registry.write_json(str(tmp_path / "metrics.json"), exclude=("page",))
+    with open(tmp_path / "metrics.json", encoding="utf-8") as file:
+        summary = json.load(file)
+    [items] = summary["counters"]["scraper_items_total"]
+    assert items == {"labels": {"scraper": "QuoteScraper"}, "value": 2}
+
+def test_validation_errors(clean_global_registry):
+    with pytest.raises(Exception):
+        Quote(text=None, author="A")
+    assert clean_global_registry.counter_value("model_validation_errors_total", model="Quote") == 1
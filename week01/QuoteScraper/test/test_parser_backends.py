@@ -0,0 +1,82 @@
+"""
+Tests that all the parser backends and the restricted parse
+mode of QuoteScraper give the same quotes.
+"""
+
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import scraper
+from scraper import QuoteScraper, PageURLCreator
+
+PAGE = b"""
+<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="UTF-8"><title>Quotes to Scrape</title></head>
+<body>
+<div class="container">
+    <div class="row header-box"><div class="col-md-8"><h1><a href="/">Quotes to Scrape</a></h1></div></div>
+    <div class="row">
+    <div class="col-md-8">
+        <div class="quote" itemscope itemtype="http://schema.org/CreativeWork">
+            <span class="text" itemprop="text">\xe2\x80\x9cThe world as we have created it is a process of our thinking.\xe2\x80\x9d</span>
+            <span>by <small class="author" itemprop="author">Albert Einstein</small>
+            <a href="/author/Albert-Einstein">(about)</a></span>
+            <div class="tags">Tags: <a class="tag" href="/tag/change/page/1/">change</a>
+            <a class="tag" href="/tag/deep-thoughts/page/1/">deep-thoughts</a></div>
+        </div>
+        <div class="quote">
+            <span class="text">Tom &amp; Jerry &lt;3</span>
+            <span>by <small class="author">  J.K. Rowling </small></span>
+            <div class="tags">Tags: </div>
+        </div>
+        <div class="quote">
+            <span class="text">A quote without an author</span>
+        </div>
+        <nav><ul class="pager"><li class="next"><a href="/page/2/">Next</a></li></ul></nav>
+    </div>
+    <div class="col-md-4 tags-box"><span class="tag-item"><a class="tag" href="/tag/love/">love</a></span></div>
+    </div>
+</div>
+</body>
+</html>
+"""
+
+def _scraper(parser, restrict):
+    return QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), parser=parser, restrict=restrict)
+
+@pytest.fixture(scope="module")
+def expected():
+    """The quotes of the default html.parser backend."""
+    return _scraper("html.parser", False)._parse_page(PAGE)
+
+@pytest.mark.parametrize("parser, restrict",
+[
+    ("html.parser", True),
+    ("lxml", False),
+    ("lxml", True),
+    ("selectolax", False),
+])
+def test_same_quotes(expected, parser, restrict):
+    """
+    Every backend should produce exactly the same quotes.
+    """
+    if parser == "selectolax" and scraper.LexborHTMLParser is None:
+        pytest.skip("selectolax is not installed")
+
+    assert _scraper(parser, restrict)._parse_page(PAGE) == expected
+
+def test_expected_quotes(expected):
+    """
+    Checks the quotes of the default backend.
+    """
+    assert [quote.author for quote in expected] == ["Albert Einstein", "J.K. Rowling"]
+    assert expected[0].tags == ["change", "deep-thoughts"]
+    assert expected[1].text == "Tom & Jerry <3"
+
+def test_invalid_parser():
+    """
+    Unknown parsers should be rejected.
+    """
+    with pytest.raises(ValueError):
+        _scraper("html5", False)
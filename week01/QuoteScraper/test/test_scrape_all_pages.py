@@ -0,0 +1,119 @@
+"""
+This program tests the automatic pagination of
+scrape_all_pages and iter_all_pages.
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper import QuoteScraper, PageURLCreator
+
+LAST_PAGE = 7
+
+def _page(page):
+    """Returns the HTML of a quotes.toscrape.com like page."""
+    if page > LAST_PAGE:
+        return b"<html><body><div class='col-md-8'>No quotes found!</div></body></html>"
+    pager = f"<li class='next'><a href='/page/{page + 1}/'>Next</a></li>" if page < LAST_PAGE else ""
+    return f"""
+    <html><body><div class="col-md-8">
+        <div class="quote"><span class="text">Text{page}</span><small class="author">Author</small></div>
+        <nav><ul class="pager">{pager}</ul></nav>
+    </div></body></html>
+    """.encode()
+
+class FakeSite:
+    """A session which serves the pages and records the requested ones."""
+    def __init__(self, missing_status=200, failing_pages=()):
+        self.requested = []
+        self.lock = threading.Lock()
+        self.missing_status = missing_status
+        self.failing_pages = failing_pages
+
+    def get(self, url, timeout):
+        page = int(url.rsplit("/", 1)[1])
+        with self.lock:
+            self.requested.append(page)
+        time.sleep(0.01)
+        response = MagicMock()
+        response.status_code = 200
+        if page > LAST_PAGE:
+            response.status_code = self.missing_status
+        if page in self.failing_pages:
+            response.status_code = 503
+        response.content = _page(page)
+        return response
+
+def _scraper(site, **kwargs):
+    return QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=site, **kwargs)
+
+class TestScrapeAllPages(unittest.TestCase):
+    """Test Cases"""
+    def test_next_link(self):
+        """The pages should be scraped until the page without a next link."""
+        site = FakeSite()
+        quotes = _scraper(site).scrape_all_pages(prefetch=3)
+
+        self.assertEqual([quote.text for quote in quotes], [f"Text{p}" for p in range(1, LAST_PAGE + 1)])
+        # At most prefetch - 1 pages after the last one may be requested.
+        self.assertLessEqual(max(site.requested), LAST_PAGE + 2)
+
+    def test_empty_page(self):
+        """If the links are not parsed, the first empty page should end the pagination."""
+        site = FakeSite()
+        quotes = _scraper(site, restrict=True).scrape_all_pages(prefetch=2)
+
+        self.assertEqual(len(quotes), LAST_PAGE)
+
+    def test_not_found(self):
+        """A 404 response should end the pagination."""
+        site = FakeSite(missing_status=404)
+        quotes = _scraper(site, restrict=True).scrape_all_pages(start_page=3, prefetch=1)
+
+        self.assertEqual([quote.text for quote in quotes], [f"Text{p}" for p in range(3, LAST_PAGE + 1)])
+        self.assertEqual(site.requested, list(range(3, LAST_PAGE + 2)), "No page should be wasted")
+
+    def test_failed_page_does_not_stop(self):
+        """A page that fails with another status should be skipped, not end the pagination."""
+        site = FakeSite(failing_pages=(3,))
+        quotes = _scraper(site).scrape_all_pages()
+
+        self.assertEqual(len(quotes), LAST_PAGE - 1)
+
+    def test_failing_pages_end(self):
+        """A site answering errors after its last page should not be crawled forever."""
+        site = FakeSite(missing_status=503)
+        quotes = _scraper(site, restrict=True).scrape_all_pages(prefetch=2, max_failures=3)
+
+        self.assertEqual(len(quotes), LAST_PAGE)
+        self.assertLessEqual(max(site.requested), LAST_PAGE + 3 + 2)
+
+    def test_stop_does_not_wait(self):
+        """Stopping the iteration should not wait for the prefetched pages."""
+        site = FakeSite()
+        site.get = Mock(side_effect=lambda url, timeout: time.sleep(0.5) or FakeSite().get(url, timeout))
+        pages = _scraper(site).iter_all_pages(prefetch=4)
+
+        next(pages)
+        start = time.perf_counter()
+        pages.close()
+        self.assertLess(time.perf_counter() - start, 0.3)
+
+    def test_max_page(self):
+        """No page after max_page should be requested."""
+        site = FakeSite()
+        quotes = _scraper(site).scrape_all_pages(prefetch=4, max_page=2)
+
+        self.assertEqual(len(quotes), 2)
+        self.assertEqual(sorted(site.requested), [1, 2])
+
+    def test_invalid_prefetch(self):
+        with self.assertRaises(ValueError):
+            QuoteScraper(Mock()).iter_all_pages(prefetch=0)
+        with self.assertRaises(ValueError):
+            QuoteScraper(Mock()).iter_all_pages(max_failures=0)
+
+if __name__ == "__main__":
+    unittest.main()
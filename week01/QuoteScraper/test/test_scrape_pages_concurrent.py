@@ -0,0 +1,101 @@
+"""
+This program tests the concurrent mode of the scrape_pages method
+of BaseMultiPageScraper class.
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import scraper
+from scraper import QuoteScraper
+
+def _create_url_mock(start_page, end_page):
+    """Returns a url_creator mock which returns 'https://page.com/<page>' URLs."""
+    url_mock = Mock()
+    url_mock.create_url_of_page_number.side_effect = [
+        f"https://page.com/{p}" for p in range(start_page, end_page + 1)
+    ]
+    return url_mock
+
+def _create_response(status_code, content):
+    """Returns a mock response object."""
+    response_mock = MagicMock()
+    response_mock.status_code = status_code
+    response_mock.content = content
+    return response_mock
+
+class TestConcurrentScrapePages(unittest.TestCase):
+    """Test Cases"""
+    def test_results_in_page_order(self):
+        """
+        Later pages respond faster than earlier ones,
+        but the result must still be in page order.
+        """
+        def fake_get(url, timeout):
+            page = int(url.rsplit("/", 1)[1])
+            time.sleep(0.01 * (6 - page)) # Page 1 is the slowest one.
+            return _create_response(200, f"<p>{page}</p>".encode())
+
+        def fake_scrape_page(soup):
+            page = soup.get_text()
+            return [scraper.Quote(f"T{page}", f"A{page}")]
+
+        with (patch("scraper.requests.get", side_effect=fake_get) as get_mock,
+              patch("scraper.QuoteScraper.scrape_page", side_effect=fake_scrape_page)):
+            obj = QuoteScraper(_create_url_mock(1, 5))
+            data = obj.scrape_pages(1, 5, workers=5)
+
+        self.assertEqual([quote.text for quote in data], ["T1", "T2", "T3", "T4", "T5"])
+        self.assertEqual(get_mock.call_count, 5)
+
+    def test_failed_pages_skipped(self):
+        """Pages with a status code other than 200 should be skipped."""
+        def fake_get(url, timeout):
+            page = int(url.rsplit("/", 1)[1])
+            status_code = 404 if page % 2 == 0 else 200
+            return _create_response(status_code, f"<p>{page}</p>".encode())
+
+        def fake_scrape_page(soup):
+            return [scraper.Quote(f"T{soup.get_text()}", "A")]
+
+        with (patch("scraper.requests.get", side_effect=fake_get),
+              patch("scraper.QuoteScraper.scrape_page", side_effect=fake_scrape_page) as scr_mock):
+            obj = QuoteScraper(_create_url_mock(1, 6))
+            data = obj.scrape_pages(1, 6, workers=3)
+
+        self.assertEqual([quote.text for quote in data], ["T1", "T3", "T5"])
+        self.assertEqual(scr_mock.call_count, 3)
+
+    def test_max_in_flight(self):
+        """The number of requests at the same time should not pass max_in_flight."""
+        lock = threading.Lock()
+        counters = {"current": 0, "max": 0}
+
+        def fake_get(url, timeout):
+            with lock:
+                counters["current"] += 1
+                counters["max"] = max(counters["max"], counters["current"])
+            time.sleep(0.02)
+            with lock:
+                counters["current"] -= 1
+            return _create_response(200, b"<p></p>")
+
+        with (patch("scraper.requests.get", side_effect=fake_get),
+              patch("scraper.QuoteScraper.scrape_page", return_value=[])):
+            obj = QuoteScraper(_create_url_mock(1, 10))
+            obj.scrape_pages(1, 10, workers=8, max_in_flight=2)
+
+        self.assertLessEqual(counters["max"], 2)
+
+    def test_invalid_workers(self):
+        """workers and max_in_flight must be positive."""
+        obj = QuoteScraper(Mock())
+        with self.assertRaises(ValueError):
+            obj.scrape_pages(1, 2, workers=0)
+        with self.assertRaises(ValueError):
+            obj.scrape_pages(1, 2, workers=2, max_in_flight=0)
+
+if __name__ == "__main__":
+    unittest.main()
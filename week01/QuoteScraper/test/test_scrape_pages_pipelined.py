@@ -0,0 +1,71 @@
+"""
+This program tests the scrape_pages_pipelined method
+of BaseMultiPageScraper class.
+"""
+import unittest
+from unittest.mock import Mock, patch, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper import QuoteScraper, PageURLCreator, Quote
+
+def _quote_page(page):
+    """Returns an HTML page with two quotes in it."""
+    return f"""
+    <html><body>
+        <div class="quote">
+            <span class="text">Text{page}a</span><small class="author">Author{page}</small>
+            <a class="tag">tag{page}</a>
+        </div>
+        <div class="quote">
+            <span class="text">Text{page}b</span><small class="author">Author{page}</small>
+        </div>
+    </body></html>
+    """.encode()
+
+def fake_get(url, timeout):
+    """Returns the quote page of the URL, pages divisible by 3 fail."""
+    page = int(url.rsplit("/", 1)[1])
+    response = MagicMock()
+    response.status_code = 500 if page % 3 == 0 else 200
+    response.content = _quote_page(page)
+    return response
+
+class TestScrapePagesPipelined(unittest.TestCase):
+    """Test Cases"""
+    def test_same_result_as_scrape_pages(self):
+        """
+        The pipeline should return the same quotes as the sequential
+        scrape_pages method, in page order.
+        """
+        with patch("scraper.requests.get", side_effect=fake_get):
+            obj = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"))
+            expected = obj.scrape_pages(1, 20)
+            data = obj.scrape_pages_pipelined(1, 20, fetch_workers=3, parse_workers=2, queue_size=2)
+
+        self.assertEqual(data, expected)
+        self.assertEqual(data[0], Quote("Text1a", "Author1", ["tag1"]))
+        self.assertEqual(len(data), 2 * 14) # 6 of 20 pages fail.
+
+    def test_session_not_sent_to_parsers(self):
+        """
+        The session may not be picklable, it should stay in the main process.
+        """
+        session = Mock() # Mock objects cannot be pickled.
+        session.get.side_effect = fake_get
+        obj = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=session)
+
+        data = obj.scrape_pages_pipelined(1, 2, parse_workers=1)
+
+        self.assertEqual([quote.text for quote in data], ["Text1a", "Text1b", "Text2a", "Text2b"])
+        self.assertIs(obj.session, session)
+
+    def test_invalid_arguments(self):
+        """fetch_workers and queue_size must be positive."""
+        obj = QuoteScraper(Mock())
+        with self.assertRaises(ValueError):
+            obj.scrape_pages_pipelined(1, 2, fetch_workers=0)
+        with self.assertRaises(ValueError):
+            obj.scrape_pages_pipelined(1, 2, queue_size=0)
+
+if __name__ == "__main__":
+    unittest.main()
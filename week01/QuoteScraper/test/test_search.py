@@ -0,0 +1,94 @@
+"""
+Tests the full-text search index.
+"""
+
+import pytest
+import numpy as np
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from search import Clause, SearchIndex, parse_query, tokenize
+
+TEXTS = [
+    "“Be yourself; everyone else is already taken.”",
+    "Love all, trust a few, do wrong to none.",
+    "Be the change that you wish to see in the world.",
+    "The world is a book, and those who do not travel read only one page.",
+    "Love is the beauty of the soul. Love, love, love.",
+    "Inspiration exists, but it has to find you working.",
+]
+
+@pytest.fixture
+def index():
+    return SearchIndex.from_texts(TEXTS)
+
+def test_tokenize():
+    assert tokenize("“Be yourself; don't!”") == ["be", "yourself", "don", "t"]
+
+def test_parse_query():
+    assert parse_query('love "Be yourself" insp* don\'t') == [
+        Clause(("love",)),
+        Clause(("be", "yourself")),
+        Clause(("insp",), prefix=True),
+        Clause(("don", "t")),
+    ]
+
+@pytest.mark.parametrize("query, expected", [
+    ["love", [1, 4]],
+    ["LOVE trust", [1]],
+    ['"the world"', [2, 3]],
+    ['"world the"', []],
+    ["insp*", [5]],
+    ['"the wor*"', [2, 3]],
+    ["be* world", [2]],
+    ["missing", []],
+    ["", []],
+])
+def test_match(index, query, expected):
+    assert index.match(query).tolist() == expected
+
+def test_match_in_rows(index):
+    assert index.match("love", rows=np.array([4, 0, 2])).tolist() == [4]
+
+@pytest.mark.parametrize("query", ["", "!!!"])
+def test_empty_query_in_rows(index, query):
+    """
+    A query without words should match nothing, also among given rows.
+    """
+    assert index.match(query, rows=np.array([4, 0, 2])).tolist() == []
+    docs, scores = index.search(query, rows=np.array([4, 0, 2]))
+    assert len(docs) == len(scores) == 0
+
+def test_bm25_ranking(index):
+    """
+    More occurrences in a shorter text should rank first, and the scores should be positive.
+    """
+    docs, scores = index.search("love")
+
+    assert docs.tolist() == [4, 1]
+    assert scores[0] > scores[1] > 0
+
+def test_search_limit(index):
+    docs, scores = index.search("the* be*", limit=1)
+
+    assert len(docs) == len(scores) == 1
+    assert docs[0] in index.match("the* be*")
+
+def test_rare_words_weigh_more(index):
+    """
+    A word in fewer documents should add more to the score.
+    """
+    docs, scores = index.search("be")
+    rare_docs, rare_scores = index.search("yourself")
+
+    assert rare_scores[0] > scores[docs.tolist().index(0)]
+
+def test_incremental_add(index):
+    assert index.add("Love is patient.") == len(TEXTS)
+    assert index.match("love").tolist() == [1, 4, len(TEXTS)]
+    assert index.match("pati*").tolist() == [len(TEXTS)]
+
+def test_selectivity(index):
+    assert index.selectivity("love") == pytest.approx(2 / len(TEXTS))
+    assert index.selectivity("love world") == pytest.approx(2 / len(TEXTS))
+    assert index.selectivity("missing") == 0
+    assert SearchIndex().selectivity("love") == 0
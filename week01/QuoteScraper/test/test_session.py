@@ -0,0 +1,84 @@
+"""
+Tests the create_session function and the session
+injection of BaseMultiPageScraper.
+"""
+
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import scraper
+from scraper import QuoteScraper, PageURLCreator, create_session, DEFAULT_HEADERS
+
+@pytest.mark.parametrize("pool_size", [1, 4, 32])
+def test_pool_size(pool_size):
+    """
+    Both http and https adapters should keep pool_size connections per host.
+    """
+    session = create_session(pool_size=pool_size)
+
+    for prefix in ["http://", "https://"]:
+        adapter = session.get_adapter(prefix + "quotes.toscrape.com")
+        assert adapter._pool_maxsize == pool_size, "Pool size should be equal to pool_size"
+
+def test_headers():
+    """
+    Default headers should be sent with every request, given headers override them.
+    """
+    session = create_session(headers={"User-Agent": "test-agent", "X-Run": "1"})
+
+    assert session.headers["User-Agent"] == "test-agent"
+    assert session.headers["X-Run"] == "1"
+    assert session.headers["Accept"] == DEFAULT_HEADERS["Accept"]
+
+def test_invalid_pool_size():
+    """
+    pool_size must be positive.
+    """
+    with pytest.raises(ValueError):
+        create_session(pool_size=0)
+
+def test_scraper_uses_session():
+    """
+    If a session is given, all the requests should be sent through it.
+    """
+    response_mock = MagicMock()
+    response_mock.status_code = 200
+    response_mock.content = b"<p></p>"
+    session = Mock()
+    session.get.return_value = response_mock
+
+    with (patch("scraper.requests.get") as get_mock,
+          patch("scraper.QuoteScraper.scrape_page", return_value=[])):
+        obj = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=session)
+        obj.scrape_pages(1, 3, workers=2)
+
+    assert session.get.call_count == 3, "Every page should be fetched with the session"
+    assert get_mock.call_count == 0, "requests.get should not be used"
+
+def test_throttled_pages_not_lost():
+    """
+    With a ThrottledSession, pages answered with 429/503 should be retried, not skipped.
+    """
+    from throttle import ThrottledSession
+
+    def response(status_code, page):
+        response_mock = MagicMock()
+        response_mock.status_code = status_code
+        response_mock.headers = {}
+        response_mock.content = f'<div class="quote"><span class="text">T{page}</span><small class="author">A</small></div>'.encode()
+        return response_mock
+
+    attempts = {}
+    def get(url, timeout):
+        page = int(url.rsplit("/", 1)[1])
+        attempts[page] = attempts.get(page, 0) + 1
+        return response(429 if attempts[page] == 1 and page % 2 == 0 else 200, page)
+
+    session = Mock()
+    session.get.side_effect = get
+    throttled = ThrottledSession(session, rate=1000, backoff_base=0.001)
+    quotes = QuoteScraper(PageURLCreator("https://quotes.toscrape.com/"), session=throttled).scrape_pages(1, 6, workers=3)
+
+    assert [quote.text for quote in quotes] == [f"T{page}" for page in range(1, 7)]
+    assert throttled.stats.retries == 3
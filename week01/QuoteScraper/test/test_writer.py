@@ -0,0 +1,86 @@
+"""
+Tests the streaming writers of QuoteWriter.
+"""
+
+import csv
+import json
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scraper import Quote, QuoteWriter
+
+def quote_stream(count, start=0):
+    """Yields count quotes, one at a time."""
+    for i in range(start, start + count):
+        yield Quote(f"Text {i}, with \"quotes\"", f"Author {i}", [f"tag{i}", "common"])
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+def test_jsonl_from_generator(tmp_path):
+    """
+    Every quote of the generator should be written as one line.
+    """
+    path = str(tmp_path / "quotes.jsonl")
+
+    count = QuoteWriter.to_jsonl(quote_stream(25), path, flush_every=10)
+
+    records = read_jsonl(path)
+    assert count == 25
+    assert records[3] == {"text": "Text 3, with \"quotes\"", "author": "Author 3", "tags": ["tag3", "common"]}
+    assert len(records) == 25
+
+def test_jsonl_resume(tmp_path):
+    """
+    Append mode should drop an incomplete line and continue after the last complete one.
+    """
+    path = str(tmp_path / "quotes.jsonl")
+    QuoteWriter.to_jsonl(quote_stream(3), path)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"text": "interrupt') # An interrupted write.
+
+    QuoteWriter.to_jsonl(quote_stream(2, start=3), path, append=True)
+
+    assert [record["author"] for record in read_jsonl(path)] == [f"Author {i}" for i in range(5)]
+
+def test_jsonl_overwrite(tmp_path):
+    """
+    Without append, the file should be overwritten.
+    """
+    path = str(tmp_path / "quotes.jsonl")
+    QuoteWriter.to_jsonl(quote_stream(3), path)
+    QuoteWriter.to_jsonl(quote_stream(1), path)
+
+    assert len(read_jsonl(path)) == 1
+
+def test_csv_same_rows_as_to_csv(tmp_path):
+    """
+    stream_csv should write the same rows as to_csv.
+    """
+    streamed = str(tmp_path / "streamed.csv")
+    materialized = str(tmp_path / "materialized.csv")
+
+    QuoteWriter.stream_csv(quote_stream(5), streamed)
+    QuoteWriter.to_csv(list(quote_stream(5)), materialized)
+
+    with open(streamed, encoding="utf-8", newline="") as file1, \
+         open(materialized, encoding="utf-8", newline="") as file2:
+        assert list(csv.DictReader(file1)) == list(csv.DictReader(file2))
+
+def test_csv_append_header_once(tmp_path):
+    """
+    The header should be written only once in append mode.
+    """
+    path = str(tmp_path / "quotes.csv")
+    QuoteWriter.stream_csv(quote_stream(2), path, append=True)
+    QuoteWriter.stream_csv(quote_stream(2, start=2), path, append=True)
+
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["text", "author", "tags"]
+    assert [row[1] for row in rows[1:]] == ["Author 0", "Author 1", "Author 2", "Author 3"]
+
+def test_invalid_flush_every(tmp_path):
+    with pytest.raises(ValueError):
+        QuoteWriter.to_jsonl(quote_stream(1), str(tmp_path / "q.jsonl"), flush_every=0)
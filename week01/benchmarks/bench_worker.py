@@ -0,0 +1,162 @@
+"""
+Runs one benchmark case and prints its result as JSON.
+
+Started by run_benchmarks.py in a new process for every case,
+so that the peak RSS belongs to that case only, and so that the
+two projects (which both have a scraper.py) do not clash.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import math
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+WEEK01 = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+class TimingSession:
+    """
+    Wraps a session and records the latency of every request.
+    """
+    def __init__(self, session):
+        self.session = session
+        self.latencies = []
+        self.__lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        start = time.perf_counter()
+        response = self.session.get(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self.__lock:
+            self.latencies.append(elapsed)
+        return response
+
+    def close(self):
+        self.session.close()
+
+def percentile(values, percent):
+    """
+    Returns the percentile of the values (nearest rank), None if there is no value.
+    """
+    if len(values) == 0:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+def summarize(pages, seconds, latencies, parse_times, write_seconds, items):
+    """
+    Creates the result dictionary of a case.
+    """
+    return {
+        "pages": pages,
+        "items": items,
+        "seconds": seconds,
+        "pages_per_sec": pages / seconds if seconds > 0 else None,
+        "latency_p50_ms": _ms(percentile(latencies, 50)),
+        "latency_p99_ms": _ms(percentile(latencies, 99)),
+        "parse_ms_per_page": _ms(statistics.fmean(parse_times)) if parse_times else None,
+        "write_seconds": write_seconds,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+def bench_quotes(args):
+    """
+    Benchmarks QuoteScraper.scrape_pages and the QuoteWriter methods.
+    """
+    sys.path.insert(0, os.path.join(WEEK01, "QuoteScraper"))
+    import scraper
+
+    parse_times = []
+    parse_lock = threading.Lock()
+
+    class TimedQuoteScraper(scraper.QuoteScraper):
+        def _parse_page(self, content):
+            start = time.perf_counter()
+            result = super()._parse_page(content)
+            with parse_lock:
+                parse_times.append(time.perf_counter() - start)
+            return result
+
+    session = TimingSession(scraper.create_session(pool_size=max(args.workers, 1)))
+    quote_scraper = TimedQuoteScraper(scraper.PageURLCreator(args.base_url), session=session,
+                                      parser=args.parser, restrict=args.restrict)
+    start = time.perf_counter()
+    quotes = quote_scraper.scrape_pages(1, args.pages, workers=args.workers)
+    seconds = time.perf_counter() - start
+    session.close()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        scraper.QuoteWriter.to_csv(quotes, os.path.join(output_dir, "quotes.csv"))
+        scraper.QuoteWriter.to_json(quotes, os.path.join(output_dir, "quotes.json"))
+        scraper.QuoteWriter.to_jsonl(quotes, os.path.join(output_dir, "quotes.jsonl"))
+        write_seconds = time.perf_counter() - start
+
+    return summarize(args.pages, seconds, session.latencies, parse_times, write_seconds, len(quotes))
+
+def bench_repos(args):
+    """
+    Benchmarks RepoScraper.scrape_page, called once per page from args.workers
+    threads, and the RepoWriter methods.
+    """
+    sys.path.insert(0, os.path.join(WEEK01, "Github_Trendings_Scraper"))
+    import scraper
+    from repo_writer import RepoWriter
+
+    parse_times = []
+    parse_lock = threading.Lock()
+
+    class LocalRepoScraper(scraper.RepoScraper):
+        _url_daily = args.base_url + "trending?since=daily"
+
+        def _make_soup(self, content):
+            start = time.perf_counter()
+            soup = super()._make_soup(content)
+            with parse_lock:
+                parse_times.append(time.perf_counter() - start)
+            return soup
+
+    session = TimingSession(scraper.create_session(pool_size=max(args.workers, 1)))
+    repo_scraper = LocalRepoScraper(session=session, parser=args.parser, restrict=args.restrict)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(lambda _: repo_scraper.scrape_page("daily"), range(args.pages)))
+    seconds = time.perf_counter() - start
+    session.close()
+
+    repos = set().union(*results) if results else set()
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        RepoWriter.save_to_CSV(os.path.join(output_dir, "repos.csv"), repos)
+        RepoWriter.save_to_JSON(os.path.join(output_dir, "repos.json"), repos)
+        write_seconds = time.perf_counter() - start
+
+    return summarize(args.pages, seconds, session.latencies, parse_times, write_seconds,
+                     sum(len(result) for result in results))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("target", choices=["quotes", "repos"])
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--parser", default="html.parser")
+    parser.add_argument("--restrict", action="store_true")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.gettempdir()) # scraper.py writes logs.log into the working directory.
+    result = bench_quotes(args) if args.target == "quotes" else bench_repos(args)
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
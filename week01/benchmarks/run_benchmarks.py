@@ -0,0 +1,108 @@
+"""
+Offline end-to-end benchmarks of the week 1 scrapers.
+
+Starts the stand-in server, then scrapes it with QuoteScraper.scrape_pages and
+RepoScraper.scrape_page at every concurrency level and writes the results with
+the writers. Every case runs in a new process (see bench_worker.py).
+Reports pages/sec, p50/p99 request latency, parse time per page, write time and
+peak RSS, and saves them into a JSON file to compare versions.
+
+Usage:
+    python run_benchmarks.py --concurrency 1 4 16 --latency 0.05 --jitter 0.02 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from stand_in_server import ServerConfig, StandInServer
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_worker.py")
+
+def git_revision() -> str | None:
+    """
+    Returns the commit the benchmarks run on, None if it is not known.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(WORKER), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_case(target: str, base_url: str, pages: int, workers: int, parser: str, restrict: bool) -> dict:
+    """
+    Runs one case in a new process and returns its result.
+    """
+    command = [sys.executable, WORKER, target, "--base-url", base_url, "--pages", str(pages),
+               "--workers", str(workers), "--parser", parser]
+    if restrict:
+        command.append("--restrict")
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark case failed: {' '.join(command)}\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result.update({"target": target, "workers": workers, "parser": parser, "restrict": restrict})
+    return result
+
+def print_table(results: list[dict]):
+    """
+    Prints the results as a table.
+    """
+    header = f"{'target':<7}{'parser':<15}{'workers':>8}{'pages/s':>10}{'p50 ms':>9}{'p99 ms':>9}" \
+             f"{'parse ms':>10}{'write s':>9}{'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        parser = result["parser"] + ("+r" if result["restrict"] else "")
+        print(f"{result['target']:<7}{parser:<15}{result['workers']:>8}{result['pages_per_sec']:>10.1f}"
+              f"{result['latency_p50_ms'] or 0:>9.1f}{result['latency_p99_ms'] or 0:>9.1f}"
+              f"{result['parse_ms_per_page'] or 0:>10.2f}{result['write_seconds']:>9.3f}"
+              f"{result['peak_rss_kb'] / 1024:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=["quotes", "repos"], default=["quotes", "repos"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--parsers", nargs="+", default=["html.parser"],
+                        help="Parser backends to compare (html.parser, lxml, selectolax).")
+    parser.add_argument("--restrict", action="store_true", help="Also run the restricted parse mode.")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", default=None, help="Directory of recorded pages.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    config = ServerConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          pages=args.pages, fixtures=args.fixtures, seed=args.seed)
+    results = []
+    with StandInServer(config) as server:
+        for target in args.targets:
+            for parser_name in args.parsers:
+                if target == "repos" and parser_name == "selectolax":
+                    continue # RepoScraper supports the BeautifulSoup backends only.
+                for restrict in ([False, True] if args.restrict else [False]):
+                    for workers in args.concurrency:
+                        results.append(run_case(target, server.base_url, args.pages, workers,
+                                                parser_name, restrict))
+
+    print_table(results)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server": vars(config),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=4)
+    print(f"✓ Saved the results in {args.output}")
+
+if __name__ == "__main__":
+    main()
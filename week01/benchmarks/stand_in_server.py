@@ -0,0 +1,329 @@
+"""
+A local HTTP server that stands in for quotes.toscrape.com and
+github.com/trending, so the scrapers can be benchmarked offline.
+
+The pages have the same markup as the real sites. They are generated
+from templates, or read from a fixtures directory of recorded pages:
+   * quotes_page.html: served for every /page/<n>/ up to the page count,
+   * trending.html   : served for /trending.
+Latency, jitter and the rate of failing (503) responses are configurable.
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import argparse
+import html
+import os
+import random
+import re
+import threading
+import time
+
+@dataclass
+class ServerConfig:
+    """
+    Behaviour of the stand-in server.
+       * latency    : Seconds to wait before every response.
+       * jitter     : The latency changes randomly by at most jitter seconds.
+       * error_rate : Probability of a 503 response.
+       * pages      : Number of quote pages, later pages have no quotes.
+       * quotes_per_page, repos_per_page: Size of the generated pages.
+       * fixtures   : Directory of recorded pages, used instead of the templates.
+       * seed       : Seed of the random generator, for repeatable runs.
+    """
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    pages: int = 100
+    quotes_per_page: int = 10
+    repos_per_page: int = 25
+    fixtures: Optional[str] = None
+    seed: int = 0
+
+QUOTE_TEMPLATE = """
+    <div class="quote" itemscope itemtype="http://schema.org/CreativeWork">
+        <span class="text" itemprop="text">“{text}”</span>
+        <span>by <small class="author" itemprop="author">{author}</small>
+        <a href="/author/{author_slug}">(about)</a>
+        </span>
+        <div class="tags">
+            Tags:
+            <meta class="keywords" itemprop="keywords" content="{keywords}" /    >
+            {tags}
+        </div>
+    </div>
+"""
+
+QUOTES_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Quotes to Scrape</title>
+    <link rel="stylesheet" href="/static/bootstrap.min.css">
+    <link rel="stylesheet" href="/static/main.css">
+</head>
+<body>
+    <div class="container">
+        <div class="row header-box">
+            <div class="col-md-8"><h1><a href="/" style="text-decoration: none">Quotes to Scrape</a></h1></div>
+            <div class="col-md-4"><p><a href="/login">Login</a></p></div>
+        </div>
+    <div class="row">
+    <div class="col-md-8">
+{quotes}
+    <nav>
+        <ul class="pager">
+            {previous}
+            {next}
+        </ul>
+    </nav>
+    </div>
+    <div class="col-md-4 tags-box">
+        <h2>Top Ten tags</h2>
+        <span class="tag-item"><a class="tag" style="font-size: 28px" href="/tag/love/">love</a></span>
+        <span class="tag-item"><a class="tag" style="font-size: 26px" href="/tag/inspirational/">inspirational</a></span>
+        <span class="tag-item"><a class="tag" style="font-size: 26px" href="/tag/life/">life</a></span>
+    </div>
+    </div>
+    </div>
+    <footer class="footer"><div class="container"><p class="text-muted">Quotes by: GoodReads.com</p></div></footer>
+</body>
+</html>
+"""
+
+REPO_TEMPLATE = """
+<article class="Box-row">
+    <div class="float-right d-flex">
+        <div class="BtnGroup d-flex"><a class="btn btn-sm" href="/login">Star</a></div>
+    </div>
+    <h2 class="h3 lh-condensed">
+        <a href="/{owner}/{name}" class="Link">
+            <svg aria-hidden="true" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-repo mr-1 color-fg-muted"></svg>
+            <span data-view-component="true" class="text-normal">
+                {owner} /
+            </span>
+            {name}
+        </a>
+    </h2>
+    <p class="col-9 color-fg-muted my-1 tmp-pr-4">
+        {description}
+    </p>
+    <div class="f6 color-fg-muted mt-2">
+        <span class="d-inline-block ml-0 mr-3">
+            <span class="repo-language-color" style="background-color: #3572A5"></span>
+            <span itemprop="programmingLanguage">{language}</span>
+        </span>
+        <a href="/{owner}/{name}/stargazers" class="Link Link--muted d-inline-block mr-3">
+            <svg aria-label="star" role="img" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-star"></svg>
+            {stars:,}
+        </a>
+        <a href="/{owner}/{name}/forks" class="Link Link--muted d-inline-block mr-3">
+            <svg aria-label="fork" role="img" height="16" viewBox="0 0 16 16" width="16" class="octicon octicon-repo-forked"></svg>
+            {forks:,}
+        </a>
+        <span class="d-inline-block mr-3">Built by</span>
+        <span class="d-inline-block float-sm-right">{stars_today} stars today</span>
+    </div>
+</article>
+"""
+
+TRENDING_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en" data-color-mode="auto">
+<head><meta charset="utf-8"><title>Trending repositories on GitHub today</title></head>
+<body class="logged-out env-production page-responsive">
+<div class="application-main">
+<main>
+    <div class="position-relative container-lg p-responsive pt-6">
+        <div class="Box">
+            <div class="Box-header d-md-flex flex-items-center flex-justify-between">
+                <nav class="subnav-links"><a class="js-selected-navigation-item selected subnav-item" href="/trending">Repositories</a></nav>
+            </div>
+            <div data-hpc>
+{repos}
+            </div>
+        </div>
+    </div>
+</main>
+</div>
+</body>
+</html>
+"""
+
+WORDS = ["world", "thinking", "change", "life", "love", "choices", "abilities", "truly",
+         "miracle", "books", "friends", "imagination", "simple", "courage", "mind"]
+AUTHORS = ["Albert Einstein", "J.K. Rowling", "Jane Austen", "Marilyn Monroe",
+           "André Gide", "Thomas A. Edison", "Eleanor Roosevelt", "Steve Martin"]
+LANGUAGES = ["Python", "TypeScript", "Rust", "Go", "C++", "Java", ""]
+
+def quotes_page(page: int, config: ServerConfig) -> str:
+    """
+    Generates the quote page with given number.
+    Pages after config.pages have no quotes, like the real site.
+    """
+    rng = random.Random(page)
+    quotes = []
+    if page <= config.pages:
+        for i in range(config.quotes_per_page):
+            author = rng.choice(AUTHORS)
+            tags = rng.sample(WORDS, rng.randint(0, 4))
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 40))).capitalize() + "."
+            quotes.append(QUOTE_TEMPLATE.format(
+                text=html.escape(text),
+                author=html.escape(author),
+                author_slug=author.replace(" ", "-"),
+                keywords=",".join(tags),
+                tags="\n".join(f'<a class="tag" href="/tag/{tag}/page/1/">{tag}</a>' for tag in tags),
+            ))
+    else:
+        quotes.append("No quotes found!")
+
+    previous = f'<li class="previous"><a href="/page/{page - 1}/">Previous</a></li>' if page > 1 else ""
+    next_ = f'<li class="next"><a href="/page/{page + 1}/">Next</a></li>' if page < config.pages else ""
+    return QUOTES_PAGE_TEMPLATE.format(quotes="".join(quotes), previous=previous, next=next_)
+
+def trending_page(config: ServerConfig) -> str:
+    """
+    Generates the trending page.
+    """
+    rng = random.Random(config.seed)
+    repos = []
+    for i in range(config.repos_per_page):
+        repos.append(REPO_TEMPLATE.format(
+            owner=f"owner{i}",
+            name=f"{rng.choice(WORDS)}-{i}",
+            description=html.escape(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))),
+            language=rng.choice(LANGUAGES),
+            stars=rng.randint(0, 250000),
+            forks=rng.randint(0, 60000),
+            stars_today=rng.randint(0, 3000),
+        ))
+    return TRENDING_PAGE_TEMPLATE.format(repos="".join(repos))
+
+class StandInServer:
+    """
+    Serves the pages in a background thread.
+    Can be used as a context manager, base_url is the address of the server.
+    """
+    def __init__(self, config: Optional[ServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config if config is not None else ServerConfig()
+        self.__rng = random.Random(self.config.seed)
+        self.__rng_lock = threading.Lock()
+        self.__fixtures = self.__load_fixtures()
+        self.__trending = self.__fixtures.get("trending.html", trending_page(self.config)).encode()
+        self.__httpd = ThreadingHTTPServer((host, port), self.__handler_class())
+        self.__httpd.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.__httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StandInServer":
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__httpd.shutdown()
+        self.__httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def __load_fixtures(self) -> dict:
+        """
+        Reads the recorded pages in the fixtures directory, if there is one.
+        """
+        fixtures = {}
+        if self.config.fixtures is None:
+            return fixtures
+        for name in ["quotes_page.html", "trending.html"]:
+            path = os.path.join(self.config.fixtures, name)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as file:
+                    fixtures[name] = file.read()
+        return fixtures
+
+    def _delay_and_fail(self) -> bool:
+        """
+        Waits for the latency of a response.
+        Returns True if the response should fail.
+        """
+        with self.__rng_lock:
+            delay = self.config.latency + self.__rng.uniform(-self.config.jitter, self.config.jitter)
+            fail = self.__rng.random() < self.config.error_rate
+        time.sleep(max(0.0, delay))
+        return fail
+
+    def _page(self, path: str) -> Optional[bytes]:
+        """
+        Returns the body for the path, None if there is no such page.
+        """
+        match = re.fullmatch(r"/page/(\d+)/?", path)
+        if match is not None:
+            page = int(match.group(1))
+            if "quotes_page.html" in self.__fixtures:
+                if page > self.config.pages:
+                    return quotes_page(page, self.config).encode()
+                return self.__fixtures["quotes_page.html"].encode()
+            return quotes_page(page, self.config).encode()
+        if path.rstrip("/") == "/trending":
+            return self.__trending
+        return None
+
+    def __handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real sites.
+            disable_nagle_algorithm = True # Headers and body are written separately.
+
+            def do_GET(self):
+                fail = server._delay_and_fail()
+                body = server._page(self.path.split("?", 1)[0])
+                if fail:
+                    self.send_response(503)
+                    body = b"Service Unavailable"
+                elif body is None:
+                    self.send_response(404)
+                    body = b"Not Found"
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Do not print every request.
+
+        return Handler
+
+def main():
+    """
+    Runs the stand-in server until it is interrupted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--fixtures", default=None)
+    args = parser.parse_args()
+
+    config = ServerConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          pages=args.pages, fixtures=args.fixtures)
+    with StandInServer(config, port=args.port) as server:
+        print(f"Serving on {server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
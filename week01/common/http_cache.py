@@ -0,0 +1,200 @@
+"""
+On-disk HTTP response cache.
+
+CachedSession wraps a session (anything with a requests-like get method)
+and keeps successfull responses in an SQLite file. Fresh responses are
+served without touching the network, stale ones are revalidated with
+conditional GET requests (If-None-Match / If-Modified-Since).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+import sqlite3
+import threading
+import time
+import requests
+
+@dataclass
+class CachedResponse:
+    """
+    A response served from the cache.
+    Has the same attributes the scrapers read from a requests.Response.
+    """
+    url: str
+    content: bytes
+    headers: dict = field(default_factory=dict)
+    status_code: int = 200
+    from_cache: bool = True
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a CachedSession.
+       * hits         : Responses served without any request.
+       * misses       : Responses downloaded from the network.
+       * revalidations: Stale responses the server confirmed with 304 Not Modified.
+       * evictions    : Responses removed to keep the cache under max_size.
+    """
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+class CachedSession:
+    """
+    Caches the responses of the wrapped session on disk.
+    Responses younger than ttl seconds are served from the cache,
+    older ones are revalidated with their ETag/Last-Modified headers.
+    The total size of the stored bodies is kept under max_size bytes
+    by evicting the least recently used responses.
+    Can be given to the scrapers in place of a requests.Session.
+    """
+    def __init__(self, path: str, session: Optional[Any] = None,
+                 ttl: float = 3600, max_size: int = 100 * 1024 * 1024):
+        if ttl < 0:
+            raise ValueError("ttl cannot be negative.")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+
+        self.session = session if session is not None else requests.Session()
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self.__lock = threading.Lock() # The scrapers may share the cache between threads.
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT,"
+            "stored_at REAL, last_access REAL, size INTEGER)"
+        )
+        self.__db.commit()
+
+    def get(self, url: str, timeout: Optional[float] = None, headers: Optional[dict] = None,
+            **kwargs) -> Any:
+        """
+        Returns the response of the url, from the cache if possible.
+        """
+        entry = self.__load(url)
+        now = time.time()
+
+        if entry is not None and now - entry["stored_at"] < self.ttl:
+            with self.__lock:
+                self.stats.hits += 1
+            self.__touch(url, now, refresh=False)
+            return self.__to_response(url, entry)
+
+        # The response is missing or stale, ask the server.
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry["etag"] is not None:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"] is not None:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.session.get(url, timeout=timeout, headers=request_headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            with self.__lock:
+                self.stats.revalidations += 1
+            self.__touch(url, now, refresh=True)
+            return self.__to_response(url, entry)
+
+        with self.__lock:
+            self.stats.misses += 1
+        if response.status_code == 200:
+            self.__store(url, response, now)
+        return response
+
+    def clear(self):
+        """
+        Removes all the responses from the cache.
+        """
+        with self.__lock:
+            self.__db.execute("DELETE FROM responses")
+            self.__db.commit()
+
+    def size(self) -> int:
+        """
+        Returns the total size of the stored bodies in bytes.
+        """
+        with self.__lock:
+            return self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        """
+        Closes the cache file and the wrapped session.
+        """
+        with self.__lock:
+            self.__db.close()
+        if hasattr(self.session, "close"):
+            self.session.close()
+
+    def __enter__(self) -> "CachedSession":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __load(self, url: str) -> Optional[dict]:
+        """
+        Returns the stored entry of the url, None if it is not cached.
+        """
+        with self.__lock:
+            row = self.__db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "stored_at": row[3]}
+
+    def __touch(self, url: str, now: float, refresh: bool):
+        """
+        Marks the entry as recently used. If refresh is True,
+        the entry becomes fresh again for ttl seconds.
+        """
+        with self.__lock:
+            if refresh:
+                self.__db.execute("UPDATE responses SET last_access = ?, stored_at = ? WHERE url = ?",
+                                  (now, now, url))
+            else:
+                self.__db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self.__db.commit()
+
+    def __store(self, url: str, response: Any, now: float):
+        """
+        Stores the response and evicts the least recently used ones
+        if the cache gets larger than max_size.
+        """
+        body = response.content
+        if len(body) > self.max_size:
+            return # Would evict everything else and still not fit.
+
+        with self.__lock:
+            self.__db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 now, now, len(body))
+            )
+            total = self.__db.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+            if total > self.max_size:
+                rows = self.__db.execute(
+                    "SELECT url, size FROM responses WHERE url != ? ORDER BY last_access", (url,)
+                ).fetchall()
+                for old_url, size in rows:
+                    if total <= self.max_size:
+                        break
+                    self.__db.execute("DELETE FROM responses WHERE url = ?", (old_url,))
+                    total -= size
+                    self.stats.evictions += 1
+            self.__db.commit()
+
+    @staticmethod
+    def __to_response(url: str, entry: dict) -> CachedResponse:
+        """
+        Creates a CachedResponse from a stored entry.
+        """
+        headers = {}
+        if entry["etag"] is not None:
+            headers["ETag"] = entry["etag"]
+        if entry["last_modified"] is not None:
+            headers["Last-Modified"] = entry["last_modified"]
+        return CachedResponse(url=url, content=entry["body"], headers=headers)
@@ -0,0 +1,276 @@
+"""
+Counters and latency histograms for the stages of a scraping run.
+
+The scrapers record their metrics into the module-level registry.
+Labels set with labelled() (for example the page being scraped) are added
+to every metric recorded inside the with block, also from nested calls.
+At the end of a run the registry can be exported as a Prometheus text
+file or as a JSON summary.
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+import bisect
+import contextvars
+import json
+import threading
+import time
+
+# Upper bounds (seconds) of the histogram buckets.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Descriptions written into the Prometheus file.
+METRIC_HELP = {
+    "scraper_fetch_seconds": "Duration of the HTTP requests.",
+    "scraper_fetch_total": "Number of HTTP requests by status code.",
+    "scraper_retries_total": "Number of requests retried, by the status that caused the retry.",
+    "scraper_parse_seconds": "Duration of building the HTML tree of a page.",
+    "scraper_extract_seconds": "Duration of extracting one item from its element.",
+    "scraper_items_total": "Number of items extracted successfully.",
+    "scraper_invalid_items_total": "Number of elements no item could be extracted from.",
+    "model_validation_errors_total": "Number of items that failed validation.",
+    "model_columns_validation_seconds": "Duration of validating the columns of many items together.",
+    "writer_seconds": "Duration of writing the items into a file.",
+    "writer_records_total": "Number of items written into files.",
+}
+
+_labels = contextvars.ContextVar("metric_labels", default={})
+
+@contextmanager
+def labelled(**labels) -> Iterator[None]:
+    """
+    Adds the labels to every metric recorded inside the with block.
+    """
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """
+    Counts the observed values in buckets and keeps their sum.
+    """
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # The last one is the +Inf bucket.
+        self.sum = 0.0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+        for value in [other.min, other.max]:
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket the q quantile is in,
+        the maximum value if it is in the +Inf bucket.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count > 0:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+class MetricsRegistry:
+    """
+    Keeps the counters and histograms of a run.
+    Metrics are identified by their name and labels. Recording is thread safe,
+    and does nothing while enabled is False.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.enabled = True
+        self.__lock = threading.Lock()
+        self.__counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.__histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Increases the counter by value.
+        """
+        if not self.enabled:
+            return
+        key = self.__key(labels)
+        with self.__lock:
+            counter = self.__counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records a value (in seconds) into the histogram.
+        """
+        if not self.enabled:
+            return
+        key = self.__key(labels)
+        with self.__lock:
+            histograms = self.__histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """
+        Records the duration of the with block into the histogram.
+        """
+        if not self.enabled: # Not even the clock is read.
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """
+        Removes all the recorded metrics.
+        """
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    def counter_value(self, name: str, **labels) -> float:
+        """
+        Returns the sum of the counters with the name whose labels contain the given ones.
+        """
+        with self.__lock:
+            return sum(value for key, value in self.__counters.get(name, {}).items()
+                       if set(labels.items()) <= set(key))
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """
+        Returns the histograms with the name whose labels contain the given ones, merged.
+        """
+        merged = Histogram(self.buckets)
+        with self.__lock:
+            for key, histogram in self.__histograms.get(name, {}).items():
+                if set(labels.items()) <= set(key):
+                    merged.merge(histogram)
+        return merged
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text format.
+        """
+        lines = []
+        with self.__lock:
+            for name, counters in sorted(self.__counters.items()):
+                self.__header(lines, name, "counter")
+                for key, value in sorted(counters.items()):
+                    lines.append(f"{name}{self.__format_labels(key)} {value}")
+            for name, histograms in sorted(self.__histograms.items()):
+                self.__header(lines, name, "histogram")
+                for key, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{self.__format_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self.__format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{self.__format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, exclude: Tuple[str, ...] = ()) -> dict:
+        """
+        Returns the metrics as a dictionary that can be saved as JSON.
+        The labels in exclude are removed and the metrics that become the same
+        are merged, for example exclude=("page",) merges the pages of a scraper.
+        Histograms are summarized with their count, sum, mean, min, max, p50 and p99.
+        """
+        with self.__lock:
+            counters = {name: dict(values) for name, values in self.__counters.items()}
+            histograms = {name: dict(values) for name, values in self.__histograms.items()}
+
+        result = {"counters": {}, "histograms": {}}
+        for name, values in counters.items():
+            merged = {}
+            for key, value in values.items():
+                group = self.__group(key, exclude)
+                merged[group] = merged.get(group, 0) + value
+            result["counters"][name] = [{"labels": dict(group), "value": value}
+                                        for group, value in sorted(merged.items())]
+        for name, values in histograms.items():
+            merged = {}
+            for key, histogram in values.items():
+                merged.setdefault(self.__group(key, exclude), Histogram(self.buckets)).merge(histogram)
+            result["histograms"][name] = [
+                {
+                    "labels": dict(group),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else None,
+                    "min": histogram.min,
+                    "max": histogram.max,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                }
+                for group, histogram in sorted(merged.items())
+            ]
+        return result
+
+    def write_prometheus(self, path: str):
+        """
+        Writes the metrics into a Prometheus text file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+    def write_json(self, path: str, exclude: Tuple[str, ...] = ()):
+        """
+        Writes the summary of the metrics into a JSON file, see summary.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(exclude), file, indent=4)
+
+    @staticmethod
+    def __key(labels: dict) -> LabelKey:
+        """
+        Returns the labels of the context and the given labels as a sorted tuple.
+        """
+        merged = {**_labels.get(), **labels}
+        return tuple(sorted((name, str(value)) for name, value in merged.items()))
+
+    @staticmethod
+    def __group(key: LabelKey, exclude: Tuple[str, ...]) -> LabelKey:
+        return tuple((name, value) for name, value in key if name not in exclude)
+
+    @staticmethod
+    def __header(lines: list, name: str, metric_type: str):
+        if name in METRIC_HELP:
+            lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @staticmethod
+    def __format_labels(key: LabelKey) -> str:
+        if len(key) == 0:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in key)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+# The registry the scrapers, models and writers record into.
+registry = MetricsRegistry()
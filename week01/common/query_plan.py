@@ -0,0 +1,126 @@
+"""
+Lazy query plans for the analyzers.
+
+The filter methods of the analyzers only record a predicate in the plan.
+The plan runs when the result is needed: the predicates are evaluated one
+after another over the row positions of the base frame that are still
+selected, the most selective and cheapest first, and the frame is indexed
+once with the positions left. Operations whose result depends on the rows
+before them, like "the n most starred", are barriers: the predicates are
+only reordered between two barriers.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+import numpy as np
+
+# A mask function gets the positions of the rows to test, None for all the rows,
+# and returns a boolean array with one value for every position.
+MaskFunction = Callable[[Optional[np.ndarray]], np.ndarray]
+
+def take(column: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Returns the values of the column in the given row positions, all of them if rows is None.
+    """
+    return column if rows is None else column[rows]
+
+@dataclass
+class Predicate:
+    """
+    A filter of the plan.
+       * mask        : See MaskFunction.
+       * selectivity : Estimated fraction of the rows it keeps.
+       * cost        : Relative cost of testing a row, 1 for a comparison of numbers.
+       * positions   : Optional, returns the sorted positions of all the rows it keeps,
+                       from an index. Used instead of mask when the predicate runs first.
+    """
+    mask: MaskFunction
+    selectivity: float = 0.5
+    cost: float = 1.0
+    positions: Optional[Callable[[], np.ndarray]] = None
+
+    @property
+    def rank(self) -> float:
+        """
+        The predicates with the lowest rank run first. A predicate that removes
+        many rows for a low cost makes the later predicates test fewer rows.
+        """
+        return (self.selectivity - 1) / self.cost
+
+@dataclass
+class Barrier:
+    """
+    An operation that selects from the rows left by the operations before it.
+    select gets the positions of the rows and returns the positions it keeps, in its own order.
+    """
+    select: Callable[[np.ndarray], np.ndarray]
+
+class QueryPlan:
+    """
+    The operations recorded by an analyzer over a frame of size rows.
+    The result of execute is cached until the plan changes. version changes
+    with every change, so results computed from the selected rows can be
+    cached by the analyzers too.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.version = 0
+        self.__operations: List[Union[Predicate, Barrier]] = []
+        self.__result: Optional[np.ndarray] = None
+
+    def add(self, operation: Union[Predicate, Barrier]):
+        self.__operations.append(operation)
+        self.__changed()
+
+    def clear(self):
+        self.__operations.clear()
+        self.__changed()
+
+    def resize(self, size: int):
+        """
+        Changes the number of rows, after rows are added to the frame. The operations are kept.
+        """
+        self.size = size
+        self.__changed()
+
+    def __len__(self) -> int:
+        return len(self.__operations)
+
+    def execute(self) -> np.ndarray:
+        """
+        Returns the positions of the selected rows, in the order of the base frame
+        unless a barrier ordered them.
+        """
+        if self.__result is None:
+            rows = None # All the rows, without creating an array of them.
+            stage: List[Predicate] = []
+            for operation in self.__operations:
+                if isinstance(operation, Barrier):
+                    rows = self.__filter(rows, stage)
+                    rows = operation.select(self.__all(rows))
+                    stage = []
+                else:
+                    stage.append(operation)
+            self.__result = self.__all(self.__filter(rows, stage))
+        return self.__result
+
+    def __filter(self, rows: Optional[np.ndarray], predicates: List[Predicate]) -> Optional[np.ndarray]:
+        """
+        Applies the predicates to the rows, most selective and cheapest first.
+        """
+        for predicate in sorted(predicates, key=lambda predicate: predicate.rank):
+            if rows is None and predicate.positions is not None:
+                rows = predicate.positions() # No row is tested.
+                continue
+            keep = predicate.mask(rows)
+            rows = np.flatnonzero(keep) if rows is None else rows[keep]
+            if len(rows) == 0:
+                break
+        return rows
+
+    def __changed(self):
+        self.__result = None
+        self.version += 1
+
+    def __all(self, rows: Optional[np.ndarray]) -> np.ndarray:
+        return np.arange(self.size) if rows is None else rows
@@ -0,0 +1,8 @@
+#!/bin/bash
+
+# Tests of the modules shared by QuoteScraper and Github_Trendings_Scraper
+
+pytest test_throttle.py
+pytest test_http_cache.py
+pytest test_metrics.py
+pytest test_query_plan.py
@@ -0,0 +1,116 @@
+"""
+Tests the CachedSession class.
+"""
+
+import pytest
+from unittest.mock import Mock, MagicMock
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from http_cache import CachedSession
+
+def _response(status_code, content=b"", headers=None):
+    """Returns a mock response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+@pytest.fixture
+def session():
+    """Returns a mock session, responses are set in each test."""
+    return Mock()
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+def test_hit_inside_ttl(session, cache_path):
+    """
+    The second request inside ttl should be served without the network.
+    """
+    session.get.return_value = _response(200, b"<p>page</p>", {"ETag": '"v1"'})
+    cache = CachedSession(cache_path, session=session, ttl=60)
+
+    first = cache.get("https://quotes.toscrape.com/page/1", timeout=10)
+    second = cache.get("https://quotes.toscrape.com/page/1", timeout=10)
+
+    assert first.content == second.content == b"<p>page</p>"
+    assert second.from_cache
+    assert session.get.call_count == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+def test_revalidation(session, cache_path):
+    """
+    A stale response should be revalidated with its validators,
+    and a 304 answer should serve the stored body.
+    """
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    session.get.side_effect = [_response(200, b"<p>page</p>", headers), _response(304)]
+    cache = CachedSession(cache_path, session=session, ttl=0)
+
+    cache.get("https://quotes.toscrape.com/page/1")
+    response = cache.get("https://quotes.toscrape.com/page/1")
+
+    sent_headers = session.get.call_args.kwargs["headers"]
+    assert sent_headers["If-None-Match"] == '"v1"'
+    assert sent_headers["If-Modified-Since"] == headers["Last-Modified"]
+    assert response.status_code == 200
+    assert response.content == b"<p>page</p>"
+    assert cache.stats.revalidations == 1
+
+def test_changed_page_replaced(session, cache_path):
+    """
+    If the page has changed, the new body should be returned and stored.
+    """
+    session.get.side_effect = [_response(200, b"old", {"ETag": '"v1"'}),
+                               _response(200, b"new", {"ETag": '"v2"'}),
+                               _response(304)]
+    cache = CachedSession(cache_path, session=session, ttl=0)
+
+    cache.get("https://page.com/1")
+    assert cache.get("https://page.com/1").content == b"new"
+    assert cache.get("https://page.com/1").content == b"new"
+    assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v2"'
+
+def test_failed_response_not_stored(session, cache_path):
+    """
+    Only successfull responses should be stored.
+    """
+    session.get.side_effect = [_response(404), _response(200, b"ok")]
+    cache = CachedSession(cache_path, session=session, ttl=60)
+
+    assert cache.get("https://page.com/1").status_code == 404
+    assert cache.get("https://page.com/1").content == b"ok"
+    assert session.get.call_count == 2
+
+def test_lru_eviction(session, cache_path):
+    """
+    The least recently used response should be evicted first.
+    """
+    session.get.side_effect = lambda url, **kwargs: _response(200, b"x" * 10)
+    cache = CachedSession(cache_path, session=session, ttl=60, max_size=25)
+
+    cache.get("https://page.com/1")
+    cache.get("https://page.com/2")
+    cache.get("https://page.com/1") # Page 1 is now more recent than page 2.
+    cache.get("https://page.com/3") # Page 2 should be evicted.
+
+    assert cache.size() == 20
+    assert cache.stats.evictions == 1
+    cache.get("https://page.com/1")
+    assert cache.stats.hits == 2
+    cache.get("https://page.com/2")
+    assert cache.stats.misses == 4
+
+def test_persistent_between_runs(session, cache_path):
+    """
+    The cache file should be reused by a new CachedSession.
+    """
+    session.get.return_value = _response(200, b"page")
+    with CachedSession(cache_path, session=session, ttl=60) as cache:
+        cache.get("https://page.com/1")
+
+    cache = CachedSession(cache_path, session=Mock(), ttl=60)
+    assert cache.get("https://page.com/1").content == b"page"
+    assert cache.session.get.call_count == 0
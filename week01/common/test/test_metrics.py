@@ -0,0 +1,66 @@
+"""
+Tests the MetricsRegistry class.
+"""
+
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import metrics
+from metrics import MetricsRegistry
+
+@pytest.fixture
+def registry():
+    """Returns an empty registry."""
+    return MetricsRegistry(buckets=(0.1, 1.0))
+
+def test_counter_and_labels(registry):
+    """
+    Labels of labelled blocks should be added to the metrics.
+    """
+    with metrics.labelled(scraper="QuoteScraper", page="p1"):
+        registry.inc("items_total")
+        registry.inc("items_total", 2)
+    registry.inc("items_total", page="p2")
+
+    assert registry.counter_value("items_total") == 4
+    assert registry.counter_value("items_total", page="p1") == 3
+    assert registry.counter_value("items_total", scraper="QuoteScraper") == 3
+
+def test_histogram_summary(registry):
+    """
+    The summary should merge the excluded labels.
+    """
+    for page, value in [("p1", 0.05), ("p1", 0.5), ("p2", 5.0)]:
+        registry.observe("fetch_seconds", value, page=page, scraper="S")
+
+    summary = registry.summary(exclude=("page",))
+
+    [histogram] = summary["histograms"]["fetch_seconds"]
+    assert histogram["labels"] == {"scraper": "S"}
+    assert histogram["count"] == 3
+    assert histogram["p50"] == 1.0
+    assert histogram["max"] == 5.0
+
+def test_prometheus_format(registry):
+    """
+    Histograms should have cumulative buckets, sum and count.
+    """
+    registry.observe("fetch_seconds", 0.05, page='a"b')
+    registry.observe("fetch_seconds", 2.0, page='a"b')
+    registry.inc("scraper_items_total")
+
+    lines = registry.to_prometheus().splitlines()
+
+    assert "# TYPE fetch_seconds histogram" in lines
+    assert 'fetch_seconds_bucket{page="a\\"b",le="0.1"} 1' in lines
+    assert 'fetch_seconds_bucket{page="a\\"b",le="+Inf"} 2' in lines
+    assert 'fetch_seconds_count{page="a\\"b"} 2' in lines
+    assert "scraper_items_total 1" in lines
+
+def test_disabled(registry):
+    registry.enabled = False
+    registry.inc("items_total")
+    with registry.timer("fetch_seconds"):
+        pass
+    assert registry.counter_value("items_total") == 0
+    assert registry.histogram("fetch_seconds").count == 0
@@ -0,0 +1,126 @@
+"""
+Tests the QueryPlan class.
+"""
+
+import numpy as np
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from query_plan import Barrier, Predicate, QueryPlan, take
+
+VALUES = np.array([5, 1, 8, 3, 9, 2, 7])
+
+class RecordingMask:
+    """A mask function which records the number of rows it tested."""
+    def __init__(self, condition):
+        self.condition = condition
+        self.tested = []
+
+    def __call__(self, rows):
+        values = take(VALUES, rows)
+        self.tested.append(len(values))
+        return self.condition(values)
+
+def test_no_operations():
+    assert list(QueryPlan(4).execute()) == [0, 1, 2, 3]
+
+def test_fused_predicates():
+    """
+    The result should be the rows all the predicates keep, in the order of the frame.
+    """
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(lambda rows: take(VALUES, rows) >= 3))
+    plan.add(Predicate(lambda rows: take(VALUES, rows) <= 8))
+
+    assert list(plan.execute()) == [0, 2, 3, 6]
+
+def test_most_selective_first():
+    """
+    The selective predicate should run first, the other one should test only the rows it kept.
+    """
+    broad = RecordingMask(lambda values: values >= 2)
+    narrow = RecordingMask(lambda values: values == 9)
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(broad, selectivity=0.9))
+    plan.add(Predicate(narrow, selectivity=0.1))
+
+    assert list(plan.execute()) == [4]
+    assert narrow.tested == [7]
+    assert broad.tested == [1]
+
+def test_expensive_last():
+    cheap = RecordingMask(lambda values: values > 4)
+    expensive = RecordingMask(lambda values: values % 2 == 1)
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(expensive, selectivity=0.5, cost=20))
+    plan.add(Predicate(cheap, selectivity=0.5))
+
+    assert list(plan.execute()) == [0, 4, 6]
+    assert expensive.tested == [4]
+
+def test_barrier():
+    """
+    The predicates should not move over a barrier, and the barrier order should be kept.
+    """
+    def largest_three(rows):
+        return rows[np.argsort(-VALUES[rows], kind="stable")[:3]]
+
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(lambda rows: take(VALUES, rows) != 9, selectivity=0.9))
+    plan.add(Barrier(largest_three))
+    plan.add(Predicate(lambda rows: take(VALUES, rows) < 8, selectivity=0.1))
+
+    assert list(plan.execute()) == [6, 0]
+
+def test_cached_until_changed():
+    mask = RecordingMask(lambda values: values > 4)
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(mask))
+
+    plan.execute()
+    plan.execute()
+    assert len(mask.tested) == 1
+
+    plan.clear()
+    assert len(plan.execute()) == len(VALUES)
+
+def test_version_changes():
+    plan = QueryPlan(len(VALUES))
+    version = plan.version
+    plan.execute()
+    assert plan.version == version, "Executing should not change the version"
+
+    plan.add(Predicate(lambda rows: take(VALUES, rows) > 4))
+    assert plan.version != version
+    version = plan.version
+    plan.clear()
+    assert plan.version != version
+
+def test_resize():
+    columns = {"values": VALUES}
+    plan = QueryPlan(len(VALUES))
+    plan.add(Predicate(lambda rows: take(columns["values"], rows) > 8))
+    assert list(plan.execute()) == [4]
+
+    columns["values"] = np.concatenate((VALUES, [10, 0])) # Rows added to the frame.
+    plan.resize(len(columns["values"]))
+    assert list(plan.execute()) == [4, len(VALUES)], "The filters should apply to the new rows"
+
+def test_positions_used_first():
+    """
+    A predicate with positions should give them without testing the rows,
+    when it runs first, and be tested like the others after another predicate.
+    """
+    mask = RecordingMask(lambda values: values > 4)
+    indexed = Predicate(mask, selectivity=0.1, positions=lambda: np.flatnonzero(VALUES > 4))
+    plan = QueryPlan(len(VALUES))
+    plan.add(indexed)
+    plan.add(Predicate(lambda rows: take(VALUES, rows) < 9, selectivity=0.9))
+
+    assert list(plan.execute()) == [0, 2, 6]
+    assert mask.tested == []
+
+    plan.clear()
+    plan.add(Predicate(lambda rows: take(VALUES, rows) < 9, selectivity=0.01))
+    plan.add(indexed)
+    assert list(plan.execute()) == [0, 2, 6]
+    assert len(mask.tested) == 1
@@ -0,0 +1,196 @@
+"""
+Tests the ThrottledSession, TokenBucket and AIMDController classes.
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, MagicMock
+import requests
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from throttle import AIMDController, ThrottledSession, TokenBucket
+
+URL = "https://quotes.toscrape.com/page/1"
+
+def _response(status_code, headers=None):
+    """Returns a mock response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = b"<p>page</p>"
+    response.headers = headers or {}
+    return response
+
+def _session(responses, **kwargs):
+    """Returns a fast ThrottledSession over a mock session giving the responses."""
+    session = Mock()
+    session.get.side_effect = responses
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("backoff_base", 0.001)
+    return ThrottledSession(session, **kwargs)
+
+def test_retry_until_success():
+    """
+    Throttled responses should be retried instead of being returned.
+    """
+    throttled = _session([_response(503), _response(429), _response(200)])
+
+    response = throttled.get(URL, timeout=10)
+
+    assert response.status_code == 200
+    assert throttled.session.get.call_count == 3
+    assert throttled.session.get.call_args.kwargs == {"timeout": 10}
+    assert (throttled.stats.requests, throttled.stats.retries, throttled.stats.gave_up) == (3, 2, 0)
+
+def test_give_up():
+    """
+    After max_retries retries the last response should be returned.
+    """
+    throttled = _session([_response(503)] * 3, max_retries=2)
+
+    assert throttled.get(URL).status_code == 503
+    assert throttled.stats.gave_up == 1
+
+def test_other_failures_not_retried():
+    throttled = _session([_response(404)])
+
+    assert throttled.get(URL).status_code == 404
+    assert throttled.session.get.call_count == 1
+
+def test_connection_error_retried():
+    throttled = _session([requests.ConnectionError(), _response(200)])
+
+    assert throttled.get(URL).status_code == 200
+
+    throttled = _session([requests.Timeout()] * 2, max_retries=1)
+    with pytest.raises(requests.Timeout):
+        throttled.get(URL)
+
+def test_retry_after_seconds():
+    """
+    The Retry-After header should be waited, not the backoff.
+    """
+    throttled = _session([_response(429, {"Retry-After": "0.2"}), _response(200)])
+
+    start = time.monotonic()
+    throttled.get(URL)
+
+    assert time.monotonic() - start >= 0.2
+
+def test_other_errors_release_the_slot():
+    """
+    Errors which are not retried should free their place in the controller,
+    otherwise the requests after them wait forever.
+    """
+    errors = [requests.exceptions.ChunkedEncodingError(), requests.TooManyRedirects()]
+    throttled = _session(errors + [_response(200)], controller=AIMDController(initial=2, max_limit=2))
+
+    for error in errors:
+        with pytest.raises(type(error)):
+            throttled.get(URL)
+    done = threading.Event()
+    threading.Thread(target=lambda: throttled.get(URL) and done.set(), daemon=True).start()
+
+    assert done.wait(1), "The request should not wait for a slot"
+
+def test_retry_after_capped():
+    """
+    A Retry-After longer than backoff_max should be waited only backoff_max seconds.
+    """
+    throttled = _session([_response(429, {"Retry-After": "3600"}), _response(200)], backoff_max=0.05)
+
+    start = time.monotonic()
+    assert throttled.get(URL).status_code == 200
+    assert time.monotonic() - start < 1
+
+def test_retry_after_parsing():
+    assert ThrottledSession.retry_after(_response(429, {"Retry-After": "120"})) == 120
+    assert ThrottledSession.retry_after(_response(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert ThrottledSession.retry_after(_response(429, {"Retry-After": "soon"})) is None
+    assert ThrottledSession.retry_after(_response(429)) is None
+
+def test_backoff_jitter():
+    throttled = ThrottledSession(Mock(), backoff_base=1, backoff_max=5)
+
+    delays = [throttled.backoff(10) for _ in range(100)]
+
+    assert all(0 <= delay <= 5 for delay in delays)
+    assert len(set(delays)) > 1, "The waits should be random"
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09 # 5 waits of 1/50 seconds.
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=1000, burst=5)
+    bucket.pause(0.1)
+
+    assert bucket.acquire() >= 0.09
+
+def test_aimd_additive_increase():
+    controller = AIMDController(initial=2, max_limit=3)
+    for _ in range(10):
+        controller.acquire()
+        controller.release(0.01, throttled=False)
+
+    assert controller.limit == 3, "The limit should grow up to max_limit"
+
+def test_aimd_multiplicative_decrease():
+    """
+    A burst of throttled responses should halve the limit only once.
+    """
+    controller = AIMDController(initial=8)
+    for _ in range(8):
+        controller.acquire()
+    for _ in range(8):
+        controller.release(0.01, throttled=True)
+
+    assert controller.limit == 4
+
+def test_aimd_rising_latency():
+    controller = AIMDController(initial=8, latency_factor=2.0)
+    for latency in [0.01] * 8 + [1.0] * 8:
+        controller.acquire()
+        controller.release(latency, throttled=False)
+
+    assert controller.limit < 8
+
+def test_aimd_limits_in_flight():
+    """
+    No more than limit requests should be in flight at the same time.
+    """
+    controller = AIMDController(initial=2, max_limit=2)
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def request():
+        nonlocal in_flight, peak
+        controller.acquire()
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        controller.release(0.02, throttled=False)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        AIMDController(initial=4, max_limit=2)
+    with pytest.raises(ValueError):
+        ThrottledSession(Mock(), max_retries=-1)
@@ -0,0 +1,274 @@
+"""
+Adaptive rate limiting of HTTP requests.
+
+ThrottledSession wraps a session (anything with a requests-like get method)
+and keeps the scrapers under the limits of the site:
+   * A token bucket per host limits the number of requests per second.
+   * An AIMD controller limits the number of requests in flight. It grows
+     by one while the responses are healthy and is halved on 429/5xx
+     responses or when the latency rises.
+   * Throttled responses are retried after the Retry-After header, or after
+     a jittered exponential backoff, instead of being returned as failures.
+"""
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, Tuple
+from urllib.parse import urlsplit
+import random
+import threading
+import time
+import requests
+import metrics # For counting the retries.
+
+# Statuses that mean the site is overloaded or throttling us.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class TokenBucket:
+    """
+    Lets rate requests per second through on average, and at most burst at once.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        if burst < 1:
+            raise ValueError("burst must be at least 1.")
+
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = float(burst)
+        self.__updated = time.monotonic()
+        self.__paused_until = 0.0
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Waits until a token is available and takes it.
+        Returns the number of seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+                self.__updated = now
+                if now >= self.__paused_until and self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return waited
+                delay = max(self.__paused_until - now, (1 - self.__tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """
+        Lets no request through for the given seconds, for example after a Retry-After header.
+        """
+        with self.__lock:
+            self.__paused_until = max(self.__paused_until, time.monotonic() + seconds)
+
+class AIMDController:
+    """
+    Limits the number of requests in flight with additive increase / multiplicative decrease.
+    The limit grows by one after limit healthy responses in a row, and is multiplied
+    by decrease after a throttled response or a response slower than latency_factor
+    times the usual latency. The requests already in flight when the limit is
+    decreased cannot decrease it again, so a burst of failures halves it once.
+    After a decrease for latency, the current latency becomes the usual one.
+    """
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 decrease: float = 0.5, latency_factor: float = 2.0):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("The limits must satisfy 1 <= min_limit <= initial <= max_limit.")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1.")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.__limit = initial
+        self.__in_flight = 0
+        self.__successes = 0 # Healthy responses since the last change.
+        self.__cooldown = 0 # Responses that cannot decrease the limit.
+        self.__latency = None # Moving average of the latency.
+        self.__base_latency = None # Lowest moving average seen.
+        self.__condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    def acquire(self):
+        """
+        Waits until a request can be sent.
+        """
+        with self.__condition:
+            while self.__in_flight >= self.__limit:
+                self.__condition.wait()
+            self.__in_flight += 1
+
+    def release(self, latency: Optional[float], throttled: bool):
+        """
+        Records the result of a request sent after acquire.
+        latency is None if the request failed without a response.
+        """
+        with self.__condition:
+            self.__in_flight -= 1
+            slow = not throttled and self.__is_slow(latency)
+            if self.__cooldown > 0:
+                self.__cooldown -= 1 # Sent before the last decrease.
+            elif throttled or slow:
+                self.__limit = max(self.min_limit, int(self.__limit * self.decrease))
+                self.__successes = 0
+                self.__cooldown = self.__in_flight
+                if slow:
+                    self.__base_latency = self.__latency
+            if not throttled and not slow:
+                self.__successes += 1
+                if self.__successes >= self.__limit and self.__limit < self.max_limit:
+                    self.__limit += 1
+                    self.__successes = 0
+            self.__condition.notify_all()
+
+    def __is_slow(self, latency: Optional[float]) -> bool:
+        if latency is None:
+            return False
+        self.__latency = latency if self.__latency is None else 0.8 * self.__latency + 0.2 * latency
+        if self.__base_latency is None or self.__latency < self.__base_latency:
+            self.__base_latency = self.__latency
+        return self.__latency > self.latency_factor * self.__base_latency
+
+@dataclass
+class ThrottleStats:
+    """
+    Counters of a ThrottledSession.
+       * requests : Requests sent, retries included.
+       * retries  : Requests sent again after a throttled response, a connection error or a timeout.
+       * gave_up  : Requests still failing after max_retries retries.
+    """
+    requests: int = 0
+    retries: int = 0
+    gave_up: int = 0
+
+class ThrottledSession:
+    """
+    Sends the requests of the wrapped session at the rate the site accepts.
+    Every host has a token bucket of rate requests per second (burst at once),
+    and controller limits the requests in flight, see AIMDController. Its
+    max_limit should not be more than the number of workers of the scraper.
+    Responses with a status in retry_statuses, connection errors and timeouts
+    are retried up to max_retries times. The wait is the Retry-After header if
+    the response has one, otherwise a random time up to backoff_base * 2 ** retry
+    seconds, at most backoff_max in both cases. The last response is returned if
+    all the retries fail. Other errors of the session are raised without a retry.
+    Can be given to the scrapers in place of a requests.Session.
+    """
+    def __init__(self, session: Optional[Any] = None, rate: float = 5.0, burst: int = 1,
+                 controller: Optional[AIMDController] = None, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 60.0,
+                 retry_statuses: Tuple[int, ...] = RETRY_STATUSES):
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative.")
+
+        self.session = session if session is not None else requests.Session()
+        self.rate = rate
+        self.burst = burst
+        self.controller = controller if controller is not None else AIMDController()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.stats = ThrottleStats()
+        self.__buckets = {}
+        self.__lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> Any:
+        """
+        Sends a GET request to the url, retrying throttled responses.
+        """
+        bucket = self.__bucket(url)
+        for retry in range(self.max_retries + 1):
+            bucket.acquire()
+            self.controller.acquire()
+            with self.__lock:
+                self.stats.requests += 1
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.controller.release(None, throttled=True)
+                if retry == self.max_retries:
+                    self.__give_up()
+                    raise
+                delay, status = self.backoff(retry), "error"
+            except BaseException:
+                self.controller.release(None, throttled=False) # Not retried, but the slot is freed.
+                raise
+            else:
+                throttled = response.status_code in self.retry_statuses
+                self.controller.release(time.perf_counter() - start, throttled)
+                if not throttled:
+                    return response
+                if retry == self.max_retries:
+                    self.__give_up()
+                    return response
+                retry_after = self.retry_after(response)
+                delay = min(retry_after, self.backoff_max) if retry_after is not None else self.backoff(retry)
+                status = response.status_code
+                bucket.pause(delay) # The other requests to the host wait too.
+
+            with self.__lock:
+                self.stats.retries += 1
+            metrics.registry.inc("scraper_retries_total", status=status)
+            time.sleep(delay)
+
+    def backoff(self, retry: int) -> float:
+        """
+        Returns the wait before the given retry, with full jitter.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+    @staticmethod
+    def retry_after(response: Any) -> Optional[float]:
+        """
+        Returns the seconds in the Retry-After header of the response,
+        None if it has no valid one. The header is either seconds or a date.
+        """
+        value = getattr(response, "headers", {}).get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def close(self):
+        """
+        Closes the wrapped session.
+        """
+        if hasattr(self.session, "close"):
+            self.session.close()
+
+    def __enter__(self) -> "ThrottledSession":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __bucket(self, url: str) -> TokenBucket:
+        """
+        Returns the token bucket of the host of the url.
+        """
+        host = urlsplit(url).netloc
+        with self.__lock:
+            if host not in self.__buckets:
+                self.__buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.__buckets[host]
+
+    def __give_up(self):
+        with self.__lock:
+            self.stats.gave_up += 1